@@ -12,8 +12,10 @@ from .logs.logger import logger
 from .backends import init_backend
 from .celeryapp import celery_app
 from .decorators import RESOLVER_PLUGINS, TYPE_PLUGINS, discover_plugins
+from .event_hub import EventHub
 from .models import PipelineTemplates
 from .schema import build_schema
+from .templates import PipelineTemplateCache
 from .config import load_config
 from .permissions import get_permissions
 from starlette.requests import Request
@@ -30,6 +32,7 @@ PERMISSIONS_CLASS = get_permissions(CONFIG.get("KEDRO_GRAPHQL_PERMISSIONS"))
 async def lifespan(app: FastAPI):
     await app.backend.startup()
     yield
+    await app.event_hub.shutdown()
     await app.backend.shutdown()
 
 
@@ -55,6 +58,9 @@ class KedroGraphQL(FastAPI):
             self.kedro_pipelines, self.kedro_catalog, self.kedro_parameters)
 
         self.config = config
+        self.pipeline_templates = PipelineTemplateCache(self.kedro_pipelines,
+                                                        project_version=config.get("KEDRO_PROJECT_VERSION"),
+                                                        package_name=config.get("KEDRO_PROJECT_NAME"))
 
         self.resolver_plugins = RESOLVER_PLUGINS
         self.type_plugins = TYPE_PLUGINS
@@ -67,6 +73,13 @@ class KedroGraphQL(FastAPI):
         self.add_api_websocket_route("/graphql", self.graphql_app)
 
         self.celery_app = celery_app(self.config, self.backend, self.schema)
+        self.event_hub = EventHub(backend=self.backend,
+                                  broker_url=self.config["KEDRO_GRAPHQL_BROKER"],
+                                  celery_app=self.celery_app,
+                                  polling=self.config.get("KEDRO_GRAPHQL_PIPELINE_EVENTS_POLLING", False),
+                                  idle_interval=float(self.config.get("KEDRO_GRAPHQL_PIPELINE_EVENTS_IDLE_INTERVAL", 30)),
+                                  queue_size=int(self.config.get("KEDRO_GRAPHQL_EVENT_HUB_QUEUE_SIZE", 100)),
+                                  overflow=self.config.get("KEDRO_GRAPHQL_EVENT_HUB_OVERFLOW", "drop_oldest"))
 
         class Info:
             """A simple class to hold the request context for permissions."""
@@ -3,8 +3,21 @@ from importlib import import_module
 
 def init_backend(config):
     backend_module, backend_class = config["KEDRO_GRAPHQL_BACKEND"].rsplit(".", 1)
-    backend_kwargs = {"uri": config.get("KEDRO_GRAPHQL_MONGO_URI"), "db": config.get(
-        "KEDRO_GRAPHQL_MONGO_DB_NAME"), "collection": config.get("KEDRO_GRAPHQL_MONGO_DB_COLLECTION")}
     backend_module = import_module(backend_module)
-    backend = getattr(backend_module, backend_class)
-    return backend(**backend_kwargs)
+    backend_class = getattr(backend_module, backend_class)
+
+    if hasattr(backend_class, "from_config"):
+        backend = backend_class.from_config(config)
+    else:
+        # backends that do not derive from BaseBackend predate from_config and
+        # are created with the MongoDB connection settings, as they always were
+        backend = backend_class(uri=config.get("KEDRO_GRAPHQL_MONGO_URI"),
+                                db=config.get("KEDRO_GRAPHQL_MONGO_DB_NAME"),
+                                collection=config.get("KEDRO_GRAPHQL_MONGO_DB_COLLECTION"))
+    if config.get("KEDRO_GRAPHQL_BACKEND_CACHE", False):
+        from .cached import CachedBackend
+        backend = CachedBackend(backend,
+                                max_size=int(config.get("KEDRO_GRAPHQL_BACKEND_CACHE_MAX_SIZE", 1024)),
+                                ttl=float(config.get("KEDRO_GRAPHQL_BACKEND_CACHE_TTL", 5)),
+                                poll_interval=float(config.get("KEDRO_GRAPHQL_BACKEND_CACHE_POLL_INTERVAL", 1)))
+    return backend
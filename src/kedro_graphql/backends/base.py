@@ -1,11 +1,33 @@
 import abc
+import inspect
 import uuid
 
-from kedro_graphql.models import Pipeline
+from kedro_graphql.exceptions import CreateManyError
+from kedro_graphql.models import Pipeline, PipelineStatus, State
 
 
 class BaseBackend(metaclass=abc.ABCMeta):
 
+    @staticmethod
+    def config_kwargs(config: dict) -> dict:
+        """Keyword arguments of a backend created by ``from_config``, each backend declares its own settings."""
+        return {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "BaseBackend":
+        """Create the backend from the kedro-graphql configuration.
+
+        Backends with settings of their own override ``config_kwargs`` or this
+        method. The settings the backend's constructor does not accept are left
+        out, so that subclasses written for fewer settings keep working.
+        """
+        kwargs = cls.config_kwargs(config)
+        parameters = inspect.signature(cls).parameters.values()
+        if not any(p.kind == p.VAR_KEYWORD for p in parameters):
+            names = {p.name for p in parameters}
+            kwargs = {k: v for k, v in kwargs.items() if k in names}
+        return cls(**kwargs)
+
     @abc.abstractmethod
     async def startup(self, **kwargs):
         """Startup hook."""
@@ -17,13 +39,43 @@ class BaseBackend(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
     @abc.abstractmethod
-    async def read(self, id: uuid.UUID = None, task_id: str = None):
-        """Load a pipeline by id"""
+    async def read(self, id: uuid.UUID = None, task_id: str = None, projection: list = None):
+        """Load a pipeline by id.
+
+        Kwargs:
+            projection (list): optional list of document field paths to fetch
+                (e.g. ``["name", "status.state"]``). ``None`` fetches the full document.
+        """
         raise NotImplementedError
 
+    async def read_many(self, ids: list = None, projection: list = None) -> list:
+        """Load several pipelines by id.
+
+        The default implementation calls ``read`` once per id; backends should
+        override it with a single batched query.
+
+        Kwargs:
+            ids (list): pipeline ids
+            projection (list): optional list of document field paths to fetch.
+
+        Returns:
+            list: the pipelines in the order of ``ids``, None for ids that do not exist.
+        """
+        return [await self.read(id=id, projection=projection) for id in ids]
+
     @abc.abstractmethod
-    async def list(self, cursor: uuid.UUID = None, limit: int = None, filter: str = None, sort: str = None):
-        """List pipelines using cursor pagination"""
+    async def list(self, cursor: uuid.UUID = None, limit: int = None, filter: str = None, sort: str = None,
+                   projection: list = None):
+        """List pipelines using cursor pagination.
+
+        Kwargs:
+            cursor (str | dict): the id of the first pipeline of the page, or a dict
+                ``{"id": ..., "values": [...], "before": bool}`` carrying the stored
+                values of the ``sort`` keys for that pipeline. With ``before`` the
+                page ends just before the cursor instead of starting at it.
+            projection (list): optional list of document field paths to fetch
+                (e.g. ``["name", "status.state"]``). ``None`` fetches the full document.
+        """
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -31,12 +83,127 @@ class BaseBackend(metaclass=abc.ABCMeta):
         """Save a pipeline"""
         raise NotImplementedError
 
+    async def create_many(self, pipelines: list = None) -> list:
+        """Save several pipelines.
+
+        The default implementation calls ``create`` once per pipeline; backends
+        should override it with a single batched insert.
+
+        Returns:
+            list: the created pipelines, with ids, in the order of ``pipelines``.
+
+        Raises:
+            CreateManyError: if some of the pipelines were not stored, with the
+                pipelines that were and the errors of the others.
+        """
+        created, errors = [], {}
+        for index, pipeline in enumerate(pipelines):
+            try:
+                created.append(await self.create(pipeline))
+            except Exception as e:
+                created.append(None)
+                errors[index] = str(e)
+        if errors:
+            raise CreateManyError(created, errors)
+        return created
+
     @abc.abstractmethod
     async def update(self, pipeline: Pipeline):
         """Update a pipeline"""
         raise NotImplementedError
 
+    async def update_many(self, pipelines: list = None) -> list:
+        """Update several pipelines.
+
+        The default implementation calls ``update`` once per pipeline; backends
+        should override it with a single batched write.
+
+        Returns:
+            list: the updated pipelines in the order of ``pipelines``.
+        """
+        return [await self.update(pipeline) for pipeline in pipelines]
+
     @abc.abstractmethod
     async def delete(self, id: uuid.UUID = None):
         """Delete a pipeline"""
         raise NotImplementedError
+
+    async def patch_status(self, id: uuid.UUID = None, index: int = -1, fields: dict = None,
+                           exclude_states: list = None) -> bool:
+        """Set fields on a single status entry of a pipeline.
+
+        The default implementation is a read-modify-write using ``read`` and
+        ``update``; backends should override it with an atomic update.
+
+        Kwargs:
+            id (uuid.UUID): pipeline id.
+            index (int): index of the status entry, negative values count from the end.
+            fields (dict): ``PipelineStatus`` attributes to set e.g. ``{"state": State.STARTED}``.
+            exclude_states (list): skip the update if the entry's current state is one of these.
+
+        Returns:
+            bool: True if a status entry was updated.
+        """
+        p = await self.read(id=id)
+        if p is None or not p.status:
+            return False
+        status = p.status[index]
+        if exclude_states and status.state in [State(s) for s in exclude_states]:
+            return False
+        for k, v in (fields or {}).items():
+            setattr(status, k, v)
+        await self.update(p)
+        return True
+
+    async def push_status(self, id: uuid.UUID = None, status: PipelineStatus = None) -> bool:
+        """Append a new status entry (e.g. a new run attempt) to a pipeline.
+
+        The default implementation is a read-modify-write using ``read`` and
+        ``update``; backends should override it with an atomic update.
+
+        Returns:
+            bool: True if the pipeline exists and the status was appended.
+        """
+        p = await self.read(id=id)
+        if p is None:
+            return False
+        p.status.append(status)
+        await self.update(p)
+        return True
+
+    async def push_datasets(self, id: uuid.UUID = None, datasets: list = None) -> bool:
+        """Append datasets to the data catalog of a pipeline, e.g. the log datasets of a run.
+
+        The default implementation is a read-modify-write using ``read`` and
+        ``update``; backends should override it with an atomic update.
+
+        Returns:
+            bool: True if the pipeline exists and the datasets were appended.
+        """
+        p = await self.read(id=id)
+        if p is None:
+            return False
+        p.data_catalog = (p.data_catalog or []) + list(datasets or [])
+        await self.update(p)
+        return True
+
+    async def unset_fields(self, fields: list = None) -> int:
+        """Remove top level fields from every stored pipeline, e.g. in a migration.
+
+        Kwargs:
+            fields (list): names of the document fields to remove.
+
+        Returns:
+            int: the number of pipelines that were modified.
+        """
+        raise NotImplementedError
+
+    async def watch(self):
+        """Yield the ids of pipelines as they are changed by any process.
+
+        ``None`` is yielded when changes can no longer be attributed to single
+        pipelines (e.g. the collection was dropped). Backends without a change
+        feed raise ``NotImplementedError``.
+        """
+        raise NotImplementedError
+        yield
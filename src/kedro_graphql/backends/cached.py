@@ -0,0 +1,312 @@
+import asyncio
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from kedro_graphql.logs.logger import logger
+from kedro_graphql.models import Pipeline
+
+from .base import BaseBackend
+
+
+class PipelineCache:
+    """Thread safe LRU cache of pipelines with a time to live.
+
+    Entries are keyed by ``(id, projection)`` so projected reads never serve a
+    partial document to a full read. Every entry of a pipeline is dropped by
+    ``invalidate``. Values are deep copied on the way in and out because
+    resolvers mutate the pipelines they are given.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys = defaultdict(set)
+        # generation of each id with reads in flight, bumped on invalidation so
+        # a read that raced an invalidation is not stored
+        self._generations = {}
+        self._inflight = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(id, projection: list = None) -> tuple:
+        return (str(id), tuple(sorted(projection)) if projection is not None else None)
+
+    def get(self, key: tuple):
+        """Return a copy of the cached pipeline for ``key`` or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, pipeline = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(pipeline)
+
+    def reserve(self, id: str) -> int:
+        """Register a read of ``id`` that is about to hit the backend.
+
+        Returns:
+            int: a token to pass to ``set`` and ``release``.
+        """
+        with self._lock:
+            self._inflight[id] += 1
+            return self._generations.setdefault(id, 0)
+
+    def release(self, id: str):
+        """Unregister a read registered with ``reserve``."""
+        with self._lock:
+            self._inflight[id] -= 1
+            if self._inflight[id] <= 0:
+                del self._inflight[id]
+                self._generations.pop(id, None)
+
+    def set(self, key: tuple, pipeline: Pipeline, token: int):
+        """Store a pipeline unless it was invalidated since ``reserve`` returned ``token``."""
+        pipeline = copy.deepcopy(pipeline)
+        with self._lock:
+            if self._generations.get(key[0]) != token:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, pipeline)
+            self._entries.move_to_end(key)
+            self._keys[key[0]].add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, id: str = None):
+        """Drop every entry of a pipeline, or the whole cache when ``id`` is None."""
+        with self._lock:
+            self.invalidations += 1
+            if id is None:
+                self._entries.clear()
+                self._keys.clear()
+                for i in self._generations:
+                    self._generations[i] += 1
+                return
+            id = str(id)
+            for key in self._keys.pop(id, set()):
+                self._entries.pop(key, None)
+            if id in self._generations:
+                self._generations[id] += 1
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def peek(self, key: tuple):
+        """Return the cached pipeline for ``key`` without copying or counting it."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def _remove(self, key: tuple):
+        self._entries.pop(key, None)
+        keys = self._keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[key[0]]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "hit_ratio": self.hits / lookups if lookups else 0.0,
+                    "evictions": self.evictions,
+                    "expirations": self.expirations,
+                    "invalidations": self.invalidations,
+                    "size": len(self._entries),
+                    "max_size": self.max_size}
+
+
+class CachedBackend(BaseBackend):
+    """Read-through cache in front of any ``BaseBackend``.
+
+    Reads by id are served from an in-process ``PipelineCache``. Writes made
+    through this backend invalidate the pipeline immediately; writes made by
+    other processes (e.g. Celery workers) are picked up from the wrapped
+    backend's ``watch`` change feed, or, when it has none, by re-reading the
+    cached pipelines every ``poll_interval`` seconds. The ``ttl`` bounds how
+    stale an entry can get should both mechanisms fail. Reads by task id and
+    ``list`` are passed through uncached.
+
+    Attributes not defined here are delegated to the wrapped backend.
+    """
+
+    def __init__(self, backend: BaseBackend, max_size: int = 1024, ttl: float = 5.0, poll_interval: float = 1.0):
+        self.backend = backend
+        self.cache = PipelineCache(max_size=max_size, ttl=ttl)
+        self.poll_interval = poll_interval
+        self._invalidation_task = None
+
+    def __getattr__(self, name):
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    async def startup(self, **kwargs):
+        """Start the wrapped backend and the cache invalidation task."""
+        await self.backend.startup(**kwargs)
+        self._invalidation_task = asyncio.create_task(self._invalidate())
+
+    async def shutdown(self, **kwargs):
+        """Stop the cache invalidation task and the wrapped backend."""
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        logger.info(f"pipeline cache stats: {self.cache.stats()}")
+        await self.backend.shutdown(**kwargs)
+
+    async def _invalidate(self):
+        """Invalidate cached pipelines from the change feed, falling back to polling."""
+        try:
+            logger.info("pipeline cache invalidation watching the backend change feed")
+            async for id in self.backend.watch():
+                self.cache.invalidate(id)
+        except asyncio.CancelledError:
+            raise
+        except NotImplementedError:
+            pass
+        except Exception as e:
+            logger.warning(f"pipeline cache change feed unavailable ({e}), falling back to polling")
+        # whatever happened while the feed was down is unknown
+        self.cache.invalidate()
+        logger.info(f"pipeline cache invalidation polling every {self.poll_interval}s")
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"pipeline cache polling failed: {e}")
+                self.cache.invalidate()
+
+    async def _poll(self):
+        """Re-read the cached pipelines and invalidate those that changed."""
+        ids_by_projection = defaultdict(list)
+        for id, projection in self.cache.keys():
+            ids_by_projection[projection].append(id)
+        for projection, ids in ids_by_projection.items():
+            current = await self.backend.read_many(
+                ids=ids, projection=list(projection) if projection is not None else None)
+            for id, p in zip(ids, current):
+                if p != self.cache.peek((id, projection)):
+                    self.cache.invalidate(id)
+
+    async def read(self, id: uuid.UUID = None, task_id: str = None, projection: list = None):
+        """Load a pipeline by id (cached) or task_id (not cached)."""
+        if task_id:
+            return await self.backend.read(id=id, task_id=task_id, projection=projection)
+
+        key = self.cache.key(id, projection)
+        p = self.cache.get(key)
+        if p is not None:
+            return p
+        token = self.cache.reserve(key[0])
+        try:
+            p = await self.backend.read(id=id, projection=projection)
+            if p is not None:
+                self.cache.set(key, p, token)
+        finally:
+            self.cache.release(key[0])
+        return p
+
+    async def read_many(self, ids: list = None, projection: list = None) -> list:
+        """Load several pipelines by id, reading only the cache misses from the backend."""
+        keys = [self.cache.key(id, projection) for id in ids]
+        results = [self.cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, p in zip(keys, results) if p is None))
+        if missing:
+            tokens = [self.cache.reserve(key[0]) for key in missing]
+            try:
+                loaded = await self.backend.read_many(ids=[key[0] for key in missing], projection=projection)
+                for key, token, p in zip(missing, tokens, loaded):
+                    if p is not None:
+                        self.cache.set(key, p, token)
+            finally:
+                for key in missing:
+                    self.cache.release(key[0])
+            loaded = dict(zip(missing, loaded))
+            results = [p if p is not None else copy.deepcopy(loaded[key])
+                       for key, p in zip(keys, results)]
+        return results
+
+    async def list(self, cursor=None, limit=10, filter="", sort="", projection: list = None):
+        return await self.backend.list(cursor=cursor, limit=limit, filter=filter, sort=sort, projection=projection)
+
+    async def create(self, pipeline: Pipeline):
+        return await self.backend.create(pipeline)
+
+    async def create_many(self, pipelines: list = None) -> list:
+        return await self.backend.create_many(pipelines)
+
+    async def update_many(self, pipelines: list = None) -> list:
+        try:
+            return await self.backend.update_many(pipelines)
+        finally:
+            for pipeline in pipelines:
+                self.cache.invalidate(pipeline.id)
+
+    async def update(self, pipeline: Pipeline = None):
+        try:
+            return await self.backend.update(pipeline)
+        finally:
+            self.cache.invalidate(pipeline.id)
+
+    async def delete(self, id: uuid.UUID = None):
+        try:
+            return await self.backend.delete(id=id)
+        finally:
+            self.cache.invalidate(id)
+
+    async def patch_status(self, id: uuid.UUID = None, index: int = -1, fields: dict = None,
+                           exclude_states: list = None) -> bool:
+        try:
+            return await self.backend.patch_status(id=id, index=index, fields=fields, exclude_states=exclude_states)
+        finally:
+            self.cache.invalidate(id)
+
+    async def push_status(self, id: uuid.UUID = None, status=None) -> bool:
+        try:
+            return await self.backend.push_status(id=id, status=status)
+        finally:
+            self.cache.invalidate(id)
+
+    async def push_datasets(self, id: uuid.UUID = None, datasets: list = None) -> bool:
+        try:
+            return await self.backend.push_datasets(id=id, datasets=datasets)
+        finally:
+            self.cache.invalidate(id)
+
+    async def unset_fields(self, fields: list = None) -> int:
+        try:
+            return await self.backend.unset_fields(fields)
+        finally:
+            self.cache.invalidate()
+
+    async def watch(self):
+        async for id in self.backend.watch():
+            yield id
@@ -7,10 +7,13 @@ import uuid
 import weakref
 
 from bson.objectid import ObjectId
-from pymongo import AsyncMongoClient
+from fastapi.encoders import jsonable_encoder
+from pymongo import AsyncMongoClient, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError
 
+from kedro_graphql.exceptions import CreateManyError
 from kedro_graphql.logs.logger import logger
-from kedro_graphql.models import Pipeline
+from kedro_graphql.models import Pipeline, PipelineStatus, State
 
 from .base import BaseBackend
 
@@ -23,12 +26,37 @@ class MongoBackend(BaseBackend):
     thread safe and may only be used by a single event loop, so one client is created
     and cached per running event loop. Clients are also keyed by process id so the
     backend remains safe across ``fork`` (e.g. Celery's prefork worker pool).
+
+    The indexes declared in ``DEFAULT_INDEXES`` plus any custom ``indexes`` are
+    verified on ``startup`` and created if missing (unless ``create_indexes`` is
+    False, in which case missing indexes are only logged). Each index is a dict
+    with a ``keys`` list of ``[field, direction]`` pairs and optional
+    ``pymongo.IndexModel`` options, e.g.
+    ``{"keys": [["name", 1], ["created_at", -1]], "name": "name_created_at"}``.
     """
 
-    def __init__(self, uri=None, db=None, collection="pipelines"):
+    DEFAULT_INDEXES = [
+        {"keys": [["status.task_id", 1]]},
+        {"keys": [["created_at", -1], ["_id", -1]]},
+        {"keys": [["name", 1]]},
+        {"keys": [["tags.key", 1], ["tags.value", 1]]},
+        {"keys": [["parent", 1]]},
+    ]
+
+    @staticmethod
+    def config_kwargs(config: dict) -> dict:
+        return {"uri": config.get("KEDRO_GRAPHQL_MONGO_URI"),
+                "db": config.get("KEDRO_GRAPHQL_MONGO_DB_NAME"),
+                "collection": config.get("KEDRO_GRAPHQL_MONGO_DB_COLLECTION"),
+                "indexes": config.get("KEDRO_GRAPHQL_MONGO_INDEXES"),
+                "create_indexes": config.get("KEDRO_GRAPHQL_MONGO_CREATE_INDEXES", True)}
+
+    def __init__(self, uri=None, db=None, collection="pipelines", indexes=None, create_indexes=True):
         self.uri = uri
         self.db_name = db
         self.collection = collection
+        self.indexes = self.DEFAULT_INDEXES + list(indexes or [])
+        self.create_indexes = create_indexes
         self._pid = os.getpid()
         # Map the running event loop to its own AsyncMongoClient. Weak keys allow
         # clients to be garbage collected once their event loop is gone.
@@ -57,10 +85,56 @@ class MongoBackend(BaseBackend):
         """Return the configured collection bound to the current event loop."""
         return self._get_client()[self.db_name][self.collection]
 
+    @staticmethod
+    def _build_projection(projection: list = None):
+        """Translate a list of field paths into a MongoDB projection document.
+
+        ``_id`` is always included. Returns ``None`` (fetch the full document)
+        when no projection is given.
+        """
+        if projection is None:
+            return None
+        return {"_id": 1, **{field: 1 for field in projection}}
+
     async def startup(self, **kwargs):
-        """Startup hook. Verifies connectivity and warms the connection pool."""
+        """Startup hook. Verifies connectivity, warms the connection pool and ensures indexes."""
         await self._get_client().admin.command("ping")
         logger.info("Connected to the MongoDB database!")
+        await self.ensure_indexes()
+
+    @staticmethod
+    def _index_keys(index: dict) -> tuple:
+        """Return the normalized key pattern of an index spec e.g. ``(("name", 1),)``."""
+        keys = index["keys"]
+        if isinstance(keys, str):
+            keys = [[keys, 1]]
+        elif isinstance(keys, dict):
+            keys = keys.items()
+        return tuple((k, int(d) if isinstance(d, (int, float)) else d) for k, d in keys)
+
+    async def ensure_indexes(self) -> list:
+        """Verify the declared indexes exist, creating any that are missing.
+
+        Returns:
+            list: the index specs that were missing when this method was called.
+        """
+        collection = self._get_collection()
+
+        existing = {self._index_keys({"keys": info["key"]})
+                    for info in (await collection.index_information()).values()}
+        missing = [index for index in self.indexes if self._index_keys(index) not in existing]
+
+        for index in missing:
+            logger.warning(
+                f"MongoDB collection {self.db_name}.{self.collection} is missing index {list(self._index_keys(index))}")
+
+        if missing and self.create_indexes:
+            await collection.create_indexes([
+                IndexModel(list(self._index_keys(index)), **{k: v for k, v in index.items() if k != "keys"})
+                for index in missing])
+            logger.info(
+                f"Created {len(missing)} index(es) on MongoDB collection {self.db_name}.{self.collection}")
+        return missing
 
     async def shutdown(self, **kwargs):
         """Shutdown hook."""
@@ -70,46 +144,131 @@ class MongoBackend(BaseBackend):
         if client is not None:
             await client.close()
 
-    async def list(self, cursor: uuid.UUID = None, limit=10, filter="", sort=""):
+    @staticmethod
+    def _parse_sort(sort: str = "") -> list:
+        """Parse a sort string like ``"[('created_at', -1)]"`` into a list of tuples."""
+        if not sort:
+            return []
+        try:
+            sort = ast.literal_eval(sort)
+            # Validate that sort is a list of tuples like [('created_at', -1)]
+            if isinstance(sort, list) and all(isinstance(i, tuple) and len(i) == 2 and i[1] in (1, -1) for i in sort):
+                return sort
+            raise ValueError(
+                "Sort parameter should be a list of tuples like [('field', order)]")
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"Invalid sort parameter format: {e}")
+
+    @staticmethod
+    def _get_path(doc: dict, path: str):
+        """Return the value at a dotted ``path`` of a document, or ``None``."""
+        for part in path.split("."):
+            if not isinstance(doc, dict):
+                return None
+            doc = doc.get(part)
+        return doc
+
+    @staticmethod
+    def _keyset_predicate(sort: list, values: list, before: bool = False) -> dict:
+        """Build the range predicate selecting documents at or after ``values`` in ``sort`` order.
+
+        ``sort`` must end with the ``_id`` tiebreaker and ``values`` holds one value per
+        sort key. With ``before`` the predicate selects documents strictly before ``values``.
+
+        MongoDB sorts null and missing values before every other value, but ``$gt`` and
+        ``$lt`` only match values of the same type, so the null bracket is added explicitly:
+        when ``values`` holds a null every non-null value comes after it, and every null
+        or missing value comes before a non-null one.
+        """
+        clauses = []
+        for i, (field, direction) in enumerate(sort):
+            prefix = {f: v for (f, _), v in zip(sort[:i], values[:i])}
+            value = values[i]
+            greater = (direction == 1) != before
+            if value is None:
+                if greater:
+                    clauses.append({**prefix, field: {"$ne": None}})
+                continue
+            op = "$gt" if greater else "$lt"
+            if i == len(sort) - 1 and not before:
+                op += "e"
+            clauses.append({**prefix, field: {op: value}})
+            if not greater and field != "_id":
+                clauses.append({**prefix, field: None})
+        return {"$or": clauses}
+
+    async def list(self, cursor=None, limit=10, filter="", sort="", projection: list = None):
+        """List pipelines using keyset pagination.
+
+        Results are ordered by ``sort`` with ``_id`` as the final tiebreaker, so every
+        page is a range scan that an index on the sort keys can satisfy. ``cursor`` is
+        either a pipeline id (the first pipeline of the page) or a dict
+        ``{"id": ..., "values": [...], "before": bool}`` where ``values`` are the
+        stored values of the ``sort`` keys for that pipeline. When ``values`` are
+        missing they are looked up by id. With ``before`` the page ends just before
+        the cursor instead of starting at it.
+        """
         collection = self._get_collection()
 
+        sort = self._parse_sort(sort)
+        keys = []
+        for field, direction in sort:
+            if field == "_id":
+                break
+            keys.append((field, direction))
+        id_direction = dict(sort).get("_id", keys[-1][1] if keys else 1)
+        sort = keys + [("_id", id_direction)]
+
+        if projection is not None:
+            projection = list(projection) + [field for field, _ in keys]
+        projection = self._build_projection(projection)
+
         query = {}
         if len(filter) > 0:
-            filter = json.loads(filter)
-            query = filter
+            query = json.loads(filter)
+
+        before = False
         if cursor is not None:
-            query.update({'_id': {'$gte': ObjectId(cursor)}})
-
-        if sort:
-            try:
-                sort = ast.literal_eval(sort)
-                # Validate that sort is a list of tuples like [('created_at', -1)]
-                if isinstance(sort, list) and all(isinstance(i, tuple) and len(i) == 2 for i in sort):
-                    raw = collection.find(query).sort(sort).limit(limit)
-                else:
-                    raise ValueError(
-                        "Sort parameter should be a list of tuples like [('field', order)]")
-            except (ValueError, SyntaxError) as e:
-                raise ValueError(f"Invalid sort parameter format: {e}")
-        else:
-            raw = collection.find(query).limit(limit)
+            if not isinstance(cursor, dict):
+                cursor = {"id": cursor}
+            before = cursor.get("before", False)
+            id = ObjectId(cursor["id"])
+            values = cursor.get("values")
+            if keys and (values is None or len(values) != len(keys)):
+                doc = await collection.find_one({"_id": id}, {field: 1 for field, _ in keys})
+                values = [self._get_path(doc, field) for field, _ in keys] if doc else None
+
+            if keys and values is None:
+                # the cursor's pipeline no longer exists, fall back to the id alone
+                predicate = {"_id": {"$lt" if before else "$gte": id}}
+            else:
+                predicate = self._keyset_predicate(sort, list(values or []) + [id], before=before)
+            query = {"$and": [query, predicate]} if query else predicate
+
+        if before:
+            sort = [(field, -direction) for field, direction in sort]
+
+        raw = collection.find(query, projection).sort(sort).limit(limit)
 
         results = []
         async for r in raw:
             r["id"] = str(r["_id"])
             p = Pipeline.decode(r)
             results.append(p)
+        if before:
+            results.reverse()
         return results
 
-    async def read(self, id: uuid.UUID = None, task_id: str = None):
+    async def read(self, id: uuid.UUID = None, task_id: str = None, projection: list = None):
         """Load a pipeline by id or task_id"""
         collection = self._get_collection()
+        projection = self._build_projection(projection)
 
         if task_id:
             r = await collection.find_one(
-                {"status": {"$elemMatch": {"task_id": task_id}}})
+                {"status": {"$elemMatch": {"task_id": task_id}}}, projection)
         else:
-            r = await collection.find_one({"_id": ObjectId(id)})
+            r = await collection.find_one({"_id": ObjectId(id)}, projection)
 
         if r:
             r["id"] = str(r["_id"])
@@ -118,6 +277,33 @@ class MongoBackend(BaseBackend):
         else:
             return None
 
+    async def read_many(self, ids: list = None, projection: list = None) -> list:
+        """Load several pipelines by id with a single ``$in`` query"""
+        collection = self._get_collection()
+        projection = self._build_projection(projection)
+
+        object_ids = [ObjectId(id) for id in ids if ObjectId.is_valid(id)]
+        found = {}
+        async for r in collection.find({"_id": {"$in": object_ids}}, projection):
+            r["id"] = str(r["_id"])
+            found[r["id"]] = Pipeline.decode(r)
+        return [found.get(str(id)) for id in ids]
+
+    async def watch(self):
+        """Yield the ids of changed pipelines from a MongoDB change stream.
+
+        Change streams require a replica set or sharded cluster; on a standalone
+        server the ``OperationFailure`` raised by the server is propagated.
+        """
+        collection = self._get_collection()
+        async with await collection.watch() as stream:
+            async for change in stream:
+                if "documentKey" in change:
+                    yield str(change["documentKey"]["_id"])
+                else:
+                    # drop, rename or invalidate events affect every pipeline
+                    yield None
+
     async def create(self, pipeline: Pipeline):
         """Save a pipeline"""
         collection = self._get_collection()
@@ -130,6 +316,38 @@ class MongoBackend(BaseBackend):
         p = Pipeline.decode(created)
         return p
 
+    async def create_many(self, pipelines: list = None) -> list:
+        """Save several pipelines with a single unordered ``insert_many``.
+
+        Raises:
+            CreateManyError: if some of the documents were not inserted.
+        """
+        collection = self._get_collection()
+
+        documents = []
+        for pipeline in pipelines:
+            values = pipeline.encode()
+            values.pop("id")  # ids are assigned on insert
+            documents.append(values)
+        if not documents:
+            return []
+
+        # the driver assigns each document its _id before inserting it
+        errors = {}
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+            if not errors:
+                raise
+        created = []
+        for index, values in enumerate(documents):
+            values["id"] = str(values.pop("_id"))
+            created.append(None if index in errors else Pipeline.decode(values))
+        if errors:
+            raise CreateManyError(created, errors)
+        return created
+
     async def update(self, pipeline: Pipeline = None):
         """Update a pipeline"""
         collection = self._get_collection()
@@ -145,9 +363,86 @@ class MongoBackend(BaseBackend):
 
         return p
 
+    async def update_many(self, pipelines: list = None) -> list:
+        """Update several pipelines with a single ``bulk_write``"""
+        collection = self._get_collection()
+
+        requests = []
+        for pipeline in pipelines:
+            values = pipeline.encode()
+            values.pop("id")  # we dont want to update the id
+            requests.append(UpdateOne({"_id": ObjectId(pipeline.id)}, {"$set": values}))
+        if requests:
+            await collection.bulk_write(requests, ordered=False)
+        return list(pipelines)
+
     async def delete(self, id: uuid.UUID = None):
         """Delete a pipeline using id"""
         collection = self._get_collection()
 
         await collection.delete_one({"_id": ObjectId(id)})
         return id
+
+    async def patch_status(self, id: uuid.UUID = None, index: int = -1, fields: dict = None,
+                           exclude_states: list = None) -> bool:
+        """Atomically set fields on a single status entry of a pipeline.
+
+        Non-negative indexes are updated with a targeted ``$set`` on
+        ``status.<index>.<field>``. Negative indexes are resolved server side
+        with an aggregation pipeline update, so the last attempt can be patched
+        without reading the document first.
+        """
+        collection = self._get_collection()
+
+        values = jsonable_encoder(fields or {})
+        query = {"_id": ObjectId(id)}
+        if exclude_states:
+            query["$expr"] = {"$not": [{"$in": [
+                {"$arrayElemAt": ["$status.state", index]},
+                [State(s).value for s in exclude_states]]}]}
+
+        if index >= 0:
+            update = {"$set": {f"status.{index}.{k}": v for k, v in values.items()}}
+        else:
+            target = {"$add": [{"$size": "$status"}, index]}
+            # wrap values in $literal so strings such as "$foo" are not treated as field paths
+            patch = {k: {"$literal": v} for k, v in values.items()}
+            update = [{"$set": {"status": {"$map": {
+                "input": {"$range": [0, {"$size": "$status"}]},
+                "as": "i",
+                "in": {"$cond": [
+                    {"$eq": ["$$i", target]},
+                    {"$mergeObjects": [{"$arrayElemAt": ["$status", "$$i"]}, patch]},
+                    {"$arrayElemAt": ["$status", "$$i"]}]}
+            }}}}]
+
+        result = await collection.update_one(query, update)
+        return result.matched_count > 0
+
+    async def push_status(self, id: uuid.UUID = None, status: PipelineStatus = None) -> bool:
+        """Atomically append a new status entry to a pipeline with ``$push``."""
+        collection = self._get_collection()
+
+        result = await collection.update_one(
+            {"_id": ObjectId(id)}, {"$push": {"status": jsonable_encoder(status)}})
+        return result.matched_count > 0
+
+    async def push_datasets(self, id: uuid.UUID = None, datasets: list = None) -> bool:
+        """Atomically append datasets to the data catalog of a pipeline, which may be null."""
+        collection = self._get_collection()
+
+        appended = {"$literal": [d.encode() for d in datasets or []]}
+        result = await collection.update_one({"_id": ObjectId(id)}, [{"$set": {"data_catalog": {
+            "$concatArrays": [{"$ifNull": ["$data_catalog", []]}, appended]}}}])
+        return result.matched_count > 0
+
+    async def unset_fields(self, fields: list = None) -> int:
+        """Remove top level fields from every pipeline with a single ``update_many``."""
+        collection = self._get_collection()
+
+        if not fields:
+            return 0
+        result = await collection.update_many(
+            {"$or": [{field: {"$exists": True}} for field in fields]},
+            {"$unset": {field: "" for field in fields}})
+        return result.modified_count
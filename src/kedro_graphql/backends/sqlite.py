@@ -0,0 +1,569 @@
+import ast
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from bson.objectid import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from kedro_graphql.logs.logger import logger
+from kedro_graphql.models import Pipeline, PipelineStatus, State
+
+from .base import BaseBackend
+
+
+class SQLiteBackend(BaseBackend):
+    """SQLite backend storing each pipeline as a JSON document in a single table.
+
+    Frequently queried fields (``name``, ``created_at`` and the ``task_id`` of
+    the latest status) are exposed as generated columns and indexed. ``list``
+    accepts the same ``filter`` and ``sort`` strings as ``MongoBackend``:
+    filters are translated to SQL from a subset of the MongoDB query language
+    (see ``_translate_filter``), so no second query syntax leaks into clients.
+
+    ``sqlite3`` is blocking, so all I/O runs on a single dedicated thread that
+    owns the connection; coroutines hand work to it and never block the event
+    loop. The thread and connection are recreated after ``fork`` (e.g. Celery's
+    prefork worker pool). The database uses WAL journaling so the API server
+    and workers can share one file.
+
+    Pipeline ids are ``ObjectId`` strings, like those assigned by MongoDB, so
+    they sort by creation time and stay interchangeable between backends.
+    """
+
+    # pipeline fields holding arrays of documents, matched element-wise like MongoDB does
+    ARRAY_FIELDS = {"data_catalog", "nodes", "parameters", "status", "tags"}
+
+    # generated columns, keyed by the document path they expose
+    COLUMNS = {
+        "name": "json_extract(doc, '$.name')",
+        "created_at": "json_extract(doc, '$.created_at')",
+        "status.task_id": "json_extract(doc, '$.status[#-1].task_id')",
+    }
+
+    DEFAULT_INDEXES = [
+        {"keys": [["status.task_id", 1]]},
+        {"keys": [["created_at", -1], ["_id", -1]]},
+        {"keys": [["name", 1]]},
+    ]
+
+    # segments allowed in the document paths of filters, sorts and projections
+    PATH_SEGMENT = re.compile(r"[A-Za-z0-9_]+")
+
+    COMPARISONS = {"$eq": "IS", "$ne": "IS NOT", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+    @staticmethod
+    def config_kwargs(config: dict) -> dict:
+        return {"path": config.get("KEDRO_GRAPHQL_SQLITE_PATH", "kedro_graphql.db")}
+
+    def __init__(self, path="kedro_graphql.db", table="pipelines", indexes=None, create_indexes=True):
+        self.path = path
+        self.table = table
+        self.indexes = self.DEFAULT_INDEXES + list(indexes or [])
+        self.create_indexes = create_indexes
+        self._pid = os.getpid()
+        self._executor = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the single thread executor owning the connection."""
+        pid = os.getpid()
+        with self._lock:
+            if pid != self._pid:
+                # Process was forked; the parent's thread does not exist here.
+                self._executor = None
+                self._connection = None
+                self._pid = pid
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kedro-graphql-sqlite")
+            return self._executor
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run ``fn(connection, *args, **kwargs)`` on the connection's thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(self._call, fn, *args, **kwargs))
+
+    def _call(self, fn, *args, **kwargs):
+        if self._connection is None:
+            # the schema is created with the first connection, backends used by
+            # the celery workers are never started up
+            connection = self._connect()
+            self._create_table(connection)
+            if self.create_indexes:
+                self._ensure_indexes(connection)
+            self._connection = connection
+        return fn(self._connection, *args, **kwargs)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        connection.create_function("regexp", 2, self._regexp, deterministic=True)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @staticmethod
+    def _regexp(pattern, value) -> bool:
+        """Implements SQLite's ``REGEXP`` operator with Python's ``re.search`` semantics, like ``$regex``."""
+        if value is None or not isinstance(value, str):
+            return False
+        return re.search(pattern, value) is not None
+
+    async def startup(self, **kwargs):
+        """Startup hook. Connects, which creates the table, and ensures indexes."""
+        await self.ensure_indexes()
+        logger.info(f"Connected to the SQLite database {self.path}!")
+
+    def _create_table(self, connection):
+        columns = "".join(f", {self._column(path)} TEXT GENERATED ALWAYS AS ({expr}) VIRTUAL"
+                          for path, expr in self.COLUMNS.items())
+        connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" (id TEXT PRIMARY KEY, doc TEXT NOT NULL{columns})')
+
+    async def shutdown(self, **kwargs):
+        """Shutdown hook. Closes the connection and stops its thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, self._close)
+        executor.shutdown(wait=False)
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _column(path: str) -> str:
+        """Return the name of the generated column exposing ``path``."""
+        return path.replace(".", "_")
+
+    @classmethod
+    def _json_path(cls, path: str) -> str:
+        """Translate a dotted document path into a SQLite JSON path e.g. ``$.status[0].state``.
+
+        The paths of filters, sorts and projections come from clients and are
+        embedded in the SQL, so each segment must be a plain field name or index.
+        """
+        json_path = "$"
+        for part in str(path).split("."):
+            if not cls.PATH_SEGMENT.fullmatch(part):
+                raise ValueError(f"Invalid field path {path!r}")
+            json_path += f"[{part}]" if part.isdigit() else f'."{part}"'
+        return json_path
+
+    def _expr(self, path: str, source: str = "doc") -> str:
+        """Return the SQL expression of a scalar document path."""
+        if path in ("_id", "id"):
+            return "id"
+        if source == "doc" and path in self.COLUMNS:
+            return self._column(path)
+        return f"json_extract({source}, '{self._json_path(path)}')"
+
+    def _split_array_path(self, path: str):
+        """Split ``path`` into ``(array field, element path)`` when it traverses an array field."""
+        field, _, rest = path.partition(".")
+        if field in self.ARRAY_FIELDS and not rest.split(".")[0].isdigit():
+            return field, rest
+        return None, path
+
+    def _index_keys(self, index: dict) -> tuple:
+        """Return the normalized key pattern of an index spec e.g. ``(("name", 1),)``."""
+        keys = index["keys"]
+        if isinstance(keys, str):
+            keys = [[keys, 1]]
+        elif isinstance(keys, dict):
+            keys = keys.items()
+        return tuple((k, int(d)) for k, d in keys)
+
+    async def ensure_indexes(self) -> list:
+        """Verify the declared indexes exist, creating any that are missing.
+
+        Index keys are document paths like ``MongoBackend``'s. Paths exposed by a
+        generated column index the column, any other scalar path is indexed by
+        expression. Paths inside array fields cannot be indexed and are skipped.
+
+        Returns:
+            list: the index specs that were missing when this method was called.
+        """
+        return await self._run(self._ensure_indexes)
+
+    def _ensure_indexes(self, connection) -> list:
+        existing = {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (self.table,))}
+        missing = []
+        for index in self.indexes:
+            keys = self._index_keys(index)
+            if any(field not in self.COLUMNS and self._split_array_path(field)[0] for field, _ in keys):
+                logger.warning(f"SQLite cannot index array field(s) {list(keys)}, skipping index")
+                continue
+            name = index.get("name") or "_".join([self.table] + [f"{self._column(f)}_{d}" for f, d in keys])
+            name = name.replace("-", "_")
+            if name in existing:
+                continue
+            missing.append(index)
+            logger.warning(f"SQLite table {self.table} is missing index {list(keys)}")
+            if self.create_indexes:
+                columns = ", ".join(f"{self._expr(f)} {'DESC' if d == -1 else 'ASC'}" for f, d in keys)
+                connection.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{self.table}" ({columns})')
+        if missing and self.create_indexes:
+            logger.info(f"Created {len(missing)} index(es) on SQLite table {self.table}")
+        return missing
+
+    def _translate_filter(self, query: dict, source: str = "doc") -> tuple:
+        """Translate a MongoDB query document into a SQL condition and its parameters.
+
+        Supports field paths (dotted, matching any element of array fields), the
+        comparison operators ``$eq``, ``$ne``, ``$gt``, ``$gte``, ``$lt``, ``$lte``,
+        ``$in``, ``$nin``, ``$exists`` and ``$regex`` (with ``$options`` "i", "m",
+        "s", "x"), ``$not``, ``$elemMatch`` and the logical operators ``$and``,
+        ``$or`` and ``$nor``. Anything else raises ``ValueError``.
+        """
+        clauses, params = [], []
+        for key, value in query.items():
+            if key in ("$and", "$or", "$nor"):
+                if not isinstance(value, list) or not value:
+                    raise ValueError(f"{key} requires a non-empty list")
+                parts = [self._translate_filter(q, source) for q in value]
+                sql = f" {'AND' if key == '$and' else 'OR'} ".join(f"({s})" for s, _ in parts)
+                clauses.append(f"NOT ({sql})" if key == "$nor" else f"({sql})")
+                params += [p for _, ps in parts for p in ps]
+            elif key.startswith("$"):
+                raise ValueError(f"Unsupported filter operator {key}")
+            else:
+                sql, ps = self._translate_field(key, value, source)
+                clauses.append(sql)
+                params += ps
+        return " AND ".join(clauses) or "1", params
+
+    def _translate_field(self, path: str, condition, source: str = "doc") -> tuple:
+        """Translate the condition on a single field path."""
+        if isinstance(condition, dict) and "$elemMatch" in condition:
+            field, rest = self._split_array_path(path)
+            if field is None or rest:
+                field = path
+            sql, params = self._translate_filter(condition["$elemMatch"], source="e.value")
+            return (f"EXISTS (SELECT 1 FROM json_each({source}, '{self._json_path(field)}') AS e WHERE {sql})",
+                    params)
+
+        field, rest = self._split_array_path(path) if source == "doc" else (None, path)
+        if field is None:
+            return self._translate_condition(self._expr(path, source), condition)
+
+        # like MongoDB, a condition on an array field path matches if any element
+        # matches, and negated conditions match if no element matches
+        negated = isinstance(condition, dict) and any(op in ("$ne", "$nin") for op in condition)
+        if negated:
+            condition = {{"$ne": "$eq", "$nin": "$in"}.get(op, op): v for op, v in condition.items()}
+        element = f"json_extract(e.value, '{self._json_path(rest)}')" if rest else "e.value"
+        sql, params = self._translate_condition(element, condition)
+        exists = f"EXISTS (SELECT 1 FROM json_each(doc, '{self._json_path(field)}') AS e WHERE {sql})"
+        return (f"NOT {exists}" if negated else exists), params
+
+    def _translate_condition(self, expr: str, condition) -> tuple:
+        """Translate an operator document (or a literal, meaning ``$eq``) applied to ``expr``."""
+        if not (isinstance(condition, dict) and any(k.startswith("$") for k in condition)):
+            condition = {"$eq": condition}
+
+        clauses, params = [], []
+        options = condition.get("$options", "")
+        for op, value in condition.items():
+            if op == "$options":
+                continue
+            elif op in self.COMPARISONS:
+                sql = self.COMPARISONS[op]
+                if isinstance(value, (dict, list)):
+                    clauses.append(f"{expr} {sql} json(?)")
+                    value = json.dumps(value, separators=(",", ":"))
+                elif value is None and op not in ("$eq", "$ne"):
+                    # nothing orders against null in MongoDB except null itself
+                    clauses.append(f"{expr} IS NULL" if op in ("$gte", "$lte") else "0")
+                    continue
+                elif op == "$eq" and value is not None:
+                    # unlike IS, = lets SQLite use the indexes on generated columns
+                    clauses.append(f"{expr} = ?")
+                else:
+                    clauses.append(f"{expr} {sql} ?")
+                params.append(value)
+            elif op in ("$in", "$nin"):
+                if not isinstance(value, list):
+                    raise ValueError(f"{op} requires a list")
+                sql = " OR ".join(f"{expr} = json(?)" if isinstance(v, (dict, list)) else f"{expr} IS ?"
+                                  for v in value) or "0"
+                clauses.append(f"({sql})" if op == "$in" else f"NOT ({sql})")
+                params += [json.dumps(v) if isinstance(v, (dict, list)) else v for v in value]
+            elif op == "$exists":
+                clauses.append(f"{expr} IS {'NOT ' if value else ''}NULL")
+            elif op == "$regex":
+                flags = "".join(f for f in options if f in "imsx")
+                clauses.append(f"{expr} REGEXP ?")
+                params.append(f"(?{flags}){value}" if flags else value)
+            elif op == "$not":
+                sql, ps = self._translate_condition(expr, value)
+                clauses.append(f"NOT ({sql})")
+                params += ps
+            else:
+                raise ValueError(f"Unsupported filter operator {op}")
+        return " AND ".join(clauses) or "1", params
+
+    @staticmethod
+    def _parse_sort(sort: str = "") -> list:
+        """Parse a sort string like ``"[('created_at', -1)]"`` into a list of tuples."""
+        if not sort:
+            return []
+        try:
+            sort = ast.literal_eval(sort)
+            # Validate that sort is a list of tuples like [('created_at', -1)]
+            if isinstance(sort, list) and all(isinstance(i, tuple) and len(i) == 2 and i[1] in (1, -1) for i in sort):
+                return sort
+            raise ValueError(
+                "Sort parameter should be a list of tuples like [('field', order)]")
+        except (ValueError, SyntaxError) as e:
+            raise ValueError(f"Invalid sort parameter format: {e}")
+
+    def _sort_expr(self, path: str, direction: int) -> str:
+        """Return the SQL expression a sort key orders by.
+
+        Like MongoDB, array field paths sort by their smallest element in ascending
+        order and by their largest element in descending order.
+        """
+        field, rest = self._split_array_path(path)
+        if field is None:
+            return self._expr(path)
+        return (f"(SELECT {'MIN' if direction == 1 else 'MAX'}(json_extract(e.value, '{self._json_path(rest)}')) "
+                f"FROM json_each(doc, '{self._json_path(field)}') AS e)")
+
+    @staticmethod
+    def _keyset_predicate(exprs: list, directions: list, values: list, before: bool = False) -> tuple:
+        """Build the range predicate selecting rows at or after ``values`` in sort order.
+
+        NULL sorts first, as in MongoDB, which is also SQLite's order for ascending
+        keys. With ``before`` the predicate selects rows strictly before ``values``.
+        """
+        def compare(expr, direction, value, strict):
+            if (direction == 1) != before:
+                # after the value
+                if value is None:
+                    return (f"{expr} IS NOT NULL", []) if strict else ("1", [])
+                return f"{expr} {'>' if strict else '>='} ?", [value]
+            if value is None:
+                return ("0", []) if strict else (f"{expr} IS NULL", [])
+            return f"({expr} {'<' if strict else '<='} ? OR {expr} IS NULL)", [value]
+
+        clauses, params = [], []
+        for i, (expr, direction) in enumerate(zip(exprs, directions)):
+            parts = [(f"{e} IS ?", [v]) for e, v in zip(exprs[:i], values[:i])]
+            parts.append(compare(expr, direction, values[i], strict=i < len(exprs) - 1 or before))
+            clauses.append(" AND ".join(sql for sql, _ in parts))
+            params += [p for _, ps in parts for p in ps]
+        return " OR ".join(f"({c})" for c in clauses), params
+
+    def _select(self, projection: list = None) -> str:
+        """Return the columns to select for a projection.
+
+        Projections are applied to top level fields, which is enough to avoid
+        decoding large unrequested fields such as ``nodes`` or ``data_catalog``.
+        """
+        if projection is None:
+            return "id, doc"
+        for path in projection:
+            # rejects the paths that are not plain field names
+            self._json_path(path)
+        fields = list(dict.fromkeys(path.split(".")[0] for path in projection if path not in ("_id", "id")))
+        if not fields:
+            return "id, '{}'"
+        pairs = ", ".join(f"'{f}', json_extract(doc, '{self._json_path(f)}')" for f in fields)
+        return f"id, json_object({pairs})"
+
+    @staticmethod
+    def _decode(row) -> Pipeline:
+        values = json.loads(row[1])
+        # drop fields that were projected but are missing from the document
+        values = {k: v for k, v in values.items() if v is not None}
+        values["id"] = row[0]
+        return Pipeline.decode(values)
+
+    async def list(self, cursor=None, limit=10, filter="", sort="", projection: list = None):
+        """List pipelines using keyset pagination.
+
+        Follows the semantics of ``MongoBackend.list``: results are ordered by
+        ``sort`` with the id as the final tiebreaker, and ``cursor`` is either a
+        pipeline id or a dict ``{"id": ..., "values": [...], "before": bool}``.
+        """
+        sort = self._parse_sort(sort)
+        keys = []
+        for field, direction in sort:
+            if field == "_id":
+                break
+            keys.append((field, direction))
+        id_direction = dict(sort).get("_id", keys[-1][1] if keys else 1)
+
+        exprs = [self._sort_expr(field, direction) for field, direction in keys] + ["id"]
+        directions = [direction for _, direction in keys] + [id_direction]
+
+        where, params = self._translate_filter(json.loads(filter)) if len(filter) > 0 else ("1", [])
+        return await self._run(self._list, exprs, directions, where, params, cursor, limit, projection)
+
+    def _list(self, connection, exprs, directions, where, params, cursor, limit, projection):
+        before = False
+        if cursor is not None:
+            if not isinstance(cursor, dict):
+                cursor = {"id": cursor}
+            before = cursor.get("before", False)
+            id = str(cursor["id"])
+            values = cursor.get("values")
+            if len(exprs) > 1 and (values is None or len(values) != len(exprs) - 1):
+                row = connection.execute(
+                    f'SELECT {", ".join(exprs[:-1])} FROM "{self.table}" WHERE id = ?', (id,)).fetchone()
+                values = list(row) if row else None
+
+            if len(exprs) > 1 and values is None:
+                # the cursor's pipeline no longer exists, fall back to the id alone
+                predicate, ps = f"id {'<' if before else '>='} ?", [id]
+            else:
+                predicate, ps = self._keyset_predicate(exprs, directions, list(values or []) + [id], before=before)
+            where = f"({where}) AND ({predicate})"
+            params = params + ps
+
+        if before:
+            directions = [-direction for direction in directions]
+        order = ", ".join(f"{e} {'ASC' if d == 1 else 'DESC'}" for e, d in zip(exprs, directions))
+        rows = connection.execute(
+            f'SELECT {self._select(projection)} FROM "{self.table}" WHERE {where} ORDER BY {order} LIMIT ?',
+            params + [limit]).fetchall()
+
+        results = [self._decode(row) for row in rows]
+        if before:
+            results.reverse()
+        return results
+
+    async def read(self, id: uuid.UUID = None, task_id: str = None, projection: list = None):
+        """Load a pipeline by id or task_id"""
+        return await self._run(self._read, id, task_id, projection)
+
+    def _read(self, connection, id, task_id, projection):
+        select = self._select(projection)
+        if task_id:
+            # the indexed column holds the task of the latest attempt only
+            row = connection.execute(
+                f'SELECT {select} FROM "{self.table}" WHERE {self._column("status.task_id")} = ?',
+                (task_id,)).fetchone()
+            if row is None:
+                row = connection.execute(
+                    f'SELECT {select} FROM "{self.table}" WHERE EXISTS (SELECT 1 FROM '
+                    f"json_each(doc, '$.status') AS e WHERE json_extract(e.value, '$.task_id') = ?)",
+                    (task_id,)).fetchone()
+        else:
+            row = connection.execute(f'SELECT {select} FROM "{self.table}" WHERE id = ?', (str(id),)).fetchone()
+        return self._decode(row) if row else None
+
+    async def read_many(self, ids: list = None, projection: list = None) -> list:
+        """Load several pipelines by id with a single ``IN`` query"""
+        return await self._run(self._read_many, [str(id) for id in ids], projection)
+
+    def _read_many(self, connection, ids, projection):
+        found = {}
+        if ids:
+            rows = connection.execute(
+                f'SELECT {self._select(projection)} FROM "{self.table}" WHERE id IN ({", ".join("?" for _ in ids)})',
+                ids)
+            found = {row[0]: self._decode(row) for row in rows}
+        return [found.get(id) for id in ids]
+
+    @staticmethod
+    def _encode(pipeline: Pipeline) -> dict:
+        values = pipeline.encode()
+        values.pop("id")  # the id is stored in its own column
+        return values
+
+    async def create(self, pipeline: Pipeline):
+        """Save a pipeline"""
+        return (await self.create_many([pipeline]))[0]
+
+    async def create_many(self, pipelines: list = None) -> list:
+        """Save several pipelines in a single transaction"""
+        documents = [(str(ObjectId()), self._encode(pipeline)) for pipeline in pipelines]
+        if not documents:
+            return []
+        await self._run(self._write_many, f'INSERT INTO "{self.table}" (doc, id) VALUES (?, ?)', documents)
+        created = []
+        for id, values in documents:
+            values["id"] = id
+            created.append(Pipeline.decode(values))
+        return created
+
+    def _write_many(self, connection, sql, documents):
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(sql, [(json.dumps(values), id) for id, values in documents])
+
+    async def update(self, pipeline: Pipeline = None):
+        """Update a pipeline"""
+        await self.update_many([pipeline])
+        return await self.read(id=pipeline.id)
+
+    async def update_many(self, pipelines: list = None) -> list:
+        """Update several pipelines in a single transaction"""
+        documents = [(str(pipeline.id), self._encode(pipeline)) for pipeline in pipelines]
+        if documents:
+            await self._run(self._write_many, f'UPDATE "{self.table}" SET doc = ? WHERE id = ?', documents)
+        return list(pipelines)
+
+    async def delete(self, id: uuid.UUID = None):
+        """Delete a pipeline using id"""
+        await self._run(lambda connection: connection.execute(f'DELETE FROM "{self.table}" WHERE id = ?', (str(id),)))
+        return id
+
+    async def patch_status(self, id: uuid.UUID = None, index: int = -1, fields: dict = None,
+                           exclude_states: list = None) -> bool:
+        """Atomically set fields on a single status entry of a pipeline with ``json_set``."""
+        position = f"#{index}" if index < 0 else str(index)
+        sets = "".join(f", '$.status[{position}]{self._json_path(k)[1:]}', json(?)" for k in (fields or {}))
+        params = [json.dumps(v) for v in jsonable_encoder(fields or {}).values()]
+
+        sql = (f'UPDATE "{self.table}" SET doc = json_set(doc{sets}) '
+               f"WHERE id = ? AND json_array_length(doc, '$.status') >= ?")
+        params += [str(id), -index if index < 0 else index + 1]
+        if exclude_states:
+            states = [State(s).value for s in exclude_states]
+            state = f"json_extract(doc, '$.status[{position}].state')"
+            sql += f" AND ({state} IS NULL OR {state} NOT IN ({', '.join('?' for _ in states)}))"
+            params += states
+
+        cursor = await self._run(lambda connection: connection.execute(sql, params))
+        return cursor.rowcount > 0
+
+    async def push_status(self, id: uuid.UUID = None, status: PipelineStatus = None) -> bool:
+        """Atomically append a new status entry to a pipeline with ``json_insert``."""
+        cursor = await self._run(lambda connection: connection.execute(
+            f"UPDATE \"{self.table}\" SET doc = json_insert(doc, '$.status[#]', json(?)) WHERE id = ?",
+            (json.dumps(jsonable_encoder(status)), str(id))))
+        return cursor.rowcount > 0
+
+    async def push_datasets(self, id: uuid.UUID = None, datasets: list = None) -> bool:
+        """Atomically append datasets to the data catalog of a pipeline, which may be null."""
+        cursor = await self._run(lambda connection: connection.execute(
+            f"UPDATE \"{self.table}\" SET doc = json_set(doc, '$.data_catalog', "
+            "(SELECT json_group_array(json(value)) FROM (SELECT 0 AS part, key, value FROM json_each(doc, '$.data_catalog') "
+            "WHERE json_type(doc, '$.data_catalog') = 'array' UNION ALL SELECT 1, key, value FROM json_each(?) ORDER BY part, key))) WHERE id = ?",
+            (json.dumps([d.encode() for d in datasets or []]), str(id))))
+        return cursor.rowcount > 0
+
+    async def unset_fields(self, fields: list = None) -> int:
+        """Remove top level fields from every pipeline with a single ``json_remove``."""
+        if not fields:
+            return 0
+        paths = [self._json_path(field) for field in fields]
+        cursor = await self._run(lambda connection: connection.execute(
+            f'UPDATE "{self.table}" SET doc = json_remove(doc, {", ".join("?" for _ in paths)}) '
+            f'WHERE {" OR ".join("json_type(doc, ?) IS NOT NULL" for _ in paths)}', paths + paths))
+        return cursor.rowcount
@@ -1,6 +1,8 @@
 from celery import Celery
 from celery import signals
 
+from .backends.cached import CachedBackend
+
 
 def celery_app(config, backend, schema):
     app = Celery()
@@ -20,7 +22,9 @@ def celery_app(config, backend, schema):
         broker_connection_retry_on_startup = True
 
     app.config_from_object(Config)
-    app.kedro_graphql_backend = backend
+    # the cache is invalidated by a task started with the API, which the workers
+    # never start up, so they read and write the wrapped backend directly
+    app.kedro_graphql_backend = backend.backend if isinstance(backend, CachedBackend) else backend
     app.kedro_graphql_schema = schema
     app.kedro_graphql_config = config
     return app
@@ -1,12 +1,14 @@
 from gql import Client, gql
 from gql.transport.aiohttp import AIOHTTPTransport
 from gql.transport.websockets import WebsocketsTransport
-from kedro_graphql.models import PipelineInput, Pipeline, Pipelines, PipelineEvent, PipelineLogMessage, DataSetInput, SignedUrl, SignedUrls
+from kedro_graphql.models import CreatePipelineResult, PipelineInput, Pipeline, Pipelines, PipelineEvent, PipelineLogBatch, PipelineLogHistory, PipelineLogMessage, PipelineProfileSummary, PipelineProgress, DataSetInput, SignedUrl, SignedUrls
 from kedro_graphql.config import load_config
+import asyncio
 import backoff
 from gql.transport.exceptions import TransportQueryError
 from typing import Optional, List
 import logging
+import time
 
 logger = logging.getLogger("kedro-graphql")
 CONFIG = load_config()
@@ -142,6 +144,29 @@ class KedroGraphqlClient():
         result = await self.execute_query(query, variable_values={"pipeline": pipeline_input.encode(encoder="graphql"), "uniquePaths": unique_paths})
         return Pipeline.decode(result["createPipeline"], decoder="graphql")
 
+    async def create_pipelines(self, pipeline_inputs: List[PipelineInput] = None, unique_paths: List[str] = None):
+        """Create several pipelines with a single request.
+
+        Kwargs:
+            pipeline_inputs (List[PipelineInput]): pipeline input objects
+            unique_paths (List[str]): dataset names to create unique filepaths for
+
+        Returns:
+            List[CreatePipelineResult]: per pipeline results, in the order of pipeline_inputs, holding
+                the created pipeline and/or an error message
+        """
+        query = """
+            mutation createPipelines($pipelines: [PipelineInput!]!, $uniquePaths: [String!]) {
+              createPipelines(pipelines: $pipelines, uniquePaths: $uniquePaths) {
+                pipeline """ + self.pipeline_gql + """
+                error
+              }
+            }
+        """
+
+        result = await self.execute_query(query, variable_values={"pipelines": [p.encode(encoder="graphql") for p in pipeline_inputs], "uniquePaths": unique_paths})
+        return CreatePipelineResult.decode(result, decoder="graphql")
+
     async def read_pipeline(self, id: str = None):
         """Read a pipeline.
         Kwargs:
@@ -164,8 +189,9 @@ class KedroGraphqlClient():
 
         Kwargs:
             limit (int): limit
-            cursor (str): cursor
+            cursor (str): cursor, e.g. ``page_meta.next_cursor`` or ``page_meta.previous_cursor`` of a previous result
             filter (str): a valid MongoDb document query filter https://www.mongodb.com/docs/manual/core/document/#std-label-document-query-filter.
+            sort (str): a list of (field, direction) tuples e.g. "[('created_at', -1)]"
 
         Returns:
             Pipelines (list): an list of pipeline objects
@@ -175,6 +201,7 @@ class KedroGraphqlClient():
               readPipelines(limit: $limit, cursor: $cursor, filter: $filter, sort: $sort) { 
                 pageMeta {
                   nextCursor
+                  previousCursor
                 }
                 pipelines """ + self.pipeline_gql + """
               }
@@ -366,33 +393,213 @@ class KedroGraphqlClient():
             async for result in session.subscribe(query, variable_values={"id": str(id)}):
                 yield PipelineEvent.decode(result, decoder="graphql")
 
-    @backoff.on_exception(backoff.expo, Exception, max_time=60, giveup=lambda e: isinstance(e, TransportQueryError))
-    async def pipeline_logs(self, id: str = None):
+    async def pipeline_logs(self, id: str = None, after_message_id: str = None, level: str = None,
+                            logger_name: str = None):
         """Subscribe to pipeline logs.
 
+        A dropped connection is retried with exponential backoff for up to 60
+        seconds, resuming after the last message received.
+
         Kwargs:
             id (str): pipeline id
+            after_message_id (str): only receive the messages after this one
+            level (str): only receive messages of this level or above, e.g. "WARNING"
+            logger_name (str): only receive messages of this logger and its children
 
         Returns:
             PipelineLogMessage (generator): a generator of PipelineLogMessage objects
         """
+        query = gql(
+            """
+            subscription pipelineLogs($id: String!, $afterMessageId: String, $level: String, $logger: String) {
+              pipelineLogs(id: $id, afterMessageId: $afterMessageId, level: $level, logger: $logger) {
+                id
+                message
+                messageId
+                taskId
+                time
+                level
+                logger
+              }
+            }
+        """
+        )
+        attempts = 0
+        retry_deadline = None
+        while True:
+            try:
+                async with Client(
+                    transport=WebsocketsTransport(url=self.uri_ws, headers=self._headers),
+                ) as session:
+                    logger.info("started pipeline logs subscription")
+                    async for result in session.subscribe(query, variable_values={"id": str(id),
+                                                                                  "afterMessageId": after_message_id,
+                                                                                  "level": level,
+                                                                                  "logger": logger_name}):
+                        message = PipelineLogMessage.decode(result, decoder="graphql")
+                        after_message_id = message.message_id
+                        attempts, retry_deadline = 0, None
+                        yield message
+                return
+            except TransportQueryError:
+                raise
+            except Exception as e:
+                now = time.monotonic()
+                retry_deadline = retry_deadline or now + 60
+                if now >= retry_deadline:
+                    raise
+                delay = min(2 ** attempts, retry_deadline - now)
+                attempts += 1
+                logger.info(f"pipeline logs subscription dropped ({e}), resuming in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def pipeline_log_history(self, id: str = None, limit: int = 100, cursor: str = None, level: str = None,
+                                   logger_name: str = None):
+        """Read a page of pipeline logs, including the logs archived after the run.
+
+        Kwargs:
+            id (str): pipeline id
+            limit (int): maximum number of messages
+            cursor (str): message id to read after, e.g. ``page_meta.next_cursor`` of a previous result
+            level (str): only return messages of this level or above, e.g. "WARNING"
+            logger_name (str): only return messages of this logger and its children
+
+        Returns:
+            PipelineLogHistory: the page of log messages
+        """
+        query = """
+            query pipelineLogHistory($id: String!, $limit: Int!, $cursor: String, $level: String, $logger: String) {
+              pipelineLogHistory(id: $id, limit: $limit, cursor: $cursor, level: $level, logger: $logger) {
+                pageMeta {
+                  nextCursor
+                  previousCursor
+                }
+                messages {
+                  id
+                  message
+                  messageId
+                  taskId
+                  time
+                  level
+                  logger
+                }
+              }
+            }
+        """
+
+        result = await self.execute_query(query, variable_values={"id": str(id), "limit": limit, "cursor": cursor,
+                                                                  "level": level, "logger": logger_name})
+        return PipelineLogHistory.decode(result, decoder="graphql")
+
+    async def pipeline_profile_summary(self, name: str = None, limit: int = 20):
+        """Summarise the node profiles of the latest runs of a pipeline.
+
+        Kwargs:
+            name (str): pipeline name
+            limit (int): number of latest pipelines summarised
+
+        Returns:
+            PipelineProfileSummary: the profiled nodes, slowest first
+        """
+        query = """
+            query pipelineProfileSummary($name: String!, $limit: Int!) {
+              pipelineProfileSummary(name: $name, limit: $limit) {
+                name
+                runs
+                nodes {
+                  node
+                  runs
+                  failures
+                  meanWallTime
+                  maxWallTime
+                  meanCpuTime
+                  meanLoadTime
+                  meanSaveTime
+                  maxPeakRssDeltaKb
+                }
+              }
+            }
+        """
+
+        result = await self.execute_query(query, variable_values={"name": name, "limit": limit})
+        return PipelineProfileSummary.decode(result, decoder="graphql")
+
+    @backoff.on_exception(backoff.expo, Exception, max_time=60, giveup=lambda e: isinstance(e, TransportQueryError))
+    async def pipeline_log_batches(self, id: str = None, max_batch: int = 100, max_latency_ms: int = 250):
+        """Subscribe to pipeline logs in batches.
+
+        Kwargs:
+            id (str): pipeline id
+            max_batch (int): maximum number of messages per batch
+            max_latency_ms (int): maximum time in milliseconds a message waits for its batch to fill
+
+        Returns:
+            PipelineLogBatch (generator): a generator of PipelineLogBatch objects
+        """
         async with Client(
             transport=WebsocketsTransport(url=self.uri_ws, headers=self._headers),
         ) as session:
 
             query = gql(
                 """
-                subscription pipelineLogs($id: String!) {
-                  pipelineLogs(id: $id) {
+                subscription pipelineLogBatches($id: String!, $maxBatch: Int!, $maxLatencyMs: Int!) {
+                  pipelineLogBatches(id: $id, maxBatch: $maxBatch, maxLatencyMs: $maxLatencyMs) {
                     id
-                    message
-                    messageId
                     taskId
-                    time
+                    messages {
+                      id
+                      message
+                      messageId
+                      taskId
+                      time
+                      level
+                      logger
+                    }
+                  }
+                }
+            """
+            )
+            logger.info("started pipeline log batches subscription")
+            async for result in session.subscribe(query, variable_values={"id": str(id),
+                                                                          "maxBatch": max_batch,
+                                                                          "maxLatencyMs": max_latency_ms}):
+                yield PipelineLogBatch.decode(result, decoder="graphql")
+
+    async def pipeline_progress(self, id: str = None):
+        """Subscribe to the node progress of a pipeline run.
+
+        Kwargs:
+            id (str): pipeline id
+
+        Returns:
+            PipelineProgress (generator): a generator of PipelineProgress objects
+        """
+        async with Client(
+            transport=WebsocketsTransport(url=self.uri_ws, headers=self._headers),
+        ) as session:
+
+            query = gql(
+                """
+                subscription pipelineProgress($id: String!) {
+                  pipelineProgress(id: $id) {
+                    id
+                    taskId
+                    session
+                    total
+                    completed
+                    running
+                    failed
+                    finished
+                    lastEvent {
+                      event
+                      node
+                      timestamp
+                      error
+                    }
                   }
                 }
             """
             )
-            logger.info("started pipeline logs subscription")
+            logger.info("started pipeline progress subscription")
             async for result in session.subscribe(query, variable_values={"id": str(id)}):
-                yield PipelineLogMessage.decode(result, decoder="graphql")
+                yield PipelineProgress.decode(result, decoder="graphql")
@@ -0,0 +1,114 @@
+"""Request-scoped batching and caching of backend reads."""
+
+import copy
+from collections import defaultdict
+from typing import List, Optional
+
+from strawberry.dataloader import DataLoader
+from strawberry.extensions import SchemaExtension
+
+from .models import Pipeline
+
+PIPELINE_LOADER_KEY = "pipeline_loader"
+
+
+class PipelineLoader:
+    """Batches ``read`` calls made in the same event loop tick into a single
+    ``read_many`` call on the backend and memoizes the results.
+
+    A loader is meant to live for a single GraphQL operation (see
+    ``DataLoaderExtension``) so memoized pipelines never outlive the request.
+    Resolvers that write a pipeline should ``clear`` it afterwards. Every load
+    returns a copy, so a resolver modifying its pipeline does not change what
+    the other resolvers of the request are given.
+
+    Example:
+        loader = get_pipeline_loader(info)
+        parent = await loader.load(pipeline.parent, projection=["name"])
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._keys = defaultdict(set)
+        self._loader = DataLoader(load_fn=self._load_batch)
+
+    async def _load_batch(self, keys: List[tuple]) -> List[Optional[Pipeline]]:
+        """Load a batch of ``(id, projection)`` keys with one backend call per projection."""
+        if not keys:
+            return []
+        ids_by_projection = defaultdict(list)
+        for id, projection in keys:
+            ids_by_projection[projection].append(id)
+
+        loaded = {}
+        for projection, ids in ids_by_projection.items():
+            pipelines = await self.backend.read_many(
+                ids=ids, projection=list(projection) if projection is not None else None)
+            loaded.update({(id, projection): p for id, p in zip(ids, pipelines)})
+        return [loaded[key] for key in keys]
+
+    def _key(self, id: str, projection: list = None) -> tuple:
+        key = (str(id), tuple(sorted(projection)) if projection is not None else None)
+        self._keys[key[0]].add(key)
+        return key
+
+    async def load(self, id: str, projection: list = None) -> Optional[Pipeline]:
+        """Load a pipeline by id, or None if it does not exist.
+
+        Kwargs:
+            id (str): pipeline id
+            projection (list): optional list of document field paths to fetch
+                (e.g. ``["name", "status.state"]``). ``None`` fetches the full document.
+        """
+        return copy.deepcopy(await self._loader.load(self._key(id, projection)))
+
+    async def load_many(self, ids: List[str], projection: list = None) -> List[Optional[Pipeline]]:
+        """Load several pipelines by id, preserving order."""
+        if not ids:
+            return []
+        pipelines = await self._loader.load_many([self._key(id, projection) for id in ids])
+        return copy.deepcopy(pipelines)
+
+    def clear(self, id: str):
+        """Forget any memoized reads of a pipeline, e.g. after it was updated."""
+        self._loader.clear_many(self._keys.pop(str(id), set()))
+
+
+class DataLoaderExtension(SchemaExtension):
+    """Installs a fresh ``PipelineLoader`` on the GraphQL context of every operation.
+
+    The loader is available to resolvers, including ``@gql_query`` plugins, as
+    ``info.context["pipeline_loader"]`` or via ``get_pipeline_loader(info)``.
+    """
+
+    def on_operation(self):
+        context = self.execution_context.context
+        if not (isinstance(context, dict) and "request" in context):
+            yield
+            return
+
+        # websocket operations share the connection's context, restore the
+        # loader of any operation still running on it
+        previous = context.get(PIPELINE_LOADER_KEY)
+        loader = PipelineLoader(context["request"].app.backend)
+        context[PIPELINE_LOADER_KEY] = loader
+        try:
+            yield
+        finally:
+            if context.get(PIPELINE_LOADER_KEY) is loader:
+                if previous is None:
+                    context.pop(PIPELINE_LOADER_KEY)
+                else:
+                    context[PIPELINE_LOADER_KEY] = previous
+
+
+def get_pipeline_loader(info) -> PipelineLoader:
+    """Return the ``PipelineLoader`` of the current operation.
+
+    Falls back to an operation-less loader, which still batches but is not
+    shared, when the context was not set up by ``DataLoaderExtension``.
+    """
+    loader = info.context.get(PIPELINE_LOADER_KEY)
+    if loader is None:
+        loader = PipelineLoader(info.context["request"].app.backend)
+    return loader
@@ -0,0 +1,200 @@
+"""Fan-out of pipeline events to the subscriptions of the API process.
+
+Every pipeline watched by at least one ``pipeline`` subscription has a single
+upstream watcher, whatever the number of subscribers. Its events are copied
+into a bounded queue per subscriber, so a slow client only affects itself.
+"""
+
+import asyncio
+from typing import AsyncGenerator
+
+from .exceptions import InvalidPipeline
+from .logs.logger import logger
+from .pipeline_event_monitor import PipelineEventMonitor, PipelineEventStream, TERMINAL_STATES
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# marks the end of a watcher's events in the subscriber queues
+_END = object()
+
+
+class _Watcher:
+    """Upstream watcher of one pipeline and the queues of its subscribers."""
+
+    def __init__(self, id: str):
+        self.id = id
+        self.queues = set()
+        self.last = None
+        self.task = None
+
+
+class EventHub:
+    """Shares one upstream watcher per pipeline between its subscribers.
+
+    The watcher subscribes to the pipeline's events channel (see
+    ``PipelineEventStream``) or, when ``polling`` is set or the channel is
+    unavailable, polls the celery result backend. New subscribers of a
+    running watcher first receive its latest event instead of reading the
+    backend. The watcher stops when the pipeline reaches a terminal state or
+    when its last subscriber leaves.
+
+    Kwargs:
+        backend (BaseBackend): backend the pipelines are read from.
+        broker_url (str): URL of the Redis broker carrying the events channels.
+        celery_app (Celery): celery application polled in polling mode.
+        polling (bool): poll the celery result backend instead of subscribing to channels.
+        idle_interval (float): see ``PipelineEventStream.consume``.
+        queue_size (int): maximum number of events buffered per subscriber.
+        overflow (str): what to do when a subscriber's queue is full; ``drop_oldest``
+            discards its oldest buffered event, ``drop_newest`` discards the new event
+            and ``block`` makes the watcher wait for the subscriber (backpressure).
+    """
+
+    def __init__(self, backend=None, broker_url=None, celery_app=None, polling=False, idle_interval=30,
+                 queue_size=100, overflow="drop_oldest"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.backend = backend
+        self.broker_url = broker_url
+        self.celery_app = celery_app
+        self.polling = polling
+        self.idle_interval = idle_interval
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self._watchers = {}
+        self.events = 0
+        self.dropped = 0
+
+    async def subscribe(self, id: str, interval: float = 0.5) -> AsyncGenerator[dict, None]:
+        """Yield the events of pipeline ``id`` until it reaches a terminal state.
+
+        Kwargs:
+            interval (float): polling interval, used if this subscription starts the
+                watcher in polling mode.
+
+        Raises:
+            InvalidPipeline: if the pipeline does not exist.
+        """
+        id = str(id)
+        watcher = self._watchers.get(id)
+        if watcher is None:
+            watcher = self._watchers[id] = _Watcher(id)
+            watcher.task = asyncio.create_task(self._watch(watcher, interval))
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        if watcher.last is not None:
+            queue.put_nowait(watcher.last)
+        watcher.queues.add(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._unsubscribe(watcher, queue)
+
+    def _unsubscribe(self, watcher: _Watcher, queue: asyncio.Queue):
+        watcher.queues.discard(queue)
+        # unblock a watcher waiting on this queue under the block policy
+        while not queue.empty():
+            queue.get_nowait()
+        if not watcher.queues and self._watchers.get(watcher.id) is watcher:
+            del self._watchers[watcher.id]
+            watcher.task.cancel()
+
+    async def _watch(self, watcher: _Watcher, interval: float):
+        try:
+            async for event in self._upstream(watcher.id, interval):
+                watcher.last = event
+                self.events += 1
+                for queue in list(watcher.queues):
+                    await self._put(watcher, queue, event)
+            end = _END
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, InvalidPipeline):
+                logger.warning(f"pipeline {watcher.id} event watcher failed: {e}")
+            end = e
+        finally:
+            if self._watchers.get(watcher.id) is watcher:
+                del self._watchers[watcher.id]
+        for queue in list(watcher.queues):
+            await self._put(watcher, queue, end, force=True)
+
+    async def _put(self, watcher: _Watcher, queue: asyncio.Queue, item, force: bool = False):
+        """Queue an item for a subscriber according to the overflow policy.
+
+        ``force`` makes room for items that must not be dropped, such as the end marker.
+        """
+        if self.overflow == "block" and queue in watcher.queues:
+            # a subscriber leaving drains its queue, which releases this put
+            await queue.put(item)
+            return
+        if queue.full():
+            if self.overflow == "drop_newest" and not force:
+                self.dropped += 1
+                return
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(item)
+
+    async def _upstream(self, id: str, interval: float) -> AsyncGenerator[dict, None]:
+        stream = None
+        if not self.polling:
+            try:
+                # subscribe before reading the pipeline so no transition is missed in between
+                stream = await PipelineEventStream.create(id=id, broker_url=self.broker_url)
+            except Exception as e:
+                logger.warning(f"pipeline events channel unavailable ({e}), falling back to polling")
+
+        try:
+            p = await self.backend.read(id=id, projection=["status"])
+            if p is None:
+                raise InvalidPipeline(
+                    f"Pipeline {id} does not exist in the project.")
+        except Exception as e:
+            if stream is not None:
+                await stream.close()
+            raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
+
+        if stream is not None:
+            async for e in stream.consume(self.backend, pipeline=p, idle_interval=self.idle_interval):
+                yield e
+            return
+
+        while (not p.status[-1].task_id):
+            # Wait for the task to be assigned a task_id
+            await asyncio.sleep(0.1)
+            p = await self.backend.read(id=id, projection=["status"])
+
+        if p.status[-1].state.value not in TERMINAL_STATES:
+            async for e in PipelineEventMonitor(app=self.celery_app, task_id=p.status[-1].task_id).start(interval=interval):
+                e["id"] = id
+                yield e
+        else:
+            yield PipelineEventStream._status_event(p)
+
+    def stats(self) -> dict:
+        """Return the number of active watchers and subscribers and the event counters."""
+        return {"watchers": len(self._watchers),
+                "subscribers": sum(len(w.queues) for w in self._watchers.values()),
+                "events": self.events,
+                "dropped": self.dropped}
+
+    async def shutdown(self):
+        """Stop every watcher; their subscriptions end."""
+        watchers = list(self._watchers.values())
+        self._watchers.clear()
+        for watcher in watchers:
+            watcher.task.cancel()
+        for watcher in watchers:
+            try:
+                await watcher.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            for queue in list(watcher.queues):
+                await self._put(watcher, queue, _END, force=True)
+        logger.info(f"event hub stats: {self.stats()}")
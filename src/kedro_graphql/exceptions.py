@@ -16,3 +16,17 @@ class InvalidPipeline(Exception):
     """Raised when a pipeline cannot be staged or executed safely."""
 
     pass
+
+
+class CreateManyError(Exception):
+    """Raised by ``BaseBackend.create_many`` when only some of the pipelines were stored.
+
+    Attributes:
+        created (list): the created pipeline, or None, for each input pipeline.
+        errors (dict): the error message of each pipeline that was not stored, by its position.
+    """
+
+    def __init__(self, created: list, errors: dict):
+        super().__init__(f"{len(errors)} of {len(created)} pipelines could not be stored")
+        self.created = created
+        self.errors = errors
@@ -1,10 +1,23 @@
 import os
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
 
 from kedro.framework.hooks import hook_impl
 from kedro.io import CatalogProtocol
 from kedro.pipeline import Pipeline
+from kedro.pipeline.node import Node
+from kedro_graphql.logs.archive import save_log_file
+from kedro_graphql.logs.capture import task_log_router
 from kedro_graphql.logs.logger import logger
+from kedro_graphql.profiling import RunProfile
+from kedro_graphql.progress import (
+    AFTER_NODE_RUN,
+    BEFORE_NODE_RUN,
+    ON_NODE_ERROR,
+    PIPELINE_END,
+    PIPELINE_START,
+    NodeProgressPublisher,
+)
 
 from .config import load_config
 from .exceptions import InvalidPipeline
@@ -52,16 +65,29 @@ class DataLoggingHooks:
         catalog.save("gql_meta", d)
 
     def save_logs(self, catalog: CatalogProtocol, session_id: str, celery_task_id: str):
+        """Archive the log files of the run to the gql_logs dataset, see ``save_log_file``.
+
+        The files are streamed in compressed chunks, in parallel, e.g. to
+        ``logs/<session id>/info.log.gz`` with the chunks index in
+        ``logs/<session id>/info.log.gz.index.json``.
+        """
+        # write the records still queued for the task's file handlers
+        task_log_router.flush(celery_task_id)
         log_dir = os.path.join(CONFIG["KEDRO_GRAPHQL_LOG_TMP_DIR"], celery_task_id)
         log_files = ["info.log", "errors.log"]
-
-        for log_file in log_files:
-            log_path = os.path.join(log_dir, log_file)
-            if os.path.exists(log_path) and os.path.getsize(log_path) > 0:
-                with open(log_path, "r") as file:
-                    logs = file.read()
-                d = catalog._get_dataset("gql_logs")
-                d.save({f"logs/{session_id}/{log_file}": logs})
+        compression = CONFIG.get("KEDRO_GRAPHQL_LOG_ARCHIVE_COMPRESSION", "gzip")
+        chunk_size = int(CONFIG.get("KEDRO_GRAPHQL_LOG_ARCHIVE_CHUNK_SIZE", 1048576))
+
+        log_paths = [os.path.join(log_dir, log_file) for log_file in log_files]
+        log_paths = [p for p in log_paths if os.path.exists(p) and os.path.getsize(p) > 0]
+        if not log_paths:
+            return
+        d = catalog._get_dataset("gql_logs")
+        with ThreadPoolExecutor(max_workers=len(log_paths)) as pool:
+            futures = [pool.submit(save_log_file, d, p, f"logs/{session_id}/{os.path.basename(p)}",
+                                   compression=compression, chunk_size=chunk_size) for p in log_paths]
+            for future in futures:
+                future.result()
 
     @hook_impl
     def before_pipeline_run(self, run_params: dict[str, Any], pipeline: Pipeline, catalog: CatalogProtocol):
@@ -94,5 +120,113 @@ class DataLoggingHooks:
                 catalog, run_params["session_id"], run_params["celery_task_id"])
 
 
+class NodeProgressHooks:
+    """
+    A Kedro hook class to publish the start and end of the nodes of a run to the
+    progress stream of its session, see ``kedro_graphql.progress``.
+    """
+
+    def __init__(self):
+        self._publisher = None
+
+    @property
+    def publisher(self) -> NodeProgressPublisher:
+        if self._publisher is None:
+            self._publisher = NodeProgressPublisher(broker_url=CONFIG["KEDRO_GRAPHQL_BROKER"])
+        return self._publisher
+
+    def publish(self, session_id: str, event: str, **fields):
+        if CONFIG.get("KEDRO_GRAPHQL_NODE_PROGRESS", True):
+            self.publisher.publish(session_id, event, **fields)
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: dict[str, Any], pipeline: Pipeline):
+        self.publish(run_params["session_id"], PIPELINE_START, total=len(pipeline.nodes))
+
+    @hook_impl
+    def before_node_run(self, node: Node, session_id: str):
+        self.publish(session_id, BEFORE_NODE_RUN, node=node.name)
+
+    @hook_impl
+    def after_node_run(self, node: Node, session_id: str):
+        self.publish(session_id, AFTER_NODE_RUN, node=node.name)
+
+    @hook_impl
+    def on_node_error(self, error: Exception, node: Node, session_id: str):
+        self.publish(session_id, ON_NODE_ERROR, node=node.name, error=str(error))
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: dict[str, Any]):
+        self.publish(run_params["session_id"], PIPELINE_END)
+
+    @hook_impl
+    def on_pipeline_error(self, error: Exception, run_params: dict[str, Any]):
+        self.publish(run_params["session_id"], PIPELINE_END, error=str(error))
+
+
+class NodeProfileHooks:
+    """
+    A Kedro hook class to profile the nodes run by the process running a pipeline,
+    enabled with ``KEDRO_GRAPHQL_NODE_PROFILE``, see ``kedro_graphql.profiling``.
+    """
+
+    def __init__(self):
+        self.profile = RunProfile()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(CONFIG.get("KEDRO_GRAPHQL_NODE_PROFILE", False))
+
+    def pop_profile(self) -> Optional[dict]:
+        """Return the summary of the nodes profiled so far and start a new profile."""
+        profile, self.profile = self.profile, RunProfile()
+        return profile.summary()
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str, node: Node):
+        if self.enabled:
+            self.profile.start_dataset(node.name, dataset_name)
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, node: Node):
+        if self.enabled:
+            self.profile.end_dataset(node.name, dataset_name, "load_time")
+
+    @hook_impl
+    def before_node_run(self, node: Node):
+        if self.enabled:
+            self.profile.start_node(node.name)
+
+    @hook_impl
+    def after_node_run(self, node: Node):
+        if self.enabled:
+            self.profile.end_node(node.name)
+
+    @hook_impl
+    def on_node_error(self, node: Node):
+        if self.enabled:
+            self.profile.end_node(node.name, failed=True)
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str, node: Node):
+        if self.enabled:
+            self.profile.start_dataset(node.name, dataset_name)
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, node: Node):
+        if self.enabled:
+            self.profile.end_dataset(node.name, dataset_name, "save_time")
+
+
+def pop_node_profile(hook_manager) -> Optional[dict]:
+    """Profile of the nodes run by the process, from the ``NodeProfileHooks`` registered with ``hook_manager``."""
+    for plugin in hook_manager.get_plugins():
+        if isinstance(plugin, NodeProfileHooks):
+            return plugin.pop_profile()
+    return None
+
+
 validation_hooks = DataValidationHooks()
 logging_hooks = DataLoggingHooks()
+progress_hooks = NodeProgressHooks()
+profile_hooks = NodeProfileHooks()
@@ -0,0 +1,278 @@
+"""Structured archive of the Redis log streams of pipeline runs.
+
+Workers copy the entries of a task's log stream into the pipeline's
+``gql_logs`` partitioned dataset before they are trimmed from the stream and
+before the stream is removed, as JSON lines segments named after their first
+message id::
+
+    logs/<task id>/stream/<first message id>.jsonl
+
+Segments never overlap and, ordered by their first message id, hold the
+task's log messages in stream order.
+
+The ``info.log`` and ``errors.log`` files of a run are archived next to them
+by ``DataLoggingHooks`` with ``write_log_file``: compressed chunk by chunk,
+with an index of the offset and first timestamp of every chunk so that
+``read_log_file`` only downloads the chunks of a time range.
+"""
+
+import gzip
+import json
+import logging
+import posixpath
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from kedro.io import AbstractDataset
+
+logger = logging.getLogger("kedro_graphql")
+
+SEGMENT_SUFFIX = ".jsonl"
+
+# file suffix of the archived log files for each compression
+LOG_FILE_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+INDEX_SUFFIX = ".index.json"
+
+# timestamp starting the lines of the log files, see KedroGraphqlTask.before_start
+_LOG_LINE_TIME = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})", re.MULTILINE)
+
+
+def parse_message_id(message_id) -> tuple:
+    """Sortable form of a Redis stream entry id such as ``1700000000000-0``."""
+    if isinstance(message_id, bytes):
+        message_id = message_id.decode()
+    ms, _, seq = str(message_id).partition("-")
+    return (int(ms), int(seq or 0))
+
+
+def message_matches(message: dict, level: str = None, logger_name: str = None) -> bool:
+    """Whether a log message passes the ``level`` and ``logger_name`` filters.
+
+    Kwargs:
+        level (str): minimum level name, e.g. ``WARNING``.
+        logger_name (str): logger name, matching its child loggers too.
+    """
+    if level:
+        levelno = logging.getLevelName(message.get("level") or "NOTSET")
+        if not isinstance(levelno, int) or levelno < logging.getLevelName(level.upper()):
+            return False
+    if logger_name:
+        name = message.get("logger") or ""
+        if name != logger_name and not name.startswith(logger_name + "."):
+            return False
+    return True
+
+
+class LogArchive:
+    """Reads and writes the archived log stream segments of a pipeline.
+
+    Args:
+        dataset (AbstractDataset): the pipeline's ``gql_logs`` partitioned dataset.
+    """
+
+    def __init__(self, dataset: AbstractDataset):
+        self.dataset = dataset
+
+    @classmethod
+    def from_config(cls, config: dict) -> "LogArchive":
+        """Archive stored in the dataset of a ``gql_logs`` catalog entry."""
+        return cls(AbstractDataset.from_config("gql_logs", config))
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> Optional["LogArchive"]:
+        """Archive of a pipeline, or None if its data catalog has no ``gql_logs`` dataset."""
+        if pipeline is None:
+            return None
+        for d in pipeline.data_catalog or []:
+            if d.name == "gql_logs" and d.has_config():
+                return cls.from_config(d.parse_config())
+        return None
+
+    @staticmethod
+    def prefix(task_id: str) -> str:
+        return f"logs/{task_id}/stream/"
+
+    def save(self, task_id: str, messages: List[dict]):
+        """Archive a segment of log messages, ordered by message id."""
+        if not messages:
+            return
+        partition = self.prefix(task_id) + messages[0]["message_id"] + SEGMENT_SUFFIX
+        self.dataset.save({partition: "".join(json.dumps(m) + "\n" for m in messages)})
+
+    def segments(self, task_id: str) -> List[tuple]:
+        """Return ``(first message id, load function)`` of each segment of a task, in order.
+
+        Only the task's directory is listed, not every partition of the dataset.
+        """
+        prefix = self.prefix(task_id)
+        # PartitionedDataset has no public API for the filesystem and the paths of its partitions
+        fs = self.dataset._filesystem
+        try:
+            paths = fs.find(posixpath.join(self.dataset._path, prefix))
+        except FileNotFoundError:
+            paths = []
+        segments = []
+        for path in paths:
+            partition = self.dataset._path_to_partition(path)
+            if partition.startswith(prefix) and partition.endswith(SEGMENT_SUFFIX):
+                segments.append((partition[len(prefix):-len(SEGMENT_SUFFIX)],
+                                 lambda path=path: fs.cat_file(path).decode()))
+        if not segments:
+            logger.debug(f"no archived logs for task {task_id}")
+        return sorted(segments, key=lambda s: parse_message_id(s[0]))
+
+    def read(self, task_id: str, after_id: str = None, before_id: str = None) -> Iterator[dict]:
+        """Yield the archived messages of a task with ids in ``(after_id, before_id)``.
+
+        Segments entirely before ``after_id`` are not loaded.
+        """
+        after = parse_message_id(after_id) if after_id else None
+        before = parse_message_id(before_id) if before_id else None
+        segments = self.segments(task_id)
+        for i, (first_id, load) in enumerate(segments):
+            if before is not None and parse_message_id(first_id) >= before:
+                return
+            if after is not None and i + 1 < len(segments) and parse_message_id(segments[i + 1][0]) <= after:
+                continue
+            for message in _parse_segment(load()):
+                key = parse_message_id(message["message_id"])
+                if before is not None and key >= before:
+                    return
+                if after is None or key > after:
+                    yield message
+
+
+def _parse_segment(text: str) -> Iterable[dict]:
+    for line in text.splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def _compressor(compression: str) -> Callable[[bytes], bytes]:
+    if compression == "gzip":
+        return lambda data: gzip.compress(data, mtime=0)
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        # compressor objects are not thread safe
+        return lambda data: zstandard.ZstdCompressor().compress(data)
+    if compression == "none":
+        return lambda data: data
+    raise ValueError(f"compression must be one of {tuple(LOG_FILE_COMPRESSIONS)}, got {compression!r}")
+
+
+def _decompressor(compression: str) -> Callable[[bytes], bytes]:
+    if compression == "gzip":
+        return gzip.decompress
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        return lambda data: zstandard.ZstdDecompressor().decompress(data)
+    if compression == "none":
+        return lambda data: data
+    raise ValueError(f"compression must be one of {tuple(LOG_FILE_COMPRESSIONS)}, got {compression!r}")
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd log compression requires the zstandard package, "
+                          "install kedro-graphql[zstd]") from e
+    return zstandard
+
+
+def _chunks(file, chunk_size: int) -> Iterator[bytes]:
+    """Read a file in chunks of about ``chunk_size`` bytes ending on a line boundary."""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        if not chunk.endswith(b"\n"):
+            chunk += file.readline()
+        yield chunk
+
+
+def write_log_file(src_path: str, fs, path: str, compression: str = "gzip", chunk_size: int = 1 << 20,
+                   workers: int = 4) -> List[dict]:
+    """Copy a log file to ``path`` of the fsspec filesystem ``fs``, compressing it chunk by chunk.
+
+    Every chunk is compressed on its own (a gzip member or a zstd frame; the
+    file stays a valid gzip or zstd file) by a pool of ``workers`` threads,
+    while the compressed chunks are streamed to ``fs`` in order, which uploads
+    them as multipart pieces on object stores. At most ``workers`` chunks are
+    held in memory.
+
+    Returns:
+        list: the index of the chunks, with the ``time`` of their first line,
+            their ``offset`` and ``length`` in the written file and their
+            ``raw_offset`` and ``raw_length`` in the log file.
+    """
+    compress = _compressor(compression)
+    index = []
+    pending = deque()
+    offset = raw_offset = 0
+
+    def write_oldest(out):
+        nonlocal offset
+        entry, future = pending.popleft()
+        data = future.result()
+        out.write(data)
+        entry.update(offset=offset, length=len(data))
+        offset += len(data)
+        index.append(entry)
+
+    with open(src_path, "rb") as src, fs.open(path, "wb") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk in _chunks(src, chunk_size):
+            time = _LOG_LINE_TIME.search(chunk)
+            entry = {"time": time.group(1).decode() if time else None,
+                     "raw_offset": raw_offset, "raw_length": len(chunk)}
+            raw_offset += len(chunk)
+            pending.append((entry, pool.submit(compress, chunk)))
+            if len(pending) > workers:
+                write_oldest(out)
+        while pending:
+            write_oldest(out)
+    return index
+
+
+def read_log_file(fs, path: str, index: List[dict], compression: str = "gzip", start_time: str = None,
+                  end_time: str = None) -> Iterator[str]:
+    """Yield the chunks of a file written by ``write_log_file`` that may hold lines logged in a time range.
+
+    Only the chunks overlapping the range are read from ``fs``.
+
+    Kwargs:
+        start_time (str): earliest time, formatted like the log lines e.g. ``2024-01-01 12:00:00,000``.
+        end_time (str): latest time, formatted like ``start_time``.
+    """
+    decompress = _decompressor(compression)
+    with fs.open(path, "rb") as f:
+        for i, entry in enumerate(index):
+            if end_time and entry["time"] and entry["time"] > end_time:
+                return
+            next_time = index[i + 1]["time"] if i + 1 < len(index) else None
+            if start_time and next_time and next_time < start_time:
+                continue
+            f.seek(entry["offset"])
+            yield decompress(f.read(entry["length"])).decode()
+
+
+def save_log_file(dataset: AbstractDataset, src_path: str, partition: str, compression: str = "gzip",
+                  chunk_size: int = 1 << 20) -> str:
+    """Archive a log file to a partition of a partitioned dataset with ``write_log_file``.
+
+    The index is saved next to it, with the ``INDEX_SUFFIX``.
+
+    Returns:
+        str: the path of the archived file.
+    """
+    partition = partition + LOG_FILE_COMPRESSIONS[compression]
+    # PartitionedDataset has no public API for the filesystem and the paths of its partitions
+    fs = dataset._filesystem
+    path = dataset._partition_to_path(partition)
+    fs.makedirs(posixpath.dirname(path), exist_ok=True)
+    index = write_log_file(src_path, fs, path, compression=compression, chunk_size=chunk_size)
+    with fs.open(path + INDEX_SUFFIX, "w") as f:
+        json.dump({"compression": compression, "chunks": index}, f)
+    return path
@@ -0,0 +1,164 @@
+"""Routing of log records to the sinks of the Celery task that emitted them.
+
+A single ``QueueHandler`` on the root logger stamps every record with the id
+of the task it was emitted for, read from the ``current_task_id`` context
+variable, and queues it. A ``QueueListener`` thread hands each record to the
+handlers registered for its task only, so concurrent tasks of a threads or
+gevent pool do not receive each other's records and the logging calls never
+wait on file or Redis I/O.
+"""
+
+import logging
+import os
+import queue
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+# log record attribute holding the id of the task the record was emitted for
+TASK_ID_ATTR = "kedro_graphql_task_id"
+
+current_task_id: ContextVar[Optional[str]] = ContextVar("kedro_graphql_task_id", default=None)
+
+
+class TaskIdFilter(logging.Filter):
+    """Stamps records with the task id of the current context, dropping records of no task.
+
+    Args:
+        router (TaskLogRouter): supplies the task id of records emitted outside
+            of a task's context, see ``TaskLogRouter.process_task_id``.
+    """
+
+    def __init__(self, router: "TaskLogRouter"):
+        super().__init__()
+        self.router = router
+
+    def filter(self, record):
+        task_id = current_task_id.get() or self.router.process_task_id
+        if task_id is None:
+            return False
+        setattr(record, TASK_ID_ATTR, task_id)
+        return True
+
+
+class TaskLogFilter(logging.Filter):
+    """Passes the records of one task."""
+
+    def __init__(self, task_id: str):
+        super().__init__()
+        self.task_id = task_id
+
+    def filter(self, record):
+        return getattr(record, TASK_ID_ATTR, None) == self.task_id
+
+
+class _Flush:
+    """Queued behind the records to flush, set once the listener reaches it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class _RoutingListener(QueueListener):
+
+    def __init__(self, queue, router: "TaskLogRouter"):
+        super().__init__(queue)
+        self.router = router
+
+    def handle(self, record):
+        if isinstance(record, _Flush):
+            record.done.set()
+            return
+        for handler in self.router.handlers(getattr(record, TASK_ID_ATTR, None)):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class TaskLogRouter:
+    """Sends the log records of each task to the handlers registered for it.
+
+    The queue and the listener thread are started on first use in each
+    process, so a router inherited by a forked child process starts its own.
+
+    Attributes:
+        process_task_id (str): task of the records emitted outside of any
+            task's context, e.g. by the threads of a pipeline running in a child
+            process of its task. None drops them.
+        flush_timeout (float): maximum seconds ``flush`` waits for the listener.
+    """
+
+    def __init__(self, flush_timeout: float = 30):
+        self.process_task_id = None
+        self.flush_timeout = flush_timeout
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue_handler = None
+        self._listener = None
+        # the lock may be held by another thread of the parent when forking
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def _start(self):
+        if self._pid == os.getpid():
+            return
+        root_logger = logging.getLogger()
+        if self._queue_handler is not None:
+            # inherited from the parent process, whose listener did not survive the fork
+            root_logger.removeHandler(self._queue_handler)
+        q = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(q)
+        self._queue_handler.addFilter(TaskIdFilter(self))
+        self._listener = _RoutingListener(q, self)
+        self._listener.start()
+        root_logger.addHandler(self._queue_handler)
+        self._pid = os.getpid()
+
+    def add(self, task_id: str, *handlers: logging.Handler):
+        """Send the records of ``task_id`` to ``handlers`` too."""
+        for handler in handlers:
+            handler.addFilter(TaskLogFilter(task_id))
+        with self._lock:
+            self._start()
+            # copied on write, the listener iterates over the current list
+            self._routes[task_id] = self._routes.get(task_id, []) + list(handlers)
+
+    def handlers(self, task_id: str) -> List[logging.Handler]:
+        """Return the handlers registered for ``task_id``."""
+        return self._routes.get(task_id, [])
+
+    def discard(self, task_id: str, *handlers: logging.Handler):
+        """Stop sending the records of ``task_id`` to ``handlers``, once the queued ones are handled."""
+        self.flush()
+        with self._lock:
+            remaining = [h for h in self._routes.get(task_id, []) if h not in handlers]
+            if remaining:
+                self._routes[task_id] = remaining
+            else:
+                self._routes.pop(task_id, None)
+
+    def remove(self, task_id: str) -> List[logging.Handler]:
+        """Unregister every handler of ``task_id`` once the queued records are handled and return them."""
+        handlers = self.handlers(task_id)
+        self.discard(task_id, *handlers)
+        return handlers
+
+    def flush(self, task_id: str = None):
+        """Wait until the records queued so far are handled, then flush the handlers of ``task_id``."""
+        with self._lock:
+            self._start()
+        marker = _Flush()
+        self._listener.queue.put(marker)
+        marker.done.wait(self.flush_timeout)
+        if task_id is not None:
+            for handler in self.handlers(task_id):
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+
+
+task_log_router = TaskLogRouter()
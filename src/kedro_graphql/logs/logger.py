@@ -1,9 +1,13 @@
+import asyncio
 import json
 import logging
 import os
+import queue
+import sys
+import threading
 from inspect import currentframe, getframeinfo
 from logging import LogRecord
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List
 
 import redis
 import redis.asyncio as redis_asyncio
@@ -11,16 +15,51 @@ from celery.result import AsyncResult
 from celery.states import READY_STATES
 from starlette.concurrency import run_in_threadpool
 
+from .archive import LogArchive, message_matches, parse_message_id
+from .capture import TASK_ID_ATTR
 from .json_log_formatter import JSONFormatter  # VerboseJSONFormatter also available
 
 logger = logging.getLogger("kedro_graphql")
 logger.setLevel(logging.INFO)
 
+# field of the entry marking the end of a task's log stream
+END_OF_STREAM_FIELD = "end_of_stream"
+
+LOG_HANDLER_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# stops the writer thread of a buffered KedroGraphQLLogHandler
+_STOP = object()
+
+
+def decode_log_entry(id, value) -> dict:
+    """Convert a log stream entry to a log message, None for the end of stream marker."""
+    if END_OF_STREAM_FIELD.encode() in value:
+        return None
+    return {
+        "message_id": id.decode(),
+        "message": value.get(b"message", b"").decode(),
+        "time": value.get(b"time", b"").decode(),
+        "level": value.get(b"level", b"").decode() or None,
+        "logger": value.get(b"logger", b"").decode() or None,
+    }
+
 
 class RedisLogStreamPublisher(object):
-    def __init__(self, topic, broker_url=None):
+    """Writes log messages to the Redis stream of a task.
+
+    Kwargs:
+        maxlen (int): about how many entries the stream keeps, None for no limit.
+            Older entries are trimmed with ``XTRIM MAXLEN ~`` once the stream
+            grows past ``maxlen`` by a tenth (at least 100 entries).
+        archive (LogArchive): archive the entries are spilled to before they
+            are trimmed, see ``spill``. Without one, trimmed entries are lost.
+    """
+
+    def __init__(self, topic, broker_url=None, maxlen=None, archive: LogArchive = None):
         self.connection = redis.Redis.from_url(broker_url)
         self.topic = topic
+        self.maxlen = maxlen
+        self.archive = archive
         if not self.connection.exists(self.topic):
             bootstrap_payload = json.loads(
                 JSONFormatter().format(
@@ -43,10 +82,90 @@ class RedisLogStreamPublisher(object):
             )
             # stream will expire in 24 hours (safety mechanism in case task_postrun fails to delete)
             self.connection.expire(self.topic, 86400)
+        self._length = self.connection.xlen(self.topic) if maxlen else 0
+
+    @property
+    def archived_key(self) -> str:
+        """Key of the id of the last entry spilled to the archive, shared by the task's processes."""
+        return f"{self.topic}:archived"
 
     def publish(self, data):
         data = {k: (str(v) if isinstance(v, bool) else v) for k, v in data.items()}
         self.connection.xadd(self.topic, data)
+        self._added(1)
+
+    def publish_many(self, entries: List[dict]):
+        """Add several entries to the stream in one round trip."""
+        pipe = self.connection.pipeline(transaction=False)
+        for data in entries:
+            pipe.xadd(self.topic, data)
+        pipe.execute()
+        self._added(len(entries))
+
+    def _added(self, count: int):
+        if not self.maxlen:
+            return
+        self._length += count
+        if self._length > self.maxlen + max(100, self.maxlen // 10):
+            self.trim()
+
+    def trim(self):
+        """Trim the stream to about ``maxlen`` entries, spilling them to the archive first."""
+        length = self.connection.xlen(self.topic)
+        if length > self.maxlen:
+            if self.archive is not None:
+                # XTRIM MAXLEN ~ never removes more than the oldest length - maxlen entries
+                oldest = self.connection.xrange(self.topic, min="-", max="+", count=length - self.maxlen)
+                try:
+                    self.spill(max_id=oldest[-1][0].decode())
+                except Exception as e:
+                    # Redis memory comes first, the trimmed entries are lost.
+                    # Not logged: the caller may be the log handler of this stream.
+                    sys.stderr.write(f"kedro-graphql: failed to archive log stream {self.topic} "
+                                     f"before trimming it: {e}\n")
+            self.connection.xtrim(self.topic, maxlen=self.maxlen, approximate=True)
+        self._length = self.connection.xlen(self.topic)
+
+    def spill(self, max_id="+", count=1000):
+        """Copy the entries up to ``max_id`` that are not archived yet to the archive as one segment."""
+        if self.archive is None:
+            return
+        archived = self.connection.get(self.archived_key)
+        start = "(" + archived.decode() if archived else "-"
+        entries = []
+        while True:
+            page = self.connection.xrange(self.topic, min=start, max=max_id, count=count)
+            entries.extend(page)
+            if len(page) < count:
+                break
+            start = "(" + page[-1][0].decode()
+        if not entries:
+            return
+        messages = [m for m in (decode_log_entry(id, value) for id, value in entries) if m is not None]
+        self.archive.save(self.topic, messages)
+        self.connection.set(self.archived_key, entries[-1][0], ex=86400)
+
+    def delete(self):
+        """Remove the stream."""
+        self.connection.delete(self.topic, self.archived_key)
+
+    def end(self):
+        """Mark the end of the stream, waking up subscribers blocked on it."""
+        self.connection.xadd(self.topic, {END_OF_STREAM_FIELD: "1"})
+
+    def messages(self, count=1000) -> List[dict]:
+        """Return the log messages of the stream, read ``count`` entries at a time."""
+        messages = []
+        start = "-"
+        while True:
+            entries = self.connection.xrange(self.topic, min=start, max="+", count=count)
+            for id, value in entries:
+                message = decode_log_entry(id, value)
+                if message is not None:
+                    messages.append(message)
+            if len(entries) < count:
+                return messages
+            start = "(" + entries[-1][0].decode()
 
 
 class RedisLogStreamSubscriber(object):
@@ -61,78 +180,371 @@ class RedisLogStreamSubscriber(object):
         self.connection = await redis_asyncio.from_url(broker_url)
         return self
 
-    async def consume(self, count=1, start_id=0):
-        r = await self.connection.xread(count=count, streams={self.topic: start_id})
+    async def consume(self, count=1, start_id=0, block=None):
+        """Read up to ``count`` entries after ``start_id``.
+
+        Kwargs:
+            block (int): milliseconds to wait for entries when there are none, None to not wait.
+        """
+        r = await self.connection.xread(count=count, block=block, streams={self.topic: start_id})
         return r
 
 
 class KedroGraphQLLogHandler(logging.StreamHandler):
-    def __init__(self, topic, broker_url=None):
+    """Publishes log records to the Redis log stream of a task.
+
+    By default every record is written with its own XADD. With ``buffered``
+    set, ``emit`` only queues the record and a background thread writes the
+    queued records in pipelined XADD batches, so the pipeline does not wait on
+    Redis. ``flush`` waits until the queued records are written.
+
+    Kwargs:
+        buffered (bool): queue records and write them from a background thread.
+        queue_size (int): maximum number of queued records.
+        batch_size (int): maximum number of records written per round trip.
+        overflow (str): what to do when the queue is full; ``drop_oldest``
+            discards the oldest queued record, ``drop_newest`` discards the new
+            record and ``block`` makes the logging call wait.
+        flush_timeout (float): maximum seconds ``flush`` waits for the writer.
+        maxlen (int): see ``RedisLogStreamPublisher``.
+        archive (LogArchive): see ``RedisLogStreamPublisher``.
+    """
+
+    def __init__(self, topic, broker_url=None, buffered=False, queue_size=10000, batch_size=100,
+                 overflow="block", flush_timeout=30, maxlen=None, archive: LogArchive = None):
+        if overflow not in LOG_HANDLER_OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {LOG_HANDLER_OVERFLOW_POLICIES}, got {overflow!r}")
         logging.StreamHandler.__init__(self)
         self.broker_url = broker_url
         self.topic = topic
-        self.broker = RedisLogStreamPublisher(topic, broker_url=broker_url)
+        self.broker = RedisLogStreamPublisher(topic, broker_url=broker_url, maxlen=maxlen, archive=archive)
         self.setFormatter(JSONFormatter())
+        self.buffered = buffered
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.flush_timeout = flush_timeout
+        self.dropped = 0
+        self._queue = None
+        self._writer = None
+        self._pid = None
+
+    def payload(self, record) -> dict:
+        """Format a record to the fields of its stream entry."""
+        # JSONFormatter.format without serializing to a JSON string and back
+        formatter = self.formatter
+        extra = formatter.extra_from_record(record)
+        extra.pop(TASK_ID_ATTR, None)
+        json_record = formatter.json_record(record.getMessage(), extra, record)
+        mutated_record = formatter.mutate_json_record(json_record)
+        if mutated_record is None:
+            mutated_record = json_record
+        mutated_record["level"] = record.levelname
+        mutated_record["logger"] = record.name
+        return {k: _stream_value(v, formatter) for k, v in mutated_record.items()}
 
     def emit(self, record):
-        msg = self.format(record)
-        payload = json.loads(msg)
-        payload["level"] = record.levelname
-        payload["logger"] = record.name
-        self.broker.publish(payload)
+        try:
+            payload = self.payload(record)
+            if self.buffered:
+                self._enqueue(payload)
+            else:
+                self.broker.publish(payload)
+        except Exception:
+            self.handleError(record)
+
+    def _enqueue(self, payload: dict):
+        if self._pid != os.getpid():
+            # first record, or first record of a forked child which has no writer thread
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._writer = threading.Thread(target=self._write, name=f"kedro-graphql-log-writer-{self.topic}",
+                                            daemon=True)
+            self._writer.start()
+        if self.overflow == "block":
+            self._queue.put(payload)
+            return
+        try:
+            self._queue.put_nowait(payload)
+            return
+        except queue.Full:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._queue.put_nowait(payload)
+        except (queue.Empty, queue.Full):
+            pass
+
+    def _write(self):
+        """Writer thread: write queued records in batches until stopped."""
+        q = self._queue
+        stop = False
+        while not stop:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _STOP:
+                stop = True
+            entries = [e for e in batch if e is not _STOP]
+            try:
+                if entries:
+                    self.broker.publish_many(entries)
+            except Exception as e:
+                self.dropped += len(entries)
+                # not logged: this handler may be the one receiving the log record
+                sys.stderr.write(f"kedro-graphql: failed to write {len(entries)} log records "
+                                 f"to stream {self.topic}: {e}\n")
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def flush(self):
+        """Wait until the queued records are written, at most ``flush_timeout`` seconds."""
+        if self._pid != os.getpid():
+            return
+        with self._queue.all_tasks_done:
+            self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks,
+                                                timeout=self.flush_timeout)
+
+    def close(self):
+        """Write the queued records and stop the writer thread."""
+        if self._pid == os.getpid():
+            self.flush()
+            try:
+                self._queue.put(_STOP, timeout=self.flush_timeout)
+                self._writer.join(timeout=self.flush_timeout)
+            except queue.Full:
+                pass
+            self._pid = None
+        logging.StreamHandler.close(self)
+
+
+def _stream_value(value, formatter: JSONFormatter):
+    """Convert a log record field to a value Redis streams accept."""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (str, bytes, int, float)):
+        return value
+    if value is None:
+        return ""
+    return formatter.to_json(value)
+
+
+async def task_finished(task_id: str) -> bool:
+    """Whether a celery task reached a terminal state, False when the result backend cannot tell."""
+    # check task status - wrap blocking Celery operation in thread pool
+    def check_task_status(task_id):
+        try:
+            r = AsyncResult(task_id)
+            # Check if backend is disabled/not available
+            if not hasattr(r.backend, '_get_task_meta_for'):
+                # No result backend configured, can't check status
+                # Return None to indicate we should keep streaming
+                return None
+            return r.status
+        except (AttributeError, NotImplementedError):
+            # Backend doesn't support status checking
+            return None
+
+    status = await run_in_threadpool(check_task_status, task_id)
+    # End streaming on normal terminal states and explicit ABORTED
+    # (used by abortable tasks in some backends).
+    terminal_statuses = set(READY_STATES).union({"ABORTED"})
+    # If status is None (no backend), continue streaming.
+    return status is not None and status in terminal_statuses
 
 
 class PipelineLogStream():
 
     @classmethod
-    async def create(cls, task_id, broker_url=None):
+    async def create(cls, task_id, broker_url=None, count=100, block_ms=5000, after_message_id=None,
+                     level=None, logger_name=None, archive: LogArchive = None):
         """Factory method for async instantiation PipelineLogStream objects.
+
+        Kwargs:
+            count (int): maximum number of log messages read per XREAD.
+            block_ms (int): milliseconds an XREAD waits for new messages; the
+                task's state is only checked when it times out.
+            after_message_id (str): only stream the messages after this one, e.g.
+                the last message received before a reconnect.
+            level (str): only stream messages of this level or above.
+            logger_name (str): only stream messages of this logger and its children.
+            archive (LogArchive): archive holding the messages no longer in the
+                Redis stream, streamed first.
         """
         self = PipelineLogStream()
         self.task_id = task_id
         self.broker_url = broker_url
+        self.count = count
+        self.block_ms = block_ms
+        self.after_message_id = after_message_id
+        self.level = level
+        self.logger_name = logger_name
+        self.archive = archive
         self.broker = await RedisLogStreamSubscriber().create(task_id, broker_url)
         return self
 
+    def _message(self, message: dict) -> dict:
+        return {"task_id": self.task_id, **message}
+
+    def _matches(self, message: dict) -> bool:
+        return message_matches(message, level=self.level, logger_name=self.logger_name)
+
+    async def _task_finished(self) -> bool:
+        """Whether the task reached a terminal state, checked when a read times out."""
+        return await task_finished(self.task_id)
+
+    async def _backfill(self, limit: int = None):
+        """Read the archived messages missing from the head of the Redis stream.
+
+        The archive is read lazily and only the messages passing the filters
+        are kept, so reading stops once ``limit`` of them are found.
+
+        Returns:
+            tuple: the archived messages and the id to read the stream after;
+                the id is None when the stream is gone and the task finished.
+        """
+        start_id = self.after_message_id or "0"
+        head = await self.broker.connection.xrange(self.task_id, min="-", max="+", count=1)
+        if self.archive is None:
+            return [], start_id
+        if head and parse_message_id(head[0][0]) <= parse_message_id(start_id):
+            return [], start_id
+        before_id = head[0][0].decode() if head else None
+
+        def read():
+            messages, last_id = [], None
+            for message in self.archive.read(self.task_id, after_id=self.after_message_id, before_id=before_id):
+                last_id = message["message_id"]
+                if self._matches(message):
+                    messages.append(message)
+                    if len(messages) == limit:
+                        break
+            return messages, last_id
+
+        messages, last_id = await run_in_threadpool(read)
+        if last_id is not None:
+            start_id = last_id
+        if limit is not None and len(messages) == limit:
+            return messages, start_id
+        if not head and await self._task_finished():
+            return messages, None
+        return messages, start_id
+
+    async def _trimmed(self, start_id, entries, count) -> List[dict]:
+        """Return the archived messages trimmed from the stream between ``start_id`` and ``entries``.
+
+        Only a read returning a full batch can have been overtaken by the
+        trimming of the stream (see ``RedisLogStreamPublisher.trim``), so the
+        stream's first entry is not checked otherwise.
+        """
+        if self.archive is None or len(entries) < count:
+            return []
+        head = await self.broker.connection.xrange(self.task_id, min="-", max="+", count=1)
+        if not head or parse_message_id(head[0][0]) <= parse_message_id(start_id):
+            return []
+        return await run_in_threadpool(
+            lambda: list(self.archive.read(self.task_id, after_id=start_id, before_id=entries[0][0])))
+
     async def consume(self) -> AsyncGenerator[dict, None]:
-        start_id = 0
         try:
-            while True:
-                stream_data = await self.broker.consume(count=1, start_id=start_id)
+            archived, start_id = await self._backfill()
+            for message in archived:
+                yield self._message(message)
+            while start_id is not None:
+                stream_data = await self.broker.consume(count=self.count, start_id=start_id, block=self.block_ms)
                 if len(stream_data) > 0:
+                    for message in await self._trimmed(start_id, stream_data[0][1], self.count):
+                        if self._matches(message):
+                            yield self._message(message)
                     for id, value in stream_data[0][1]:
-                        message = value.get(b"message", b"").decode()
-                        timestamp = value.get(b"time", b"").decode()
-                        yield {
-                            "task_id": self.task_id,
-                            "message_id": id.decode(),
-                            "message": message,
-                            "time": timestamp,
-                        }
+                        message = decode_log_entry(id, value)
+                        if message is None:
+                            return
+                        if self._matches(message):
+                            yield self._message(message)
                     # https://redis-py.readthedocs.io/en/stable/examples/redis-stream-example.html#read-more-data-from-the-stream
                     start_id = stream_data[0][1][-1][0]
+                elif await self._task_finished():
+                    break
+        finally:
+            # Always close async Redis connection, including cancellation/disconnect.
+            await self.broker.connection.aclose()
+
+    async def consume_batches(self, max_batch=100, max_latency_ms=250) -> AsyncGenerator[List[dict], None]:
+        """Yield the log messages in lists.
+
+        A batch is yielded once it holds ``max_batch`` messages or its first
+        message is ``max_latency_ms`` old, whichever comes first.
+        """
+        batch = []
+        deadline = None
+        loop = asyncio.get_running_loop()
+        try:
+            archived, start_id = await self._backfill()
+            archived = [self._message(m) for m in archived]
+            for i in range(0, len(archived), max_batch):
+                yield archived[i:i + max_batch]
+            while start_id is not None:
+                if batch:
+                    # XREAD BLOCK 0 would wait forever
+                    block = max(1, int((deadline - loop.time()) * 1000))
                 else:
-                    # check task status - wrap blocking Celery operation in thread pool
-                    def check_task_status(task_id):
-                        try:
-                            r = AsyncResult(task_id)
-                            # Check if backend is disabled/not available
-                            if not hasattr(r.backend, '_get_task_meta_for'):
-                                # No result backend configured, can't check status
-                                # Return None to indicate we should keep streaming
-                                return None
-                            return r.status
-                        except (AttributeError, NotImplementedError):
-                            # Backend doesn't support status checking
-                            return None
-
-                    status = await run_in_threadpool(check_task_status, self.task_id)
-                    # End streaming on normal terminal states and explicit ABORTED
-                    # (used by abortable tasks in some backends).
-                    terminal_statuses = set(READY_STATES).union({"ABORTED"})
-                    # If status is None (no backend), continue streaming.
-                    if status is not None and status in terminal_statuses:
-                        break
+                    block = self.block_ms
+                stream_data = await self.broker.consume(count=max_batch - len(batch), start_id=start_id, block=block)
+                if len(stream_data) > 0:
+                    trimmed = await self._trimmed(start_id, stream_data[0][1], max_batch - len(batch))
+                    batch.extend(self._message(m) for m in trimmed if self._matches(m))
+                    while len(batch) >= max_batch:
+                        yield batch[:max_batch]
+                        batch = batch[max_batch:]
+                    for id, value in stream_data[0][1]:
+                        message = decode_log_entry(id, value)
+                        if message is None:
+                            if batch:
+                                yield batch
+                            return
+                        if self._matches(message):
+                            batch.append(self._message(message))
+                    start_id = stream_data[0][1][-1][0]
+                    if batch and deadline is None:
+                        deadline = loop.time() + max_latency_ms / 1000
+                elif not batch and await self._task_finished():
+                    break
+                if batch and (len(batch) >= max_batch or loop.time() >= deadline):
+                    yield batch
+                    batch = []
+                    deadline = None
         finally:
             # Always close async Redis connection, including cancellation/disconnect.
             await self.broker.connection.aclose()
+
+    async def history(self, limit=100) -> List[dict]:
+        """Return up to ``limit`` messages after ``after_message_id``, archived or still in Redis."""
+        try:
+            archived, start_id = await self._backfill(limit=limit)
+            messages = [self._message(m) for m in archived]
+            if len(messages) == limit:
+                return messages
+            start = "(" + (start_id or self.after_message_id or "0")
+            if start == "(0":
+                start = "-"
+            while True:
+                entries = await self.broker.connection.xrange(self.task_id, min=start, max="+", count=self.count)
+                for id, value in entries:
+                    message = decode_log_entry(id, value)
+                    if message is not None and self._matches(message):
+                        messages.append(self._message(message))
+                        if len(messages) == limit:
+                            return messages
+                if len(entries) < self.count:
+                    return messages
+                start = "(" + entries[-1][0].decode()
+        finally:
+            await self.broker.connection.aclose()
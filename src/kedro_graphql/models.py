@@ -1,3 +1,4 @@
+import dataclasses
 import json
 from copy import deepcopy
 from datetime import datetime
@@ -181,9 +182,14 @@ class DataSet:
     # credentials: Optional[List[CredentialInput]]
     tags: Optional[List[Tag]] = None
 
+    def __post_init__(self):
+        # a config given as a dict, e.g. a subdocument read from the backend
+        if isinstance(self.config, dict):
+            self.set_config(self.config)
+
     @strawberry.field
     def exists(self) -> bool:
-        if self.config:
+        if self.has_config():
             return AbstractDataset.from_config(self.name, self.parse_config()).exists()
         else:
             return False
@@ -206,9 +212,28 @@ class DataSet:
         """
         Returns serializable dict in format compatible with kedro.
         """
-        temp = self.__dict__.copy()
-        temp.pop("name")
-        return {self.name: json.loads(temp['config'])}
+        return {self.name: self.parse_config()}
+
+    def encode(self) -> dict:
+        """
+        Returns a dict for storage, with the config as a native (sub)document.
+        """
+        try:
+            config = self.parse_config() if self.has_config() else None
+        except DataSetConfigError:
+            # store invalid configs as they were given
+            config = self.config
+        return {"name": self.name, "config": jsonable_encoder(config), "tags": jsonable_encoder(self.tags)}
+
+    def has_config(self) -> bool:
+        return self.config is not None
+
+    def set_config(self, config: dict) -> None:
+        """
+        Set the config from a dictionary, which is kept as the parsed config.
+        """
+        self.config = json.dumps(config)
+        self._parsed_config = (self.config, config)
 
     @staticmethod
     def decode(payload):
@@ -224,6 +249,8 @@ class DataSet:
                   "tags":[{"key": "owner name", "value": "harinlee0803"},{"key": "owner email", "value": "test@example.com"}]
                 }
 
+                The config may also be a dict, as stored by the backend.
+
         """
         if payload.get("tags", False):
             tags = [Tag(**t) for t in payload["tags"]]
@@ -231,8 +258,8 @@ class DataSet:
             tags = None
 
         return DataSet(
-            name=payload["name"],
-            config=payload["config"],
+            name=payload.get("name"),
+            config=payload.get("config"),
             tags=tags
         )
 
@@ -254,12 +281,20 @@ class DataSet:
              'load_args': [{'name': 'say', 'value': 'hello'}]}
 
         """
-        try:
-            return json.loads(self.config)
-        except json.JSONDecodeError as e:
-            raise DataSetConfigError(f"Unable to parse JSON in config: {e}")
-        except Exception as e:
-            raise DataSetConfigError(f"Invalid dataset configuration: {e}")
+        # the config is parsed once per JSON string, a new string is parsed again
+        cached = getattr(self, "_parsed_config", None)
+        if cached is None or cached[0] is not self.config:
+            try:
+                config = json.loads(self.config)
+            except json.JSONDecodeError as e:
+                raise DataSetConfigError(f"Unable to parse JSON in config: {e}")
+            except Exception as e:
+                raise DataSetConfigError(f"Invalid dataset configuration: {e}")
+            if not isinstance(config, dict):
+                raise DataSetConfigError("Invalid dataset configuration: must be a JSON object")
+            cached = self._parsed_config = (self.config, config)
+        # the caller may modify the returned dict, use set_config to store the changes
+        return deepcopy(cached[1])
 
     def parse_filepath(self) -> tuple[str, str]:
         """
@@ -409,6 +444,10 @@ class PageMeta:
     next_cursor: Optional[str] = strawberry.field(
         description="The next cursor to continue with."
     )
+    previous_cursor: Optional[str] = strawberry.field(
+        default=None,
+        description="The cursor of the previous page, if any."
+    )
 
 
 @strawberry.type
@@ -598,6 +637,82 @@ class State(Enum):
     RECEIVED = 'RECEIVED'
 
 
+@strawberry.type
+class DataSetProfile:
+    name: str
+    load_time: Optional[float] = strawberry.field(default=None, description="Seconds spent loading the dataset.")
+    save_time: Optional[float] = strawberry.field(default=None, description="Seconds spent saving the dataset.")
+
+
+@strawberry.type
+class NodeProfile:
+    node: str
+    wall_time: float = strawberry.field(description="Seconds the node's function ran.")
+    cpu_time: float = strawberry.field(description="CPU seconds of the process while the node's function ran.")
+    load_time: float = strawberry.field(description="Seconds spent loading the node's inputs.")
+    save_time: float = strawberry.field(description="Seconds spent saving the node's outputs.")
+    failed: bool = False
+    peak_rss_delta_kb: Optional[int] = strawberry.field(
+        default=None, description="Growth in kilobytes of the peak resident memory of the process while the node ran.")
+    datasets: List[DataSetProfile] = strawberry.field(default_factory=list)
+
+
+@strawberry.type
+class PipelineProfile:
+    wall_time: float
+    cpu_time: float
+    load_time: float
+    save_time: float
+    peak_rss_kb: Optional[int] = strawberry.field(
+        default=None, description="Peak resident memory in kilobytes of the process that ran the nodes.")
+    nodes: List[NodeProfile] = strawberry.field(default_factory=list)
+
+    @classmethod
+    def decode(cls, payload):
+        """Factory method to create a new PipelineProfile from a stored profile or a graphql api response.
+        """
+        payload = {to_snake_case(k): v for k, v in payload.items()}
+        nodes = []
+        for n in payload.pop("nodes", None) or []:
+            n = {to_snake_case(k): v for k, v in n.items()}
+            n["datasets"] = [DataSetProfile(**{to_snake_case(k): v for k, v in d.items()})
+                             for d in n.get("datasets") or []]
+            nodes.append(NodeProfile(**n))
+        return PipelineProfile(nodes=nodes, **payload)
+
+
+@strawberry.type
+class NodeProfileSummary:
+    node: str
+    runs: int = strawberry.field(description="The number of profiled runs of the node.")
+    failures: int
+    mean_wall_time: float
+    max_wall_time: float
+    mean_cpu_time: float
+    mean_load_time: float
+    mean_save_time: float
+    max_peak_rss_delta_kb: Optional[int] = None
+
+
+@strawberry.type
+class PipelineProfileSummary:
+    name: str
+    runs: int = strawberry.field(description="The number of profiled runs summarised.")
+    nodes: List[NodeProfileSummary] = strawberry.field(description="The nodes, slowest first.")
+
+    @classmethod
+    def decode(cls, payload, decoder=None):
+        """Factory method to create a new PipelineProfileSummary from a graphql api response.
+        """
+        if decoder == "graphql":
+            result = payload["pipelineProfileSummary"]
+            return PipelineProfileSummary(name=result["name"], runs=result.get("runs", 0),
+                                          nodes=[NodeProfileSummary(**{to_snake_case(k): v for k, v in n.items()})
+                                                 for n in result.get("nodes", [])])
+        else:
+            raise TypeError("decoder must be 'graphql'")
+
+
 @strawberry.type
 class PipelineStatus:
     state: State
@@ -617,6 +732,7 @@ class PipelineStatus:
     task_traceback: Optional[str] = None
     task_einfo: Optional[str] = None
     task_result: Optional[str] = None
+    profile: Optional[PipelineProfile] = None
 
 
 @strawberry.type
@@ -624,8 +740,6 @@ class Pipeline:
     id: Optional[strawberry.ID] = None
     name: str
     data_catalog: Optional[List[DataSet]] = None
-    describe: Optional[str] = None
-    nodes: Optional[List[Node]] = None
     parameters: Optional[List[Parameter]] = None
     status: List[PipelineStatus] = strawberry.field(default_factory=list)
     tags: Optional[List[Tag]] = None
@@ -634,6 +748,37 @@ class Pipeline:
     project_version: Optional[str] = None
     pipeline_version: Optional[str] = None
     kedro_graphql_version: Optional[str] = None
+    # describe and nodes given to the pipeline or read with it, e.g. from a
+    # graphql response or a document stored by an earlier version; the graphql
+    # fields resolve them from the template and fall back to these values
+    describe: strawberry.Private[Optional[str]] = None
+    nodes: strawberry.Private[Optional[List[Node]]] = None
+
+    @staticmethod
+    def _templates(info: strawberry.Info):
+        if not isinstance(info.context, dict):
+            return None
+        request = info.context.get("request")
+        return getattr(getattr(request, "app", None), "pipeline_templates", None)
+
+    @strawberry.field(name="describe",
+                      description="Description of the pipeline's template, resolved from the running project.")
+    def resolve_describe(self, info: strawberry.Info) -> Optional[str]:
+        templates = self._templates(info)
+        if templates is not None:
+            describe = templates.describe(self.name, self.project_version, self.pipeline_version)
+            if describe is not None:
+                return describe
+        return self.describe
+
+    @strawberry.field(name="nodes", description="Nodes of the pipeline's template, resolved from the running project.")
+    def resolve_nodes(self, info: strawberry.Info) -> Optional[List[Node]]:
+        templates = self._templates(info)
+        if templates is not None:
+            nodes = templates.nodes(self.name, self.project_version, self.pipeline_version)
+            if nodes is not None:
+                return nodes
+        return self.nodes
 
     def serialize(self):
         parameters = {}
@@ -662,7 +807,16 @@ class Pipeline:
             p = deepcopy(self)
             # if type ObjectID the jsonable_encoder will throw an error
             p.id = str(p.id)
+            # dataset configs are stored as documents, not JSON strings
+            data_catalog, p.data_catalog = p.data_catalog, None
             encoded_pipeline = jsonable_encoder(p)
+            encoded_pipeline["data_catalog"] = [d.encode() for d in data_catalog] if data_catalog is not None else None
+            # fields with resolvers and the template's describe and nodes are not stored
+            for f in dataclasses.fields(p):
+                if not f.init:
+                    encoded_pipeline.pop(f.name, None)
+            encoded_pipeline.pop("describe", None)
+            encoded_pipeline.pop("nodes", None)
 
             return encoded_pipeline
         elif encoder == "kedro":
@@ -704,6 +858,13 @@ class Pipeline:
 
     @staticmethod
     def decode_dict(payload):
+        """Create a new Pipeline from a dictionary.
+
+        The payload may be a partial document (e.g. the result of a projected
+        backend read); fields missing from the payload are left unset. The
+        default runner is only filled in for complete status entries, which
+        always hold the required ``session``, so a projection leaves it unset.
+        """
         if payload.get("tags", None):
             tags = [Tag(**t) for t in payload["tags"]]
         else:
@@ -716,9 +877,9 @@ class Pipeline:
 
         if payload.get("status", None):
             status = [PipelineStatus(
-                state=State[s["state"]],
-                session=s["session"],
-                runner=s.get("runner", "kedro.runner.SequentialRunner"),
+                state=State[s["state"]] if s.get("state") else None,
+                session=s.get("session"),
+                runner=s.get("runner", "kedro.runner.SequentialRunner" if "session" in s else None),
                 filtered_nodes=s.get("filtered_nodes"),
                 started_at=datetime.fromisoformat(
                     s["started_at"]) if s.get("started_at") else None,
@@ -736,7 +897,8 @@ class Pipeline:
                 task_exception=s.get("task_exception"),
                 task_traceback=s.get("task_traceback"),
                 task_einfo=s.get("task_einfo"),
-                task_result=s.get("task_result")
+                task_result=s.get("task_result"),
+                profile=PipelineProfile.decode(s["profile"]) if s.get("profile") else None
             ) for s in payload["status"]]
         else:
             status = []
@@ -748,7 +910,7 @@ class Pipeline:
 
         return Pipeline(
             id=payload.get("id", None),
-            name=payload["name"],
+            name=payload.get("name", None),
             data_catalog=data_catalog,
             parameters=parameters,
             status=status,
@@ -758,7 +920,9 @@ class Pipeline:
             parent=payload.get("parent", None),
             project_version=payload.get("project_version", None),
             pipeline_version=payload.get("pipeline_version", None),
-            kedro_graphql_version=payload.get("kedro_graphql_version", None)
+            kedro_graphql_version=payload.get("kedro_graphql_version", None),
+            describe=payload.get("describe", None),
+            nodes=[Node(**n) for n in payload["nodes"]] if payload.get("nodes", None) else None
         )
 
     @classmethod
@@ -788,6 +952,25 @@ class Pipelines:
             raise TypeError("decoder must be 'graphql'")
 
 
+@strawberry.type
+class CreatePipelineResult:
+    pipeline: Optional[Pipeline] = strawberry.field(
+        default=None, description="The created pipeline, if it could be stored.")
+    error: Optional[str] = strawberry.field(
+        default=None, description="Why the pipeline could not be created or submitted.")
+
+    @classmethod
+    def decode(cls, payload, decoder=None):
+        """Factory method to create a list of CreatePipelineResult from a graphql api response.
+        """
+        if decoder == "graphql":
+            return [CreatePipelineResult(
+                pipeline=Pipeline.decode(r["pipeline"], decoder="graphql") if r.get("pipeline") else None,
+                error=r.get("error")) for r in payload["createPipelines"]]
+        else:
+            raise TypeError("decoder must be 'graphql'")
+
+
 @strawberry.type
 class PipelineEvent:
     id: str
@@ -815,6 +998,8 @@ class PipelineLogMessage:
     message_id: str
     task_id: str
     time: str
+    level: Optional[str] = None
+    logger: Optional[str] = None
 
     @classmethod
     def decode(cls, payload, decoder=None):
@@ -826,7 +1011,90 @@ class PipelineLogMessage:
                                       message=result.get("message", ""),
                                       message_id=result.get("message_id", ""),
                                       task_id=result.get("task_id", ""),
-                                      time=result.get("time", ""))
+                                      time=result.get("time", ""),
+                                      level=result.get("level"),
+                                      logger=result.get("logger"))
+        else:
+            raise TypeError("decoder must be 'graphql'")
+
+
+@strawberry.type
+class PipelineLogBatch:
+    id: str
+    task_id: str
+    messages: List[PipelineLogMessage]
+
+    @classmethod
+    def decode(cls, payload, decoder=None):
+        """Factory method to create a new PipelineLogBatch from a graphql api response.
+        """
+        if decoder == "graphql":
+            result = payload["pipelineLogBatches"]
+            return PipelineLogBatch(id=result["id"],
+                                    task_id=result.get("taskId", ""),
+                                    messages=[PipelineLogMessage.decode({"pipelineLogs": m}, decoder="graphql")
+                                              for m in result.get("messages", [])])
+        else:
+            raise TypeError("decoder must be 'graphql'")
+
+
+@strawberry.type
+class PipelineLogHistory:
+    messages: List[PipelineLogMessage] = strawberry.field(
+        description="The log messages of the page, oldest first.")
+    page_meta: PageMeta = strawberry.field(description="Metadata to aid in pagination.")
+
+    @classmethod
+    def decode(cls, payload, decoder=None):
+        """Factory method to create a new PipelineLogHistory from a graphql api response.
+        """
+        if decoder == "graphql":
+            result = payload["pipelineLogHistory"]
+            meta = {to_snake_case(k): v for k, v in result["pageMeta"].items()}
+            return PipelineLogHistory(page_meta=PageMeta(**meta),
+                                      messages=[PipelineLogMessage.decode({"pipelineLogs": m}, decoder="graphql")
+                                                for m in result.get("messages", [])])
+        else:
+            raise TypeError("decoder must be 'graphql'")
+
+
+@strawberry.type
+class NodeEvent:
+    event: str
+    timestamp: str
+    node: Optional[str] = None
+    error: Optional[str] = None
+
+
+@strawberry.type
+class PipelineProgress:
+    id: str
+    task_id: str
+    session: str
+    total: int = strawberry.field(description="The number of nodes of the run.")
+    completed: int = strawberry.field(description="The number of nodes that completed.")
+    running: List[str] = strawberry.field(description="The names of the nodes running.")
+    failed: List[str] = strawberry.field(description="The names of the nodes that failed.")
+    finished: bool = strawberry.field(description="Whether the run ended, no further progress is sent.")
+    last_event: Optional[NodeEvent] = None
+
+    @classmethod
+    def decode(cls, payload, decoder=None):
+        """Factory method to create a new PipelineProgress from a graphql api response.
+        """
+        if decoder == "graphql":
+            result = {to_snake_case(k): v for k, v in payload["pipelineProgress"].items()}
+            last_event = result.get("last_event")
+            return PipelineProgress(id=result["id"],
+                                    task_id=result.get("task_id", ""),
+                                    session=result.get("session", ""),
+                                    total=result.get("total", 0),
+                                    completed=result.get("completed", 0),
+                                    running=result.get("running", []),
+                                    failed=result.get("failed", []),
+                                    finished=result.get("finished", False),
+                                    last_event=NodeEvent(**{to_snake_case(k): v for k, v in last_event.items()})
+                                    if last_event else None)
         else:
             raise TypeError("decoder must be 'graphql'")
 
@@ -1,35 +1,53 @@
 import asyncio
+import json
 import logging
+import os
+import select
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
-from queue import Empty as QueueEmptyException
-from queue import Queue
-from threading import Thread
 from typing import AsyncGenerator
 
+import redis
+import redis.asyncio as redis_asyncio
 from celery.states import READY_STATES
 from starlette.concurrency import run_in_threadpool
 
 logger = logging.getLogger("kedro-graphql")
 
+# states after which a pipeline emits no further events
+TERMINAL_STATES = set(READY_STATES).union({"ABORTED"})
 
-class PipelineEventMonitor:
-    def __init__(self, app=None, task_id=None, timeout=1):
-        """
-        Kwargs:
-            app (Celery): celery application instance.
-            uuid (str): a celery task id.
-            timeout (float): See https://docs.python.org/3/library/queue.html#queue.Queue.get
-        """
-        self.task_id = task_id
-        self.app = app
-        self.timeout = timeout
 
-    @staticmethod
-    def _task_event_receiver(app, queue, task_id):
-        """
-        Recieves task events from backend broker and puts them in a 
-        Queue.  Incoming tasks are filtered and only tasks with a 
-        root_id or uuid matching the provided id are put in the Queue.
+def pipeline_events_channel(id) -> str:
+    """Name of the Redis pub/sub channel carrying the events of a pipeline."""
+    return f"kedro_graphql:pipeline_events:{id}"
+
+
+def task_abort_channel(task_id) -> str:
+    """Name of the Redis pub/sub channel notifying the worker running a task of its abort."""
+    return f"kedro_graphql:task_abort:{task_id}"
+
+
+def pipeline_event(id, task_id=None, status=None, result=None, traceback=None, timestamp=None) -> dict:
+    """Build a pipeline event payload, as yielded by the ``pipeline`` subscription."""
+    return {"id": str(id),
+            "task_id": task_id,
+            "status": status,
+            "result": None if result is None else str(result),
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "traceback": traceback}
+
+
+class CeleryEventReceiver:
+    """Receives the celery task events of the whole cluster in a single thread.
+
+    One receiver, with one broker connection, exists per celery app and API
+    process, whatever the number of ``PipelineEventMonitor.consume`` calls. It
+    keeps a ``celery.events.State`` of the tasks and hands the events of
+    subscribed tasks, matched by ``uuid`` or ``root_id``, to the asyncio queue
+    of each subscriber through its event loop's ``call_soon_threadsafe``.
 
         Example event payloads:
 
@@ -37,74 +55,146 @@ class PipelineEventMonitor:
         {'hostname': 'celery@alligator', 'utcoffset': 5, 'pid': 37029, 'clock': 7867, 'uuid': 'd8253d45-ce28-4719-b2ba-8e266dfdaf04', 'timestamp': 1672860581.1411166, 'type': 'task-started', 'local_received': 1672860581.144976}
         {'hostname': 'celery@alligator', 'utcoffset': 5, 'pid': 37029, 'clock': 7870, 'uuid': 'd8253d45-ce28-4719-b2ba-8e266dfdaf04', 'result': "'success'", 'runtime': 2.013245126003312, 'timestamp': 1672860583.1549191, 'type': 'task-succeeded', 'local_received': 1672860583.158338}
 
-        Args:
-            app (Celery): celery application instance.
-            queue (Queue):  a python queue.Queue.
-            task_id (str):  celery task id.
+    Kwargs:
+        app (Celery): celery application instance.
+        reconnect_interval (float): seconds to wait before reconnecting after the
+            broker connection failed.
+    """
 
-        """
+    _instances = {}
+    _instances_lock = threading.Lock()
 
-        def process_tasks(event):
-            if event.get("root_id", "") == task_id or event.get("uuid") == task_id:
-                queue.put(event)
-
-        with app.connection() as connection:
-            recv = app.events.Receiver(connection, handlers={
-                'task-sent': process_tasks,
-                'task-recieved': process_tasks,
-                'task-started': process_tasks,
-                'task-succeeded': process_tasks,
-                'task-failed': process_tasks,
-                'task-rejected': process_tasks,
-                'task-revoked': process_tasks,
-                'task-retried': process_tasks
-            })
-
-            recv.capture(limit=None, timeout=None, wakeup=True)
-
-    def _start_task_event_receiver_thread(self, queue):
-        """
-        Start the task event receiver in a thread.
+    def __init__(self, app=None, reconnect_interval=1.0):
+        self.app = app
+        self.reconnect_interval = reconnect_interval
+        # https://docs.celeryq.dev/en/stable/reference/celery.events.state.html#module-celery.events.state
+        self.state = app.events.State()
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._receiver = None
+        self._stopped = threading.Event()
 
-        Args:
-            queue (Queue): a python queue.Queue.
+    @classmethod
+    def get(cls, app) -> "CeleryEventReceiver":
+        """Return the receiver of a celery app, creating it on first use."""
+        with cls._instances_lock:
+            receiver = cls._instances.get(id(app))
+            if receiver is None or receiver.app is not app:
+                receiver = cls._instances[id(app)] = cls(app=app)
+            return receiver
 
-        Returns:
-            worker (threading.Thread): a python thread object.
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Start receiving the events of a task in the returned queue.
 
+        Must be called from the event loop consuming the queue. Starts the
+        receiver thread if it is not running; once started it keeps its
+        connection open until ``stop``.
         """
-        worker = Thread(target=self._task_event_receiver,
-                        args=(self.app, queue, self.task_id))
-        worker.daemon = True
-        worker.start()
-        logger.info("started event reciever thread")
-        return worker
+        queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[task_id].add((asyncio.get_running_loop(), queue))
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="celery-event-receiver", daemon=True)
+                self._thread.start()
+                logger.info("started event receiver thread")
+        return queue
 
-    async def consume(self) -> AsyncGenerator[dict, None]:
-        q = Queue()
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        """Stop delivering events to a queue returned by ``subscribe``."""
+        with self._lock:
+            subscribers = self._subscribers.get(task_id)
+            if subscribers is None:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[task_id]
 
-        event_thread = self._start_task_event_receiver_thread(q)
-        # https://docs.celeryq.dev/en/stable/reference/celery.events.state.html#module-celery.events.state
-        state = self.app.events.State()
+    def subscribers(self) -> int:
+        """Number of queues currently receiving events."""
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
 
-        while True:
+    def stop(self):
+        """Stop the receiver thread; ``get`` returns a new receiver afterwards."""
+        with self._instances_lock:
+            if self._instances.get(id(self.app)) is self:
+                del self._instances[id(self.app)]
+        self._stopped.set()
+        if self._receiver is not None:
+            self._receiver.should_stop = True
+
+    def _run(self):
+        while not self._stopped.is_set():
             try:
-                event = q.get(timeout=self.timeout)
-                state.event(event)
-                # task name is sent only with -received event, and state
-                # will keep track of this for us.
-                task = state.tasks.get(event['uuid'])
-                yield {"task_id": task.id, "status": task.state, "result": task.result, "timestamp": task.timestamp, "traceback": task.traceback}
-                q.task_done()
-                if task.state in READY_STATES:
-                    break
-            except QueueEmptyException:
-                if self.app.AsyncResult(self.task_id).status in READY_STATES:
-                    break
-                else:
-                    continue
+                with self.app.connection() as connection:
+                    self._receiver = self.app.events.Receiver(connection, handlers={"*": self._on_event})
+                    self._receiver.capture(limit=None, timeout=None, wakeup=True)
+            except Exception as e:
+                logger.warning(f"celery event receiver disconnected ({e}), reconnecting in {self.reconnect_interval}s")
+                self._stopped.wait(self.reconnect_interval)
+            finally:
+                self._receiver = None
+
+    def _on_event(self, event: dict):
+        self.state.event(event)
+        if not event.get("type", "").startswith("task-"):
+            return
+        with self._lock:
+            targets = set(self._subscribers.get(event.get("uuid"), ()))
+            if event.get("root_id"):
+                targets.update(self._subscribers.get(event["root_id"], ()))
+        if not targets:
+            return
+        # snapshot the task here, State is only ever touched by this thread
+        task = self.state.tasks.get(event["uuid"])
+        payload = {"task_id": task.id, "status": task.state, "result": task.result,
+                   "timestamp": task.timestamp, "traceback": task.traceback}
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, dict(payload))
+            except RuntimeError:
+                # the subscriber's event loop is closed
+                pass
+
+
+class PipelineEventMonitor:
+    def __init__(self, app=None, task_id=None, timeout=1):
+        """
+        Kwargs:
+            app (Celery): celery application instance.
+            uuid (str): a celery task id.
+            timeout (float): seconds ``consume`` waits for an event before checking
+                the task's status in the result backend.
+        """
+        self.task_id = task_id
+        self.app = app
+        self.timeout = timeout
 
-        event_thread.join(timeout=0.1)
+    async def consume(self) -> AsyncGenerator[dict, None]:
+        """Yield the celery task events of the task, as received in real time.
+
+        Events are dispatched by the process wide ``CeleryEventReceiver`` of the
+        celery app. When no event arrives within ``timeout`` seconds the result
+        backend is checked in case the final event was missed.
+        """
+        receiver = CeleryEventReceiver.get(self.app)
+        queue = receiver.subscribe(self.task_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    status = await run_in_threadpool(lambda: self.app.AsyncResult(self.task_id).status)
+                    if status in READY_STATES:
+                        break
+                    continue
+                yield event
+                if event["status"] in READY_STATES:
+                    break
+        finally:
+            receiver.unsubscribe(self.task_id, queue)
 
     async def start(self, interval=0.5) -> AsyncGenerator[dict, None]:
         """
@@ -174,3 +264,252 @@ class PipelineEventMonitor:
                 }
                 break
             await asyncio.sleep(interval)
+
+
+class PipelineEventPublisher:
+    """Publishes pipeline state transitions to the pipeline's Redis channel.
+
+    Used by the celery workers. Publishing is best effort: the backend stays
+    the source of truth and subscribers re-read it when the channel is quiet,
+    so a failed publish is logged and otherwise ignored.
+
+    Kwargs:
+        broker_url (str): URL of the Redis broker.
+    """
+
+    def __init__(self, broker_url=None):
+        self.broker_url = broker_url
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        # celery forks its pool processes, never share a socket across a fork
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = redis.Redis.from_url(self.broker_url)
+            self._pid = os.getpid()
+        return self._connection
+
+    def publish(self, id, task_id=None, status=None, result=None, traceback=None) -> bool:
+        """Publish an event of pipeline ``id``.
+
+        Returns:
+            bool: whether the event was handed to the broker.
+        """
+        event = pipeline_event(id, task_id=task_id, status=status, result=result, traceback=traceback)
+        try:
+            self.connection.publish(pipeline_events_channel(id), json.dumps(event))
+            return True
+        except Exception as e:
+            logger.warning(f"failed to publish {status} event of pipeline {id}: {e}")
+            return False
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+
+async def publish_pipeline_event(broker_url, id, task_id=None, status=None, result=None, traceback=None) -> bool:
+    """Async counterpart of ``PipelineEventPublisher.publish`` for the API process."""
+    event = pipeline_event(id, task_id=task_id, status=status, result=result, traceback=traceback)
+    connection = redis_asyncio.from_url(broker_url)
+    try:
+        await connection.publish(pipeline_events_channel(id), json.dumps(event))
+        return True
+    except Exception as e:
+        logger.warning(f"failed to publish {status} event of pipeline {id}: {e}")
+        return False
+    finally:
+        await connection.aclose()
+
+
+async def publish_task_abort(broker_url, task_id) -> bool:
+    """Notify the worker running ``task_id`` that it was aborted, see ``TaskAbortListener``."""
+    connection = redis_asyncio.from_url(broker_url)
+    try:
+        await connection.publish(task_abort_channel(task_id), "ABORTED")
+        return True
+    except Exception as e:
+        logger.warning(f"failed to publish the abort of task {task_id}: {e}")
+        return False
+    finally:
+        await connection.aclose()
+
+
+class TaskAbortListener:
+    """Waits for the abort notification of a task on its Redis channel.
+
+    Used by the celery workers supervising a pipeline run. Like the events
+    channel it is best effort: the abort is stored in the result backend
+    first, which the worker still reads now and then in case a notification
+    is lost.
+
+    Args:
+        broker_url (str): URL of the Redis broker.
+        task_id (str): id of the task.
+        poll_interval (float): seconds between checks of the sentinels while
+            the channel is reconnecting.
+
+    Raises:
+        redis.exceptions.RedisError: if the channel cannot be subscribed.
+    """
+
+    def __init__(self, broker_url, task_id, poll_interval=0.1):
+        self.task_id = task_id
+        self.poll_interval = poll_interval
+        self.connection = redis.Redis.from_url(broker_url)
+        self.pubsub = self.connection.pubsub()
+        self.pubsub.subscribe(task_abort_channel(task_id))
+        self.listening = True
+
+    def _received(self, timeout: float = 0) -> bool:
+        """Read the messages received within ``timeout`` seconds, whether one of them is the abort notification."""
+        received = False
+        try:
+            # get_message reconnects and resubscribes a dropped connection
+            message = self.pubsub.get_message(timeout=timeout)
+            while message is not None:
+                received = received or message["type"] == "message"
+                message = self.pubsub.get_message(timeout=0)
+            return received
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"lost the abort channel of task {self.task_id}: {e}")
+            self.close()
+            return received
+
+    def _socket(self):
+        """The socket of the channel's connection, None while it is not connected."""
+        # redis-py has no public accessor for the socket of a connection
+        connection = self.pubsub.connection
+        return getattr(connection, "_sock", None) if connection is not None else None
+
+    def wait(self, sentinels: list, timeout: float) -> bool:
+        """Wait for the abort notification, until one of ``sentinels`` is ready or for ``timeout`` seconds.
+
+        Blocks in ``select`` on the channel's socket and the sentinels together.
+        While the channel is not connected, e.g. after its connection dropped,
+        ``get_message`` reconnects it and the sentinels are checked every
+        ``poll_interval`` seconds instead.
+
+        Args:
+            sentinels (list): file descriptors or objects with a ``fileno``,
+                e.g. the ``sentinel`` of the child process running the pipeline.
+            timeout (float): maximum seconds to wait.
+
+        Returns:
+            bool: whether the task was aborted.
+        """
+        deadline = time.monotonic() + timeout
+        while self.listening:
+            # get_message returning None means no complete reply is buffered
+            if self._received():
+                return True
+            remaining = max(deadline - time.monotonic(), 0)
+            sock = self._socket()
+            if sock is None:
+                if self._received(min(self.poll_interval, remaining)):
+                    return True
+                if remaining == 0 or select.select(sentinels, [], [], 0)[0]:
+                    return False
+                continue
+            ready = select.select([sock, *sentinels], [], [], remaining)[0]
+            if sock not in ready:
+                # a sentinel is ready or the wait timed out
+                return False
+        select.select(sentinels, [], [], max(deadline - time.monotonic(), 0))
+        return False
+
+    def close(self):
+        self.listening = False
+        try:
+            self.pubsub.close()
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class PipelineEventStream:
+    """Pushes the events of a pipeline from its Redis channel.
+
+    The channel is subscribed before the backend is read, so no transition
+    published in between is lost. The first event is the pipeline's current
+    state, subsequent events are the transitions published by the workers
+    (see ``PipelineEventPublisher``). Whenever the channel stays quiet for
+    ``idle_interval`` seconds the backend is read again, which bounds how long
+    a lost message (pub/sub is fire and forget) can go unnoticed.
+    """
+
+    @classmethod
+    async def create(cls, id, broker_url=None):
+        """Factory method for async instantiation of PipelineEventStream objects.
+
+        Raises:
+            redis.exceptions.RedisError: if the channel cannot be subscribed.
+        """
+        self = PipelineEventStream()
+        self.id = str(id)
+        self.broker_url = broker_url
+        self.connection = redis_asyncio.from_url(broker_url)
+        self.pubsub = self.connection.pubsub()
+        try:
+            await self.pubsub.subscribe(pipeline_events_channel(self.id))
+        except Exception:
+            await self.close()
+            raise
+        return self
+
+    @staticmethod
+    def _status_event(p) -> dict:
+        """Event describing the latest status of pipeline ``p``, or None if it has no task yet."""
+        status = p.status[-1]
+        if not status.task_id:
+            return None
+        state = status.state.value
+        timestamp = status.finished_at.isoformat() if state in TERMINAL_STATES and status.finished_at else None
+        return pipeline_event(p.id, task_id=status.task_id, status=state, result=status.task_result,
+                              traceback=status.task_traceback, timestamp=timestamp)
+
+    async def _read(self, backend) -> dict:
+        p = await backend.read(id=self.id, projection=["status"])
+        if p is None:
+            return None
+        return self._status_event(p)
+
+    async def consume(self, backend, pipeline=None, idle_interval=30) -> AsyncGenerator[dict, None]:
+        """Yield the events of the pipeline until it reaches a terminal state.
+
+        Args:
+            backend (BaseBackend): backend read on connect and when the channel is idle.
+
+        Kwargs:
+            pipeline (Pipeline): the pipeline with at least its ``status``, if it was
+                already read after subscribing; saves the read on connect.
+            idle_interval (float): seconds without a message after which the backend is read.
+        """
+        last = None
+        try:
+            event = self._status_event(pipeline) if pipeline is not None else await self._read(backend)
+            while True:
+                if event is not None and (event["task_id"], event["status"]) != last:
+                    last = (event["task_id"], event["status"])
+                    yield event
+                    if event["status"] in TERMINAL_STATES:
+                        break
+                message = await self.pubsub.get_message(timeout=idle_interval)
+                if message is None:
+                    event = await self._read(backend)
+                elif message["type"] == "message":
+                    event = json.loads(message["data"])
+                else:
+                    # e.g. the subscribe confirmation
+                    event = None
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Unsubscribe from the channel and close the Redis connection."""
+        try:
+            await self.pubsub.aclose()
+        finally:
+            await self.connection.aclose()
@@ -0,0 +1,152 @@
+"""Per-node profiles of pipeline runs.
+
+``NodeProfileHooks`` fills a ``RunProfile`` in the process running the
+nodes: the wall and CPU time of each node, the growth of the process's peak
+resident memory while it ran and the time spent loading its inputs and saving
+its outputs. The summary of a run is stored as ``status.profile`` of the
+pipeline, ``aggregate_profiles`` summarises the profiles of several runs.
+
+CPU time and peak memory are measured for the whole process, they only
+isolate a node when the nodes run one at a time, e.g. with the
+``SequentialRunner``. Nodes run by the ``ParallelRunner`` run in processes of
+their own and are not profiled.
+"""
+
+import sys
+import threading
+import time
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover, not available on Windows
+    resource = None
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of the process in kilobytes, None where unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _round(seconds: float) -> float:
+    return round(seconds, 4)
+
+
+class RunProfile:
+    """Timings and peak memory of the nodes run by a process, in the order they started."""
+
+    def __init__(self):
+        self._nodes = {}
+        self._lock = threading.Lock()
+
+    def _node(self, name: str) -> dict:
+        with self._lock:
+            if name not in self._nodes:
+                self._nodes[name] = {"wall_time": 0.0, "cpu_time": 0.0, "peak_rss_delta_kb": None,
+                                     "failed": False, "datasets": {}, "_start": None}
+            return self._nodes[name]
+
+    def _dataset(self, node: str, dataset: str) -> dict:
+        datasets = self._node(node)["datasets"]
+        if dataset not in datasets:
+            datasets[dataset] = {"load_time": None, "save_time": None, "_start": None}
+        return datasets[dataset]
+
+    def start_node(self, node: str):
+        self._node(node)["_start"] = (time.perf_counter(), time.process_time(), peak_rss_kb())
+
+    def end_node(self, node: str, failed: bool = False):
+        profile = self._node(node)
+        if profile["_start"] is not None:
+            wall, cpu, rss = profile["_start"]
+            profile["wall_time"] = time.perf_counter() - wall
+            profile["cpu_time"] = time.process_time() - cpu
+            end_rss = peak_rss_kb()
+            profile["peak_rss_delta_kb"] = None if rss is None or end_rss is None else end_rss - rss
+            profile["_start"] = None
+        profile["failed"] = failed
+
+    def start_dataset(self, node: str, dataset: str):
+        self._dataset(node, dataset)["_start"] = time.perf_counter()
+
+    def end_dataset(self, node: str, dataset: str, field: str):
+        """Record the time since ``start_dataset`` as the ``load_time`` or ``save_time`` of a dataset."""
+        profile = self._dataset(node, dataset)
+        if profile["_start"] is not None:
+            profile[field] = time.perf_counter() - profile["_start"]
+            profile["_start"] = None
+
+    def summary(self) -> Optional[dict]:
+        """Compact summary of the profile, None if no node was profiled.
+
+        Times are in seconds, memory in kilobytes. ``peak_rss_delta_kb`` of a
+        node is 0 when it stayed below an earlier peak of the process.
+        """
+        with self._lock:
+            nodes = list(self._nodes.items())
+        if not nodes:
+            return None
+        summary = []
+        for name, profile in nodes:
+            datasets = [{"name": d, "load_time": _round(p["load_time"]) if p["load_time"] is not None else None,
+                         "save_time": _round(p["save_time"]) if p["save_time"] is not None else None}
+                        for d, p in profile["datasets"].items()]
+            summary.append({
+                "node": name,
+                "wall_time": _round(profile["wall_time"]),
+                "cpu_time": _round(profile["cpu_time"]),
+                "peak_rss_delta_kb": profile["peak_rss_delta_kb"],
+                "load_time": _round(sum(d["load_time"] or 0 for d in datasets)),
+                "save_time": _round(sum(d["save_time"] or 0 for d in datasets)),
+                "failed": profile["failed"],
+                "datasets": datasets,
+            })
+        return {
+            "wall_time": _round(sum(n["wall_time"] for n in summary)),
+            "cpu_time": _round(sum(n["cpu_time"] for n in summary)),
+            "load_time": _round(sum(n["load_time"] for n in summary)),
+            "save_time": _round(sum(n["save_time"] for n in summary)),
+            "peak_rss_kb": peak_rss_kb(),
+            "nodes": summary,
+        }
+
+
+def aggregate_profiles(profiles: list) -> list:
+    """Summarise the node profiles of several runs, slowest nodes first.
+
+    Args:
+        profiles (list): ``status.profile`` dicts of runs.
+
+    Returns:
+        list: a dict per node with the number of runs profiling it, its failures
+        and the mean and max of its timings and peak memory growth.
+    """
+    nodes = {}
+    for profile in profiles:
+        for n in (profile or {}).get("nodes", []):
+            nodes.setdefault(n["node"], []).append(n)
+
+    def mean(values):
+        return _round(sum(values) / len(values)) if values else 0.0
+
+    summaries = []
+    for name, runs in nodes.items():
+        wall = [n["wall_time"] for n in runs]
+        rss = [n["peak_rss_delta_kb"] for n in runs if n.get("peak_rss_delta_kb") is not None]
+        summaries.append({
+            "node": name,
+            "runs": len(runs),
+            "failures": sum(1 for n in runs if n.get("failed")),
+            "mean_wall_time": mean(wall),
+            "max_wall_time": max(wall),
+            "mean_cpu_time": mean([n["cpu_time"] for n in runs]),
+            "mean_load_time": mean([n["load_time"] for n in runs]),
+            "mean_save_time": mean([n["save_time"] for n in runs]),
+            "max_peak_rss_delta_kb": max(rss) if rss else None,
+        })
+    return sorted(summaries, key=lambda s: s["mean_wall_time"] + s["mean_load_time"] + s["mean_save_time"],
+                  reverse=True)
@@ -0,0 +1,174 @@
+"""Node progress of pipeline runs.
+
+``NodeProgressHooks`` adds an entry to a Redis stream of the run's Kedro
+session when the pipeline starts, before and after each node runs, when a
+node fails and when the pipeline ends. ``PipelineProgressStream`` folds the
+entries into the progress of the run for the ``pipelineProgress``
+subscription: the number of completed nodes out of the total and the nodes
+running.
+"""
+
+import logging
+import os
+from datetime import datetime, timezone
+from typing import AsyncGenerator
+
+import redis
+import redis.asyncio as redis_asyncio
+
+from .logs.logger import task_finished
+
+logger = logging.getLogger("kedro_graphql")
+
+# events of the progress streams
+PIPELINE_START = "pipeline_start"
+BEFORE_NODE_RUN = "before_node_run"
+AFTER_NODE_RUN = "after_node_run"
+ON_NODE_ERROR = "on_node_error"
+PIPELINE_END = "pipeline_end"
+
+
+def progress_stream_key(session_id: str) -> str:
+    """Key of the Redis stream of the node events of a Kedro session."""
+    return f"kedro_graphql:progress:{session_id}"
+
+
+class NodeProgressPublisher:
+    """Adds node events to the progress streams of Kedro sessions.
+
+    Publishing is best effort, like the pipeline events: a failure is logged
+    once per session and the session's later events are not published.
+
+    Kwargs:
+        broker_url (str): URL of the Redis broker.
+        expire (int): seconds the stream of a session is kept after its last event.
+    """
+
+    def __init__(self, broker_url=None, expire=86400):
+        self.broker_url = broker_url
+        self.expire = expire
+        self._connection = None
+        self._pid = None
+        self._failed = set()
+
+    @property
+    def connection(self):
+        # the hooks run in the worker and in the forked child running the pipeline
+        if self._connection is None or self._pid != os.getpid():
+            # a run must not hang on an unreachable broker
+            self._connection = redis.Redis.from_url(self.broker_url, socket_connect_timeout=5, socket_timeout=5)
+            self._pid = os.getpid()
+        return self._connection
+
+    def publish(self, session_id: str, event: str, **fields) -> bool:
+        """Add an event to the progress stream of a session.
+
+        Returns:
+            bool: whether the event was added.
+        """
+        if session_id is None or session_id in self._failed:
+            return False
+        entry = {"event": event, "timestamp": datetime.now(timezone.utc).isoformat(),
+                 **{k: str(v) for k, v in fields.items() if v is not None}}
+        key = progress_stream_key(session_id)
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            pipe.xadd(key, entry)
+            pipe.expire(key, self.expire)
+            pipe.execute()
+            return True
+        except Exception as e:
+            self._failed.add(session_id)
+            logger.warning(f"failed to publish the node progress of session {session_id}, "
+                           f"its later events are skipped: {e}")
+            return False
+
+
+class PipelineProgressStream:
+    """Progress of a pipeline run, read from the progress stream of its session.
+
+    Args:
+        session_id (str): the run's Kedro session.
+        task_id (str): the run's celery task, whose state ends the stream when
+            the run ended without a ``pipeline_end`` event.
+
+    Kwargs:
+        broker_url (str): URL of the Redis broker.
+        total (int): number of nodes of the run until its ``pipeline_start`` event is read.
+        block_ms (int): milliseconds a read waits for new events.
+    """
+
+    def __init__(self, session_id: str, task_id: str, broker_url=None, total: int = 0, block_ms: int = 5000):
+        self.session_id = session_id
+        self.task_id = task_id
+        self.block_ms = block_ms
+        self.connection = redis_asyncio.from_url(broker_url)
+        self.total = total
+        self.completed = 0
+        self.running = []
+        self.failed = []
+        self.last_event = None
+        self.finished = False
+
+    def progress(self) -> dict:
+        return {"session": self.session_id,
+                "task_id": self.task_id,
+                "total": self.total,
+                "completed": self.completed,
+                "running": list(self.running),
+                "failed": list(self.failed),
+                "finished": self.finished,
+                "last_event": self.last_event}
+
+    def apply(self, entry: dict):
+        """Fold a stream entry into the progress."""
+        event = entry.get("event")
+        node = entry.get("node")
+        if event == PIPELINE_START:
+            self.total = int(entry.get("total") or self.total)
+        elif event == BEFORE_NODE_RUN:
+            if node not in self.running:
+                self.running.append(node)
+        elif event in (AFTER_NODE_RUN, ON_NODE_ERROR):
+            if node in self.running:
+                self.running.remove(node)
+            if event == AFTER_NODE_RUN:
+                self.completed += 1
+            else:
+                self.failed.append(node)
+        elif event == PIPELINE_END:
+            self.running = []
+            self.finished = True
+        self.last_event = {"event": event, "node": node, "timestamp": entry.get("timestamp"),
+                           "error": entry.get("error")}
+
+    async def consume(self) -> AsyncGenerator[dict, None]:
+        """Yield the progress once with the events so far and after each read of new events.
+
+        A burst of events read at once yields a single update. Stops after the
+        ``pipeline_end`` event, or when the task is found finished while no
+        event arrives.
+        """
+        key = progress_stream_key(self.session_id)
+        start_id = "0"
+        first = True
+        try:
+            while True:
+                r = await self.connection.xread(count=1000, block=None if first else self.block_ms,
+                                                streams={key: start_id})
+                if r:
+                    for id, value in r[0][1]:
+                        start_id = id
+                        self.apply({k.decode(): v.decode() for k, v in value.items()})
+                    first = False
+                    yield self.progress()
+                elif first:
+                    first = False
+                    yield self.progress()
+                elif await task_finished(self.task_id):
+                    self.finished = True
+                    yield self.progress()
+                if self.finished:
+                    return
+        finally:
+            await self.connection.aclose()
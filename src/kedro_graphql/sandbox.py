@@ -0,0 +1,241 @@
+"""Pool of long-lived processes running the pipelines of a worker process.
+
+By default every ``run_pipeline`` task forks a child process which imports
+what the worker had not loaded yet and exits after the run. A
+``SandboxPool`` instead forks a few sandbox processes once, which load the
+project up front with their ``initializer`` and receive run requests over a
+pipe. A sandbox runs in its own process group so that aborting a run can
+signal it like a forked child, and it is replaced after ``max_runs`` runs,
+once its resident memory exceeds ``max_rss`` or when a run is aborted.
+"""
+
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+import billiard  # celery's multiprocessing fork
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss(pid: int) -> Optional[int]:
+    """Resident set size of a process in bytes, None where ``/proc`` is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _sandbox_main(conn, inherited: list, target: Callable, initializer: Optional[Callable], initargs: tuple):
+    """Main loop of a sandbox process, runs ``target`` on each request received on ``conn``."""
+    # the worker's ends of the pipes, the sandbox ends once the worker closes its end
+    for c in inherited:
+        c.close()
+    try:
+        # own process group, aborting a run signals the group
+        os.setsid()
+    except OSError:
+        pass
+    # the abort signals only interrupt a run, ``target`` handles them while running
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent_pid = os.getppid()
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            while not conn.poll(1):
+                if os.getppid() != parent_pid:
+                    # the worker process exited
+                    return
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = target(request)
+        except BaseException as e:
+            result = {"status": "error", "error": str(e), "traceback": traceback.format_exc()}
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        conn.send(result)
+
+
+class Sandbox:
+    """A sandbox process and the worker's end of its pipe.
+
+    Attributes:
+        runs (int): number of requests submitted to the sandbox.
+    """
+
+    def __init__(self, ctx, target: Callable, initializer: Optional[Callable] = None, initargs: tuple = (),
+                 inherited: list = ()):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_sandbox_main,
+                                   args=(child_conn, [self.conn, *inherited], target, initializer, initargs))
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def rss(self) -> Optional[int]:
+        return process_rss(self.pid)
+
+    def stop(self, timeout: float = 5):
+        """Close the pipe, which ends the sandbox, killing it after ``timeout`` seconds."""
+        self.conn.close()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self.process.join()
+
+
+class SandboxRun:
+    """A request running in a sandbox.
+
+    Has the ``pid``, ``is_alive`` and ``join`` of the process of a forked run,
+    the run is alive until its result is received or its sandbox exits.
+
+    Attributes:
+        results (queue.Queue): receives the result of the run.
+    """
+
+    def __init__(self, sandbox: Sandbox, request: dict):
+        self.sandbox = sandbox
+        self.results = queue.Queue(maxsize=1)
+        sandbox.conn.send(request)
+        sandbox.runs += 1
+
+    @property
+    def pid(self) -> int:
+        return self.sandbox.pid
+
+    def is_alive(self) -> bool:
+        return self.results.empty() and self.sandbox.is_alive()
+
+    @property
+    def sentinels(self) -> list:
+        """Ready when the result of the run is sent or the sandbox exits, see ``select.select``."""
+        return [self.sandbox.conn, self.sandbox.process.sentinel]
+
+    def join(self, timeout: float = None):
+        """Wait up to ``timeout`` seconds for the result of the run."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_alive():
+            wait = 1 if deadline is None else max(0, min(1, deadline - time.monotonic()))
+            try:
+                if self.sandbox.conn.poll(wait):
+                    self.results.put(self.sandbox.conn.recv())
+            except (EOFError, OSError):
+                # the sandbox exited, ``is_alive`` is now False
+                self.sandbox.process.join(1)
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+
+class SandboxPool:
+    """Sandbox processes of a worker process, forked on ``start`` or on first use.
+
+    Args:
+        target (callable): function run in a sandbox with each request, returning
+            the result dict of the run.
+
+    Kwargs:
+        size (int): number of sandboxes.
+        max_runs (int): runs after which a sandbox is replaced, 0 for no limit.
+        max_rss (int): resident memory in bytes above which a sandbox is
+            replaced after its run, 0 for no limit.
+        initializer (callable): function called with ``initargs`` when a sandbox starts,
+            e.g. to import the project.
+        initargs (tuple): arguments of ``initializer``.
+    """
+
+    def __init__(self, target: Callable, size: int = 1, max_runs: int = 100, max_rss: int = 0,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        self.target = target
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.max_rss = max_rss
+        self.initializer = initializer
+        self.initargs = initargs
+        # the process owning the sandboxes
+        self.pid = os.getpid()
+        self._ctx = billiard.get_context("fork")
+        self._idle = []
+        # every sandbox started and not stopped, idle or running
+        self._sandboxes = []
+        self._cond = threading.Condition()
+
+    def _spawn(self) -> Sandbox:
+        sandbox = Sandbox(self._ctx, self.target, initializer=self.initializer, initargs=self.initargs,
+                          inherited=[s.conn for s in self._sandboxes])
+        self._sandboxes.append(sandbox)
+        logger.info(f"started sandbox pid={sandbox.pid}")
+        return sandbox
+
+    def _stop(self, sandbox: Sandbox):
+        sandbox.stop()
+        self._sandboxes.remove(sandbox)
+
+    def start(self):
+        """Fork the sandboxes not started yet."""
+        with self._cond:
+            while len(self._sandboxes) < self.size:
+                self._idle.append(self._spawn())
+
+    def submit(self, request: dict) -> SandboxRun:
+        """Send a request to an idle sandbox, waiting for one if they are all busy."""
+        with self._cond:
+            while True:
+                while self._idle:
+                    sandbox = self._idle.pop()
+                    if sandbox.is_alive():
+                        return SandboxRun(sandbox, request)
+                    self._stop(sandbox)
+                if len(self._sandboxes) < self.size:
+                    return SandboxRun(self._spawn(), request)
+                self._cond.wait()
+
+    def release(self, run: SandboxRun, recycle: bool = False):
+        """Make the sandbox of a finished run available, replacing it if ``recycle``
+        is set or if it reached ``max_runs`` or ``max_rss``.
+        """
+        sandbox = run.sandbox
+        reason = None
+        if recycle:
+            reason = "recycle requested"
+        elif not sandbox.is_alive():
+            reason = "exited"
+        elif self.max_runs and sandbox.runs >= self.max_runs:
+            reason = f"{sandbox.runs} runs"
+        elif self.max_rss and (sandbox.rss() or 0) > self.max_rss:
+            reason = f"rss above {self.max_rss} bytes"
+        with self._cond:
+            if reason is None:
+                self._idle.append(sandbox)
+            else:
+                logger.info(f"replacing sandbox pid={sandbox.pid}: {reason}")
+                self._stop(sandbox)
+                # fork the replacement now, so that it is ready for the next run
+                self._idle.append(self._spawn())
+            self._cond.notify()
+
+    def close(self):
+        """Stop the idle sandboxes."""
+        with self._cond:
+            for sandbox in self._idle:
+                self._stop(sandbox)
+            self._idle = []
@@ -1,16 +1,20 @@
+import ast
 import asyncio
+import dataclasses
 from base64 import b64decode, b64encode
 from datetime import datetime
 from importlib import import_module
 from typing import Optional, Union, List, Callable, Any
 import json
+import time
 from collections.abc import AsyncGenerator, Iterable
+from contextlib import aclosing
 from graphql.execution import ExecutionContext as GraphQLExecutionContext
 
 import strawberry
 from bson.objectid import ObjectId
 from celery.contrib.abortable import AbortableAsyncResult
-from celery.states import UNREADY_STATES, READY_STATES
+from celery.states import UNREADY_STATES
 from fastapi.encoders import jsonable_encoder
 from kedro.framework.project import pipelines
 from strawberry.extensions import SchemaExtension
@@ -23,20 +27,31 @@ from strawberry.types.scalar import ScalarDefinition, ScalarWrapper
 from strawberry.schema.config import StrawberryConfig
 from strawberry.scalars import JSON
 from strawberry.extensions import FieldExtension
+from strawberry.types.nodes import SelectedField
+from strawberry.utils.str_converters import to_snake_case
 
 from . import __version__ as kedro_graphql_version
 from .config import load_config
-from .pipeline_event_monitor import PipelineEventMonitor
-from .exceptions import InvalidPipeline
+from .dataloaders import DataLoaderExtension, get_pipeline_loader
+from .pipeline_event_monitor import TERMINAL_STATES, publish_pipeline_event, publish_task_abort
+from .exceptions import CreateManyError, InvalidPipeline
+from .logs.archive import LogArchive
 from .logs.logger import PipelineLogStream, logger
 from .models import (
+    CreatePipelineResult,
     DataSet,
     DataSetInput,
+    NodeEvent,
+    NodeProfileSummary,
     PageMeta,
     Pipeline,
     PipelineEvent,
     PipelineInput,
+    PipelineLogBatch,
+    PipelineLogHistory,
     PipelineLogMessage,
+    PipelineProfileSummary,
+    PipelineProgress,
     Pipelines,
     PipelineStatus,
     PipelineTemplate,
@@ -45,6 +60,8 @@ from .models import (
     SignedUrls,
     State,
 )
+from .profiling import aggregate_profiles
+from .progress import PipelineProgressStream
 from .pipeline_config import (
     filter_pipeline,
     normalize_pipeline_config,
@@ -53,6 +70,7 @@ from .pipeline_config import (
 from .runners import get_runner_class
 from .tasks import run_pipeline
 from .permissions import get_permissions
+from .templates import TEMPLATE_FIELDS
 from .signed_url.base import SignedUrlProvider
 from .utils import generate_unique_paths
 
@@ -77,7 +95,7 @@ def _normalize_pipeline(p, app, slices, only_missing, runner, validate=False):
     p.data_catalog = [
         DataSet(
             name=name,
-            config=json.dumps(config),
+            config=config,
             tags=datasets[sources[name]].tags if sources[name] in datasets else None,
         )
         for name, config in catalog.items()
@@ -98,6 +116,88 @@ def _normalize_pipeline(p, app, slices, only_missing, runner, validate=False):
     return p
 
 
+def _prepare_pipeline(pipeline: PipelineInput, app) -> tuple:
+    """Validate and normalize a PipelineInput into a new, not yet stored, Pipeline.
+
+    Returns:
+        tuple: the pipeline, the encoded input, the runner and the kedro
+            serialization of the pipeline.
+    """
+    if pipeline.name not in pipelines.keys():
+        raise InvalidPipeline(
+            f"Pipeline {pipeline.name} does not exist in the project.")
+
+    d = jsonable_encoder(pipeline)
+    p = Pipeline.decode(d)
+
+    runner = d.get("runner") or app.config["KEDRO_GRAPHQL_RUNNER"]
+    p = _normalize_pipeline(
+        p,
+        app,
+        d.get("slices"),
+        d.get("only_missing", False),
+        runner,
+        validate=d["state"] == "READY",
+    )
+    serial = p.encode(encoder="kedro")
+    # credentials not supported yet
+    # merge any credentials with inputs and outputs
+    # credentials are intentionally not persisted
+    # NOTE celery result may persist creds in task result?
+
+    started_at = datetime.now()
+    p.created_at = started_at
+
+    # Get kedro project, kedro-graphql, and pipeline versions. Together with the
+    # name they reference the template, whose describe and nodes are not stored.
+    p.project_version = app.pipeline_templates.project_version
+    p.kedro_graphql_version = kedro_graphql_version
+    p.pipeline_version = app.pipeline_templates.pipeline_version(pipeline.name)
+
+    if d["state"] == "STAGED":
+        p.status.append(PipelineStatus(state=State.STAGED,
+                                       runner=runner,
+                                       session=None,
+                                       started_at=None,
+                                       finished_at=None,
+                                       task_id=None,
+                                       task_name=None))
+    else:
+        p.status.append(PipelineStatus(state=State.READY,
+                                       runner=runner,
+                                       session=None,
+                                       started_at=started_at,
+                                       finished_at=None,
+                                       task_id=None,
+                                       task_name=str(run_pipeline)))
+    return p, d, runner, serial
+
+
+def _run_pipeline_kwargs(p: Pipeline, d: dict, runner: str, serial: dict) -> dict:
+    """Keyword arguments of the run_pipeline task for a newly created pipeline."""
+    return {"id": str(p.id),
+            "name": serial["name"],
+            "parameters": serial["parameters"],
+            "data_catalog": serial["data_catalog"],
+            "runner": runner,
+            "slices": d.get("slices", None),
+            "only_missing": d.get("only_missing", False)}
+
+
+async def _update_pipeline_attempt(info: Info, p: Pipeline, attempt: Optional[PipelineStatus] = None) -> Pipeline:
+    """Update a pipeline, then append ``attempt`` as a new status entry with ``push_status``.
+
+    The status entry is pushed after the update so the update's copy of the
+    status list, read before the attempt, cannot overwrite it.
+    """
+    backend = info.context["request"].app.backend
+    p = await backend.update(p)
+    if attempt is not None:
+        await backend.push_status(id=p.id, status=attempt)
+        p.status.append(attempt)
+    return p
+
+
 def encode_cursor(id: int) -> str:
     """
     Encodes the given id into a cursor.
@@ -121,6 +221,123 @@ def decode_cursor(cursor: str) -> int:
     return cursor_data.split(":")[1]
 
 
+def encode_keyset_cursor(id: str, values: list = None, before: bool = False) -> str:
+    """
+    Encodes a pipeline's position in a sorted listing into a cursor.
+
+    :param id: The id of the pipeline, used as the tiebreaker.
+    :param values: The stored values of the pipeline's sort keys.
+    :param before: Whether the cursor selects the page ending before the pipeline.
+
+    :return: The encoded cursor.
+    """
+    payload = json.dumps({"id": str(id), "values": values, "before": before})
+    return b64encode(f"keyset:{payload}".encode("utf-8")).decode("ascii")
+
+
+def decode_keyset_cursor(cursor: str) -> dict:
+    """
+    Decodes a cursor into ``{"id": ..., "values": [...], "before": bool}``.
+
+    Cursors created by ``encode_cursor`` are accepted and carry no sort key values.
+
+    :param cursor: The cursor to decode.
+
+    :return: The decoded cursor.
+    """
+    cursor_data = b64decode(cursor.encode("ascii")).decode("utf-8")
+    kind, _, payload = cursor_data.partition(":")
+    if kind == "keyset":
+        return json.loads(payload)
+    return {"id": payload, "values": None, "before": False}
+
+
+def _sort_keys(sort: str) -> List[str]:
+    """Return the field paths of a sort string, excluding the ``_id`` tiebreaker."""
+    try:
+        sort = ast.literal_eval(sort) if sort else []
+        fields = [field for field, _ in sort]
+    except (ValueError, SyntaxError, TypeError):
+        # the backend reports invalid sort strings
+        return []
+    return fields[:fields.index("_id")] if "_id" in fields else fields
+
+
+def _sort_values(pipeline: Pipeline, keys: List[str]) -> Optional[list]:
+    """Return the stored values of a pipeline's sort keys, or None when unavailable."""
+    values = []
+    for key in keys:
+        value = pipeline
+        for part in key.split("."):
+            if isinstance(value, list):
+                return None
+            value = getattr(value, part, None)
+        if isinstance(value, list):
+            return None
+        values.append(jsonable_encoder(value))
+    return values
+
+
+def _flatten_selections(selections) -> Iterable[SelectedField]:
+    """Yield selected fields, expanding fragment spreads and inline fragments."""
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            yield selection
+        else:
+            yield from _flatten_selections(selection.selections)
+
+
+def pipeline_projection(info: Info, path: Iterable[str] = ()) -> Optional[List[str]]:
+    """
+    Derives a backend projection from the Pipeline selection set of a resolver.
+
+    Args:
+        info (Info): The GraphQL execution context.
+        path (Iterable[str]): Field names leading from the resolver's selection set
+            to the Pipeline selection set, e.g. ``("pipelines",)`` for ``readPipelines``.
+
+    Returns:
+        Optional[List[str]]: The document field paths to fetch, or None if the full
+            document is required (e.g. a selected field is not a stored field).
+    """
+    pipeline_fields = {f.name for f in dataclasses.fields(Pipeline)}
+    status_fields = {f.name for f in dataclasses.fields(PipelineStatus)}
+
+    selections = [child for s in _flatten_selections(info.selected_fields)
+                  for child in _flatten_selections(s.selections)]
+    for name in path:
+        selections = [child for s in selections if s.name == name
+                      for child in _flatten_selections(s.selections)]
+
+    projection = set()
+    for field in selections:
+        key = to_snake_case(field.name)
+        if field.name == "__typename" or key == "id":
+            continue
+        if key not in pipeline_fields:
+            return None
+        children = [c for c in _flatten_selections(field.selections)
+                    if c.name != "__typename"]
+        if key == "status" and children:
+            for c in children:
+                if to_snake_case(c.name) not in status_fields:
+                    return None
+                projection.add(f"status.{to_snake_case(c.name)}")
+        elif key in TEMPLATE_FIELDS:
+            # resolved from the template the pipeline references, or a stored copy
+            projection.update(["name", "project_version", "pipeline_version", key])
+        elif key == "data_catalog" and children:
+            projection.add("data_catalog.name")
+            for c in children:
+                if c.name in ("config", "exists", "partitions"):
+                    projection.add("data_catalog.config")
+                elif c.name == "tags":
+                    projection.add("data_catalog.tags")
+        else:
+            projection.add(key)
+    return sorted(projection)
+
+
 class DataSetConfigException(Exception):
     """``DataSetConfigException`` raised by ``DataSetConfigExtension`` implementations
     in case of failure.
@@ -282,6 +499,22 @@ class PipelineInputExtension(FieldExtension):
 
 class PipelineSanitizer:
 
+    @staticmethod
+    def _has_config(d: DataSet | DataSetInput) -> bool:
+        return d.has_config() if isinstance(d, DataSet) else d.config is not None
+
+    @staticmethod
+    def _parse_config(d: DataSet | DataSetInput) -> dict:
+        return d.parse_config() if isinstance(d, DataSet) else json.loads(d.config)
+
+    @staticmethod
+    def _set_config(d: DataSet | DataSetInput, config: dict) -> None:
+        # a DataSet keeps the parsed config, an input only holds the JSON string
+        if isinstance(d, DataSet):
+            d.set_config(config)
+        else:
+            d.config = json.dumps(config)
+
     @staticmethod
     def sanitize_filepaths(pipeline: Pipeline | PipelineInput, allowed_roots: list[str]) -> None:
         """Raises DataSetConfigException if any dataset filepath does not start with any of the allowed roots.
@@ -297,7 +530,7 @@ class PipelineSanitizer:
         """
         if pipeline.data_catalog:
             for d in pipeline.data_catalog:
-                c = json.loads(d.config)
+                c = PipelineSanitizer._parse_config(d)
                 if c.get("filepath"):
                     if len(allowed_roots) > 0 and not any(c["filepath"].startswith(root) for root in allowed_roots):
                         raise DataSetConfigException(
@@ -317,14 +550,17 @@ class PipelineSanitizer:
         """
         if pipeline.data_catalog:
             for d in pipeline.data_catalog:
+                if not cls._has_config(d):
+                    # config was not requested (projected read)
+                    continue
                 try:
-                    c = json.loads(d.config)
+                    c = cls._parse_config(d)
                     if c.get("filepath"):
                         for mask in masks:
                             if c["filepath"].startswith(mask["prefix"]):
                                 c["filepath"] = c["filepath"].replace(
                                     mask["prefix"], mask["mask"])
-                        d.config = json.dumps(c)
+                        cls._set_config(d, c)
 
                 except Exception as e:
                     logger.warning(
@@ -346,13 +582,13 @@ class PipelineSanitizer:
         if pipeline.data_catalog:
             for d in pipeline.data_catalog:
                 try:
-                    c = json.loads(d.config)
+                    c = cls._parse_config(d)
                     if c.get("filepath"):
                         for mask in masks:
                             if c["filepath"].startswith(mask["mask"]):
                                 c["filepath"] = c["filepath"].replace(
                                     mask["mask"], mask["prefix"])
-                        d.config = json.dumps(c)
+                        cls._set_config(d, c)
                 except Exception as e:
                     logger.warning(
                         f"Could not parse config for dataset {d.name}: {e}")
@@ -405,7 +641,8 @@ class Query:
     @strawberry.field(description="Get a pipeline instance.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="read_pipeline")]), PipelineExtension()])
     async def read_pipeline(self, id: str, info: Info) -> Pipeline:
         try:
-            p = await info.context["request"].app.backend.read(id=id)
+            p = await get_pipeline_loader(info).load(
+                id=id, projection=pipeline_projection(info))
             if p is None:
                 raise InvalidPipeline(
                     f"Pipeline {id} does not exist in the project.")
@@ -418,30 +655,85 @@ class Query:
     @strawberry.field(description="Get a list of pipeline instances.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="read_pipelines")]), PipelineExtension()])
     async def read_pipelines(self, info: Info, limit: int, cursor: Optional[str] = None, filter: Optional[str] = "",
                        sort: Optional[str] = "") -> Pipelines:
-        if cursor is not None:
-            # decode the user ID from the given cursor.
-            pipe_id = decode_cursor(cursor=cursor)
-        else:
-            pipe_id = "000000000000000000000000"  # unix epoch Jan 1, 1970 as objectId
-
-        results = await info.context["request"].app.backend.list(
-            cursor=pipe_id, limit=limit + 1, filter=filter, sort=sort)
-        if len(results) > limit:
-
-            # calculate the client's next cursor.
-            last_pipe = results.pop(-1)
-            next_cursor = encode_cursor(id=last_pipe.id)
+        backend = info.context["request"].app.backend
+        projection = pipeline_projection(info, path=("pipelines",))
+        keyset = decode_keyset_cursor(cursor) if cursor is not None else None
+
+        results = await backend.list(
+            cursor=keyset, limit=limit + 1, filter=filter, sort=sort, projection=projection)
+        if keyset and keyset["before"] and len(results) < limit:
+            # less than a full page precedes the cursor, start over from the first page
+            keyset = None
+            results = await backend.list(
+                cursor=None, limit=limit + 1, filter=filter, sort=sort, projection=projection)
+
+        keys = _sort_keys(sort)
+        if keyset and keyset["before"]:
+            # the page ends just before the cursor, which starts the next page
+            next_cursor = encode_keyset_cursor(keyset["id"], keyset["values"])
+            if len(results) > limit:
+                results.pop(0)
+                previous_cursor = encode_keyset_cursor(
+                    results[0].id, _sort_values(results[0], keys), before=True)
+            else:
+                previous_cursor = None
         else:
-            # We have reached the last page, and
-            # don't have the next cursor.
-            next_cursor = None
+            if len(results) > limit:
+                # calculate the client's next cursor.
+                last_pipe = results.pop(-1)
+                next_cursor = encode_keyset_cursor(last_pipe.id, _sort_values(last_pipe, keys))
+            else:
+                # We have reached the last page, and
+                # don't have the next cursor.
+                next_cursor = None
+            if keyset and results:
+                previous_cursor = encode_keyset_cursor(
+                    results[0].id, _sort_values(results[0], keys), before=True)
+            else:
+                previous_cursor = None
 
         logger.info(
             f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=read_pipelines, filter={filter}, limit={limit}, sort={sort}, cursor={cursor}")
         return Pipelines(
-            pipelines=results, page_meta=PageMeta(next_cursor=next_cursor)
+            pipelines=results, page_meta=PageMeta(next_cursor=next_cursor, previous_cursor=previous_cursor)
         )
 
+    @strawberry.field(description="Summarise the node profiles of the latest runs of a pipeline.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="read_pipelines")])])
+    async def pipeline_profile_summary(self, name: str, info: Info, limit: int = 20) -> PipelineProfileSummary:
+        """Summarise the ``status.profile`` of the latest ``limit`` pipelines named ``name``.
+
+        Only the last attempt of each pipeline is summarised, pipelines run
+        without ``KEDRO_GRAPHQL_NODE_PROFILE`` are skipped.
+        """
+        results = await info.context["request"].app.backend.list(
+            limit=limit, filter=json.dumps({"name": name}), sort="[('created_at', -1)]",
+            projection=["status.profile"])
+        profiles = [jsonable_encoder(p.status[-1].profile) for p in results if p.status and p.status[-1].profile]
+        logger.info(
+            f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=pipeline_profile_summary, name={name}, limit={limit}")
+        return PipelineProfileSummary(name=name, runs=len(profiles),
+                                      nodes=[NodeProfileSummary(**n) for n in aggregate_profiles(profiles)])
+
+    @strawberry.field(description="Get a page of a pipeline's logs, including the archived ones.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="subscribe_to_logs")])])
+    async def pipeline_log_history(self, id: str, info: Info, limit: int = 100, cursor: Optional[str] = None,
+                                   level: Optional[str] = None, logger: Optional[str] = None) -> PipelineLogHistory:
+        """Get the log messages of a pipeline's latest task after ``cursor``, a message id.
+
+        Messages trimmed from the Redis stream or archived at the end of the task
+        are read from the pipeline's gql_logs dataset.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        stream = await _pipeline_log_stream(id, info, after_message_id=cursor, level=level, logger_name=logger,
+                                            wait=False)
+        messages = [] if stream is None else await stream.history(limit=limit + 1)
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = messages[-1]["message_id"]
+        return PipelineLogHistory(messages=[PipelineLogMessage(id=id, **m) for m in messages],
+                                  page_meta=PageMeta(next_cursor=next_cursor))
+
     @strawberry.field(description="Read a dataset with a signed URL", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="read_dataset")])])
     async def read_datasets(self, id: str, info: Info, datasets: List[DataSetInput], expires_in_sec: int = CONFIG["KEDRO_GRAPHQL_SIGNED_URL_MAX_EXPIRES_IN_SEC"]) -> List[SignedUrl | SignedUrls | DataSet | None]:
         """
@@ -466,7 +758,7 @@ class Query:
                 f"expires_in_sec cannot be greater than {CONFIG['KEDRO_GRAPHQL_SIGNED_URL_MAX_EXPIRES_IN_SEC']} seconds ({CONFIG['KEDRO_GRAPHQL_SIGNED_URL_MAX_EXPIRES_IN_SEC'] // 3600} hours)")
 
         urls = []
-        p = await info.context["request"].app.backend.read(id=id)
+        p = await get_pipeline_loader(info).load(id=id)
 
         catalog = {d.name: d for d in p.data_catalog}
 
@@ -507,56 +799,9 @@ class Mutation:
         """
         - is validation against template needed, e.g. check DataSet type or at least check dataset names
         """
-
-        if pipeline.name not in pipelines.keys():
-            raise InvalidPipeline(
-                f"Pipeline {pipeline.name} does not exist in the project.")
-
-        d = jsonable_encoder(pipeline)
-        p = Pipeline.decode(d)
-        p.describe = info.context["request"].app.kedro_pipelines[p.name].describe()
-        p.nodes = info.context["request"].app.kedro_pipelines[p.name].nodes
-
-        runner = d.get(
-            "runner") or info.context["request"].app.config["KEDRO_GRAPHQL_RUNNER"]
-        p = _normalize_pipeline(
-            p,
-            info.context["request"].app,
-            d.get("slices"),
-            d.get("only_missing", False),
-            runner,
-            validate=d["state"] == "READY",
-        )
-        serial = p.encode(encoder="kedro")
-        # credentials not supported yet
-        # merge any credentials with inputs and outputs
-        # credentials are intentionally not persisted
-        # NOTE celery result may persist creds in task result?
-
-        started_at = datetime.now()
-        p.created_at = started_at
-
-        # Get kedro project, kedro-graphql, and pipeline versions
-        p.project_version = CONFIG.get("KEDRO_PROJECT_VERSION", None)
-        p.kedro_graphql_version = kedro_graphql_version
-        p.pipeline_version = None
-        package_name = CONFIG.get("KEDRO_PROJECT_NAME", None)
-        if package_name:
-            try:
-                module = import_module(
-                    f".pipelines.{pipeline.name}", package=package_name)
-                p.pipeline_version = getattr(module, "__version__", None)
-            except Exception as e:
-                logger.info(f"Could not find pipeline version: {e}")
+        p, d, runner, serial = _prepare_pipeline(pipeline, info.context["request"].app)
 
         if d["state"] == "STAGED":
-            p.status.append(PipelineStatus(state=State.STAGED,
-                                           runner=runner,
-                                           session=None,
-                                           started_at=None,
-                                           finished_at=None,
-                                           task_id=None,
-                                           task_name=None))
             logger.info(f'Staging pipeline {p.name}')
             p = await info.context["request"].app.backend.create(p)
             if unique_paths:
@@ -567,38 +812,103 @@ class Mutation:
                 f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=create_pipeline, id={p.id}, name={p.name}, state=STAGED")
             return p
         else:
-            p.status.append(PipelineStatus(state=State.READY,
-                                           runner=runner,
-                                           session=None,
-                                           started_at=started_at,
-                                           finished_at=None,
-                                           task_id=None,
-                                           task_name=str(run_pipeline)))
-
             p = await info.context["request"].app.backend.create(p)
             if unique_paths:
                 p = generate_unique_paths(p, unique_paths)
                 p = await info.context["request"].app.backend.update(p)
 
-            result = run_pipeline.delay(
-                id=str(p.id),
-                name=serial["name"],
-                parameters=serial["parameters"],
-                data_catalog=serial["data_catalog"],
-                runner=runner,
-                slices=d.get("slices", None),
-                only_missing=d.get("only_missing", False)
-            )
+            result = run_pipeline.delay(**_run_pipeline_kwargs(p, d, runner, serial))
 
             logger.info(
                 f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=create_pipeline, id={p.id}, name={p.name}, state=READY, task_id={result.task_id}")
             return p
 
+    @strawberry.mutation(description="Execute or stage several pipelines at once.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="create_pipeline")])])
+    async def create_pipelines(self, pipelines: List[PipelineInput], info: Info, unique_paths: Optional[List[str]] = None) -> List[CreatePipelineResult]:
+        """
+        Bulk version of create_pipeline. Pipelines are stored with a single backend
+        write and READY pipelines are submitted to Celery over one broker
+        connection, so the cost of a submission grows linearly with the number
+        of pipelines. Failures, including a pipeline that could not be stored
+        or a task that could not be published, are reported per pipeline in
+        the order of the input.
+        """
+        app = info.context["request"].app
+        masks = CONFIG["KEDRO_GRAPHQL_DATASET_FILEPATH_MASKS"]
+        results = [CreatePipelineResult() for _ in pipelines]
+
+        prepared = []
+        for index, pipeline in enumerate(pipelines):
+            try:
+                pipeline = PipelineSanitizer.unmask_filepaths(pipeline, masks)
+                PipelineSanitizer.sanitize_filepaths(
+                    pipeline, CONFIG["KEDRO_GRAPHQL_DATASET_FILEPATH_ALLOWED_ROOTS"])
+                prepared.append((index, *_prepare_pipeline(pipeline, app)))
+            except Exception as e:
+                results[index].error = str(e)
+
+        try:
+            created = await app.backend.create_many([p for _, p, _, _, _ in prepared])
+        except CreateManyError as e:
+            created = e.created
+            for position, error in e.errors.items():
+                results[prepared[position][0]].error = f"Pipeline could not be stored: {error}"
+        except Exception as e:
+            logger.error(f"Failed to store {len(prepared)} pipelines: {e}")
+            created = [None] * len(prepared)
+            for index, _, _, _, _ in prepared:
+                results[index].error = f"Pipeline could not be stored: {e}"
+        prepared = [(index, p, d, runner, serial)
+                    for (index, _, d, runner, serial), p in zip(prepared, created) if p is not None]
+
+        if unique_paths:
+            scoped = []
+            for index, p, d, runner, serial in prepared:
+                try:
+                    scoped.append((index, generate_unique_paths(p, unique_paths), d, runner, serial))
+                except Exception as e:
+                    results[index].pipeline = p
+                    results[index].error = str(e)
+            await app.backend.update_many([p for _, p, _, _, _ in scoped])
+            prepared = scoped
+
+        for index, p, _, _, _ in prepared:
+            results[index].pipeline = p
+
+        ready = [(index, p, d, runner, serial)
+                 for index, p, d, runner, serial in prepared if d["state"] != "STAGED"]
+        if ready:
+            # publish the tasks one at a time over a single broker connection,
+            # so a failure is reported on the pipelines that were not sent only
+            try:
+                with run_pipeline.app.producer_or_acquire() as producer:
+                    for index, p, d, runner, serial in ready:
+                        try:
+                            run_pipeline.apply_async(
+                                kwargs=_run_pipeline_kwargs(p, d, runner, serial), producer=producer)
+                        except Exception as e:
+                            logger.error(f"Failed to submit pipeline {p.id}: {e}")
+                            results[index].error = f"Pipeline was stored but could not be submitted: {e}"
+            except Exception as e:
+                # no connection to the broker, nothing was sent
+                logger.error(f"Failed to submit {len(ready)} pipelines: {e}")
+                for index, _, _, _, _ in ready:
+                    results[index].error = f"Pipeline was stored but could not be submitted: {e}"
+
+        for r in results:
+            if r.pipeline is not None:
+                PipelineSanitizer.mask_filepaths(r.pipeline, masks)
+
+        logger.info(
+            f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=create_pipelines, created={len(prepared)}, submitted={len(ready)}, failed={sum(r.error is not None for r in results)}")
+        return results
+
     @strawberry.mutation(description="Update a pipeline.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="update_pipeline")]), PipelineInputExtension()])
     async def update_pipeline(self, id: str, pipeline: PipelineInput, info: Info, unique_paths: Optional[List[str]] = None) -> Pipeline:
 
+        loader = get_pipeline_loader(info)
         try:
-            p = await info.context["request"].app.backend.read(id=id)
+            p = await loader.load(id=id)
             if p is None:
                 raise InvalidPipeline(
                     f"Pipeline {id} does not exist in the project.")
@@ -624,9 +934,23 @@ class Mutation:
                 p.status[-1].task_id,
                 app=info.context["request"].app.celery_app
             ).abort()
-            p.status[-1].state = State.ABORTING
-            p.status[-1].abort_requested_at = datetime.now()
-            p = await info.context["request"].app.backend.update(p)
+            # wake the worker supervising the task, which otherwise polls the result backend
+            await publish_task_abort(info.context["request"].app.config["KEDRO_GRAPHQL_BROKER"],
+                                     p.status[-1].task_id)
+            abort_requested_at = datetime.now()
+            patched = await info.context["request"].app.backend.patch_status(
+                id=id,
+                fields={"state": State.ABORTING, "abort_requested_at": abort_requested_at},
+                exclude_states=[State.SUCCESS, State.FAILURE, State.REVOKED, State.ABORTED])
+            loader.clear(id)
+            if patched:
+                p.status[-1].state = State.ABORTING
+                p.status[-1].abort_requested_at = abort_requested_at
+                await publish_pipeline_event(info.context["request"].app.config["KEDRO_GRAPHQL_BROKER"], id,
+                                             task_id=p.status[-1].task_id, status=State.ABORTING.value)
+            else:
+                # the task finished while the abort was being requested
+                p = await loader.load(id=id)
             logger.info(
                 f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=abort_pipeline, id={p.id}, name={p.name}, task_id={p.status[-1].task_id}")
             return p
@@ -648,18 +972,21 @@ class Mutation:
         p.tags = submitted.tags
         p.parent = pipeline_input_dict.get("parent")
 
+        # a new run attempt, appended atomically after the pipeline is updated
+        attempt = None
+
         # If PipelineInput is READY and pipeline is not already running
         if requested_state == "READY" and p.status[-1].state.value not in UNREADY_STATES.union(["READY"]):
 
             if (p.status[-1].state.value != "STAGED"):
                 # Add new status object to pipeline because this is another run attempt
-                p.status.append(PipelineStatus(state=State.READY,
-                                               runner=runner,
-                                               session=None,
-                                               started_at=datetime.now(),
-                                               finished_at=None,
-                                               task_id=None,
-                                               task_name=str(run_pipeline)))
+                attempt = PipelineStatus(state=State.READY,
+                                         runner=runner,
+                                         session=None,
+                                         started_at=datetime.now(),
+                                         finished_at=None,
+                                         task_id=None,
+                                         task_name=str(run_pipeline))
             else:
                 # Replace staged status with running status
                 p.status[-1] = PipelineStatus(state=State.READY,
@@ -674,7 +1001,9 @@ class Mutation:
                 p = generate_unique_paths(p, unique_paths)
 
             # Update pipeline in backend before running task
-            p = await info.context["request"].app.backend.update(p)
+            p = await _update_pipeline_attempt(info, p, attempt)
+            attempt = None
+            loader.clear(id)
 
             serial = p.encode(encoder="kedro")
 
@@ -693,17 +1022,18 @@ class Mutation:
 
         # If PipelineInput is STAGED and pipeline is not already running or staged
         elif requested_state == "STAGED" and p.status[-1].state.value not in UNREADY_STATES.union(["READY"]) and p.status[-1].state.value != "STAGED":
-            p.status.append(PipelineStatus(state=State.STAGED,
-                                           runner=runner,
-                                           session=None,
-                                           started_at=None,
-                                           finished_at=None,
-                                           task_id=None,
-                                           task_name=None))
+            attempt = PipelineStatus(state=State.STAGED,
+                                     runner=runner,
+                                     session=None,
+                                     started_at=None,
+                                     finished_at=None,
+                                     task_id=None,
+                                     task_name=None)
             logger.info(f'Staging pipeline {p.name}')
         if unique_paths:
             p = generate_unique_paths(p, unique_paths)
-        p = await info.context["request"].app.backend.update(p)
+        p = await _update_pipeline_attempt(info, p, attempt)
+        loader.clear(id)
         logger.info(
             f"user={PERMISSIONS_CLASS.get_user_info(info)['email']}, action=update_pipeline, id={p.id}, name={p.name}")
 
@@ -711,8 +1041,9 @@ class Mutation:
 
     @strawberry.mutation(description="Delete a pipeline.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="delete_pipeline")]), PipelineExtension()])
     async def delete_pipeline(self, id: str, info: Info) -> Optional[Pipeline]:
+        loader = get_pipeline_loader(info)
         try:
-            p = await info.context["request"].app.backend.read(id=id)
+            p = await loader.load(id=id)
             if p is None:
                 raise InvalidPipeline(
                     f"Pipeline {id} does not exist in the project.")
@@ -720,6 +1051,7 @@ class Mutation:
             raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
 
         await info.context["request"].app.backend.delete(id=id)
+        loader.clear(id)
         logger.info(f'Deleted {p.name} pipeline with id: ' + str(id))
         return p
 
@@ -746,7 +1078,7 @@ class Mutation:
             raise ValueError(
                 f"expires_in_sec cannot be greater than {CONFIG['KEDRO_GRAPHQL_SIGNED_URL_MAX_EXPIRES_IN_SEC']} seconds ({CONFIG['KEDRO_GRAPHQL_SIGNED_URL_MAX_EXPIRES_IN_SEC'] // 3600} hours)")
         urls = []
-        p = await info.context["request"].app.backend.read(id=id)
+        p = await get_pipeline_loader(info).load(id=id)
 
         if p.status[-1].state.value != "STAGED":
             raise ValueError(
@@ -783,56 +1115,151 @@ class Subscription:
     @strawberry.subscription(description="Subscribe to pipeline events.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="subscribe_to_events")])])
     async def pipeline(self, id: str, info: Info, interval: float = 0.5) -> AsyncGenerator[PipelineEvent]:
         """Subscribe to pipeline events.
-        """
-        try:
-            p = await info.context["request"].app.backend.read(id=id)
-            if p is None:
-                raise InvalidPipeline(
-                    f"Pipeline {id} does not exist in the project.")
-        except Exception as e:
-            raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
 
-        while (not p.status[-1].task_id):
-            # Wait for the task to be assigned a task_id
-            await asyncio.sleep(0.1)
-            p = await info.context["request"].app.backend.read(id=id)
-
-        if p and p.status[-1].state.value not in READY_STATES:
-            async for e in PipelineEventMonitor(app=info.context["request"].app.celery_app, task_id=p.status[-1].task_id).start(interval=interval):
-                e["id"] = id
-                yield PipelineEvent(**e)
-        else:
-            finished_at = p.status[-1].finished_at
-            yield PipelineEvent(
-                id=id,
-                task_id=p.status[-1].task_id,
-                timestamp=finished_at.isoformat() if finished_at is not None else None,
-                status=p.status[-1].state.value,
-                result=p.status[-1].task_result,
-                traceback=p.status[-1].task_traceback
-            )
+        Subscriptions to the same pipeline share one upstream watcher, see
+        ``EventHub``. Events are pushed from the pipeline's Redis channel; the
+        celery result backend is polled every ``interval`` seconds only when
+        KEDRO_GRAPHQL_PIPELINE_EVENTS_POLLING is set or the channel is unavailable.
+        """
+        async for e in info.context["request"].app.event_hub.subscribe(id, interval=interval):
+            yield PipelineEvent(**e)
 
     @strawberry.subscription(description="Subscribe to pipeline logs.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="subscribe_to_logs")])])
-    async def pipeline_logs(self, id: str, info: Info) -> AsyncGenerator[PipelineLogMessage, None]:
-        """Subscribe to pipeline logs."""
-        try:
-            p = await info.context["request"].app.backend.read(id=id)
-            if p is None:
-                raise InvalidPipeline(
-                    f"Pipeline {id} does not exist in the project.")
-        except Exception as e:
-            raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
-
-        while (not p.status[-1].task_id):
-            # Wait for the task to be assigned a task_id
-            await asyncio.sleep(0.1)
-            p = await info.context["request"].app.backend.read(id=id)
+    async def pipeline_logs(self, id: str, info: Info, after_message_id: Optional[str] = None,
+                            level: Optional[str] = None,
+                            logger: Optional[str] = None) -> AsyncGenerator[PipelineLogMessage, None]:
+        """Subscribe to pipeline logs.
 
-        if p:
-            stream = await PipelineLogStream().create(task_id=p.status[-1].task_id, broker_url=info.context["request"].app.config["KEDRO_GRAPHQL_BROKER"])
-            async for e in stream.consume():
-                e["id"] = id
-                yield PipelineLogMessage(**e)
+        ``after_message_id`` resumes a subscription after the last message it
+        received; ``level`` and ``logger`` filter the messages sent.
+        """
+        stream = await _pipeline_log_stream(id, info, after_message_id=after_message_id, level=level,
+                                            logger_name=logger)
+        async for e in stream.consume():
+            e["id"] = id
+            yield PipelineLogMessage(**e)
+
+    @strawberry.subscription(description="Subscribe to pipeline logs in batches.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="subscribe_to_logs")])])
+    async def pipeline_log_batches(self, id: str, info: Info, max_batch: int = 100,
+                                   max_latency_ms: int = 250, after_message_id: Optional[str] = None,
+                                   level: Optional[str] = None,
+                                   logger: Optional[str] = None) -> AsyncGenerator[PipelineLogBatch, None]:
+        """Subscribe to pipeline logs in batches.
+
+        A batch is sent once it holds ``max_batch`` messages or its first message
+        is ``max_latency_ms`` old, so bursts of log lines cost one result each.
+        ``after_message_id``, ``level`` and ``logger`` work as in ``pipeline_logs``.
+        """
+        if max_batch < 1 or max_latency_ms < 0:
+            raise ValueError("max_batch must be at least 1 and max_latency_ms cannot be negative")
+        stream = await _pipeline_log_stream(id, info, after_message_id=after_message_id, level=level,
+                                            logger_name=logger)
+        async for batch in stream.consume_batches(max_batch=max_batch, max_latency_ms=max_latency_ms):
+            yield PipelineLogBatch(id=id, task_id=stream.task_id,
+                                   messages=[PipelineLogMessage(id=id, **e) for e in batch])
+
+    @strawberry.subscription(description="Subscribe to the node progress of a pipeline run.", extensions=[PermissionExtension(permissions=[PERMISSIONS_CLASS(action="subscribe_to_events")])])
+    async def pipeline_progress(self, id: str, info: Info, timeout: float = 60) -> AsyncGenerator[PipelineProgress, None]:
+        """Subscribe to the node progress of a pipeline run.
+
+        Sends the progress so far, then an update after each read of the node
+        events the run's ``NodeProgressHooks`` published, until the run ends.
+        ``timeout`` bounds the wait for a started run's Kedro session.
+        """
+        backend = info.context["request"].app.backend
+        status = await _pipeline_run_status(id, info, timeout=timeout)
+        if not status.session:
+            # the run ended before it got a session, e.g. it failed to start
+            yield PipelineProgress(id=id, task_id=status.task_id or "", session="",
+                                   total=len(status.filtered_nodes or []), completed=0, running=[], failed=[],
+                                   finished=True)
+            return
+
+        config = info.context["request"].app.config
+        stream = PipelineProgressStream(status.session, status.task_id,
+                                        broker_url=config["KEDRO_GRAPHQL_BROKER"],
+                                        total=len(status.filtered_nodes or []),
+                                        block_ms=int(config.get("KEDRO_GRAPHQL_LOG_STREAM_BLOCK_MS", 5000)))
+        async for e in stream.consume():
+            if not stream.total:
+                # run_pipeline patches the filtered nodes after the session, and
+                # the pipeline_start event may not have been read yet
+                p = await backend.read(id=id, projection=["status.filtered_nodes"])
+                stream.total = e["total"] = len((p.status[-1].filtered_nodes if p and p.status else None) or [])
+            last_event = e.pop("last_event")
+            yield PipelineProgress(id=id, **e, last_event=NodeEvent(**last_event) if last_event else None)
+
+
+async def _pipeline_run_status(id: str, info: Info, timeout: float = 60) -> PipelineStatus:
+    """Wait for the latest run of a pipeline to be assigned its task and Kedro session.
+
+    The pipeline's events end the wait for a queued run's task to start, the
+    session ``run_pipeline`` patches right after is then read every 0.1 seconds
+    for up to ``timeout`` seconds. A run that ended before it got a session
+    returns its status without one.
+    """
+    backend = info.context["request"].app.backend
+    try:
+        p = await backend.read(id=id, projection=["status"])
+        if p is None:
+            raise InvalidPipeline(
+                f"Pipeline {id} does not exist in the project.")
+    except Exception as e:
+        raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
+
+    def ended(status):
+        return status.state is not None and status.state.value in TERMINAL_STATES
+
+    if not p.status[-1].task_id and not ended(p.status[-1]):
+        async with aclosing(info.context["request"].app.event_hub.subscribe(id)) as events:
+            async for e in events:
+                if e.get("task_id") or e.get("status") in TERMINAL_STATES:
+                    break
+        p = await backend.read(id=id, projection=["status"])
+
+    deadline = time.monotonic() + timeout
+    while not p.status[-1].session and not ended(p.status[-1]):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"The run of pipeline {id} has no Kedro session after {timeout}s")
+        await asyncio.sleep(0.1)
+        p = await backend.read(id=id, projection=["status"])
+    return p.status[-1]
+
+
+async def _pipeline_log_stream(id: str, info: Info, after_message_id: Optional[str] = None,
+                               level: Optional[str] = None, logger_name: Optional[str] = None,
+                               wait: bool = True) -> Optional[PipelineLogStream]:
+    """Open the log stream of a pipeline's latest task, waiting for the task to be assigned.
+
+    Without ``wait``, return None if the pipeline has no task yet.
+    """
+    try:
+        p = await info.context["request"].app.backend.read(id=id, projection=["status", "data_catalog"])
+        if p is None:
+            raise InvalidPipeline(
+                f"Pipeline {id} does not exist in the project.")
+    except Exception as e:
+        raise InvalidPipeline(f"Error retrieving pipeline {id}: {e}")
+
+    while (not p.status[-1].task_id):
+        if not wait:
+            return None
+        # Wait for the task to be assigned a task_id
+        await asyncio.sleep(0.1)
+        p = await info.context["request"].app.backend.read(id=id, projection=["status", "data_catalog"])
+
+    try:
+        archive = LogArchive.from_pipeline(p)
+    except Exception as e:
+        logger.warning(f"pipeline {id} log archive unavailable: {e}")
+        archive = None
+
+    config = info.context["request"].app.config
+    return await PipelineLogStream().create(task_id=p.status[-1].task_id, broker_url=config["KEDRO_GRAPHQL_BROKER"],
+                                            count=int(config.get("KEDRO_GRAPHQL_LOG_STREAM_BATCH_SIZE", 100)),
+                                            block_ms=int(config.get("KEDRO_GRAPHQL_LOG_STREAM_BLOCK_MS", 5000)),
+                                            after_message_id=after_message_id, level=level,
+                                            logger_name=logger_name, archive=archive)
 
 
 def build_schema(
@@ -861,7 +1288,7 @@ def build_schema(
                              subscription=ComboSubscription,
                              directives=directives,
                              types=types,
-                             extensions=extensions,
+                             extensions=[DataLoaderExtension, *extensions],
                              execution_context_class=execution_context_class,
                              config=config,
                              scalar_overrides=scalar_overrides,
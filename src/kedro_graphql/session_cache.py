@@ -0,0 +1,116 @@
+"""Warm Kedro project context of the workers.
+
+Creating a ``KedroSession`` registers the project's hooks and loads the
+``kedro.hooks`` entry points of every installed plugin, describes the
+project's git checkout with two ``git`` commands and, through
+``load_context``, resolves the project configuration. A worker process does
+it once per ``(env, conf_source)``, on ``worker_process_init``, and every task
+gets a ``WarmKedroSession`` with a session id and hook manager of its own,
+built from the cached hooks.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Union
+
+from kedro.framework.hooks import _create_hook_manager
+from kedro.framework.project import pipelines
+from kedro.framework.session import KedroSession
+from kedro.io.core import generate_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class WarmContext:
+    """Project context loaded once, the template of the sessions of a worker's tasks.
+
+    Args:
+        project_path (str): path of the Kedro project.
+        env (str): Kedro environment.
+        conf_source (str): directory of the project configuration, the
+            project's ``conf`` directory if None.
+
+    Attributes:
+        env (str): the Kedro environment of the loaded context.
+        load_time (float): seconds spent loading the context.
+    """
+
+    def __init__(self, project_path: Union[str, Path], env: str = None, conf_source: str = None):
+        start = time.perf_counter()
+        with KedroSession.create(project_path=project_path, env=env, conf_source=conf_source,
+                                 save_on_close=False) as session:
+            context = session.load_context()
+            # registered pipelines are loaded on first use and kept for the process
+            pipelines.keys()
+        self.env = context.env
+        self.project_path = session._project_path
+        self.conf_source = session._conf_source
+        # the hooks of settings.HOOKS and of the plugins' entry points, disabled plugins excluded
+        self.plugins = [(name, plugin) for name, plugin in session._hook_manager.list_name_plugin()
+                        if plugin is not None]
+        self.store_data = {k: v for k, v in session.store.items() if k != "session_id"}
+        self.load_time = time.perf_counter() - start
+
+    def session(self) -> "WarmKedroSession":
+        """Return a new session of the project, with a session id and hook manager of its own."""
+        hook_manager = _create_hook_manager()
+        for name, plugin in self.plugins:
+            hook_manager.register(plugin, name=name)
+        return WarmKedroSession(self, generate_timestamp(), hook_manager)
+
+
+class WarmKedroSession(KedroSession):
+    """``KedroSession`` created from a ``WarmContext`` instead of the project settings and plugins.
+
+    Args:
+        warm (WarmContext): the context the session is created from.
+        session_id (str): id of the session.
+        hook_manager (PluginManager): hook manager of the session.
+    """
+
+    def __init__(self, warm: WarmContext, session_id: str, hook_manager):
+        self._project_path = warm.project_path
+        self.session_id = session_id
+        self.save_on_close = True
+        self._package_name = None
+        self._store = self._init_store()
+        self._store.update({**warm.store_data, "session_id": session_id})
+        self._run_called = False
+        self._hook_manager = hook_manager
+        self._conf_source = warm.conf_source
+
+
+class SessionCache:
+    """Warm contexts of a worker process, by ``(env, conf_source)``.
+
+    A worker serves a single project, the ``project_path`` of the first
+    ``get`` of a key is kept.
+    """
+
+    def __init__(self):
+        self._contexts = {}
+        self._lock = threading.Lock()
+
+    def get(self, project_path: Union[str, Path], env: str = None, conf_source: str = None) -> WarmContext:
+        """Return the warm context of ``(env, conf_source)``, loading it on first use."""
+        key = (env, conf_source)
+        with self._lock:
+            if key not in self._contexts:
+                warm = WarmContext(project_path, env=env, conf_source=conf_source)
+                logger.info(f"loaded Kedro context env={warm.env} conf_source={warm.conf_source} "
+                            f"in {warm.load_time:.2f}s")
+                self._contexts[key] = warm
+            return self._contexts[key]
+
+    def session(self, project_path: Union[str, Path], env: str = None, conf_source: str = None) -> WarmKedroSession:
+        """Return a new session of the warm context of ``(env, conf_source)``."""
+        return self.get(project_path, env=env, conf_source=conf_source).session()
+
+    def clear(self):
+        with self._lock:
+            self._contexts.clear()
+
+
+session_cache = SessionCache()
@@ -3,8 +3,8 @@ from the Kedro defaults. For further information, including these default values
 https://kedro.readthedocs.io/en/stable/kedro_project_setup/settings.html."""
 
 # Instantiated project hooks.
-# from kedro_graphql.hooks import DataValidationHooks, DataLoggingHooks
-# HOOKS = (DataValidationHooks(), DataLoggingHooks())
+# from kedro_graphql.hooks import DataValidationHooks, DataLoggingHooks, NodeProfileHooks, NodeProgressHooks
+# HOOKS = (DataValidationHooks(), DataLoggingHooks(), NodeProgressHooks(), NodeProfileHooks())
 
 # Installed plugins for which to disable hook auto-registration.
 # DISABLE_HOOKS_FOR_PLUGINS = ("kedro-viz",)
@@ -9,9 +9,9 @@ import time
 import traceback
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from celery import shared_task
+from celery import current_app, shared_task, signals
 from celery.contrib.abortable import AbortableTask
 from kedro import __version__ as kedro_version
 from kedro.framework.project import pipelines
@@ -19,9 +19,15 @@ from kedro.framework.session import KedroSession
 from kedro.io import AbstractDataset, DataCatalog
 from omegaconf import OmegaConf
 
+from kedro_graphql.hooks import pop_node_profile
+from kedro_graphql.logs.archive import LogArchive
+from kedro_graphql.logs.capture import current_task_id, task_log_router
 from kedro_graphql.logs.logger import KedroGraphQLLogHandler
+from kedro_graphql.pipeline_event_monitor import PipelineEventPublisher, TaskAbortListener
 from kedro_graphql.utils import add_param_to_feed_dict, run_sync
 from kedro_graphql.runners import init_runner
+from kedro_graphql.sandbox import SandboxPool
+from kedro_graphql.session_cache import session_cache
 from kedro_graphql.pipeline_config import (
     filter_only_missing_pipeline,
     filter_pipeline,
@@ -40,11 +46,70 @@ logger = logging.getLogger(__name__)
 # CONFIG = load_config()
 # logger.debug("configuration loaded by {s}".format(s=__name__))
 
+PROJECT_PATH = Path(__file__).resolve().parent.parent.parent
+
+_sandbox_pool = None
+
+
+@signals.worker_process_init.connect
+def preload_kedro_context(**kwargs):
+    """Load the worker's warm Kedro context and fork its sandboxes before the worker process receives tasks."""
+    config = getattr(current_app, "kedro_graphql_config", None)
+    if not config:
+        return
+    if config.get("KEDRO_GRAPHQL_WORKER_SESSION_CACHE", True):
+        try:
+            session_cache.get(PROJECT_PATH, env=config["KEDRO_GRAPHQL_ENV"],
+                              conf_source=config["KEDRO_GRAPHQL_CONF_SOURCE"])
+        except Exception as e:
+            # the tasks load it again and fail with the error
+            logger.exception(f"Failed to preload the Kedro context: {e}")
+    pool = get_sandbox_pool(config)
+    if pool is not None:
+        pool.start()
+
+
+@signals.worker_process_shutdown.connect
+def stop_sandboxes(**kwargs):
+    if _sandbox_pool is not None and _sandbox_pool.pid == os.getpid():
+        _sandbox_pool.close()
+
+
+def get_sandbox_pool(config: dict) -> Optional[SandboxPool]:
+    """The sandbox pool of the worker process, None unless ``KEDRO_GRAPHQL_EXECUTOR`` is ``sandbox``."""
+    global _sandbox_pool
+    if config.get("KEDRO_GRAPHQL_EXECUTOR", "fork") != "sandbox":
+        return None
+    if _sandbox_pool is None or _sandbox_pool.pid != os.getpid():
+        _sandbox_pool = SandboxPool(
+            _run_pipeline_in_sandbox,
+            size=int(config.get("KEDRO_GRAPHQL_EXECUTOR_POOL_SIZE") or 1),
+            max_runs=int(config.get("KEDRO_GRAPHQL_EXECUTOR_MAX_RUNS") or 0),
+            max_rss=int(config.get("KEDRO_GRAPHQL_EXECUTOR_MAX_RSS_MB") or 0) * 1024 * 1024,
+            initializer=session_cache.get,
+            initargs=(PROJECT_PATH, config["KEDRO_GRAPHQL_ENV"], config["KEDRO_GRAPHQL_CONF_SOURCE"]),
+        )
+    return _sandbox_pool
+
+
+def _task_file_handlers(log_dir: str) -> tuple:
+    """Return the handlers writing the ``info.log`` and ``errors.log`` files of a task in ``log_dir``."""
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    info_handler = logging.FileHandler(os.path.join(log_dir, 'info.log'), 'a')
+    info_handler.setLevel(logging.INFO)
+    info_handler.setFormatter(formatter)
+    error_handler = logging.FileHandler(os.path.join(log_dir, 'errors.log'), 'a')
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(formatter)
+    return info_handler, error_handler
+
 
 class KedroGraphqlTask(AbortableTask):
 
     _db = None
     _gql_config = None
+    _events = None
 
     @property
     def db(self):
@@ -52,12 +117,76 @@ class KedroGraphqlTask(AbortableTask):
             self._db = self.app.kedro_graphql_backend
         return self._db
 
+    @property
+    def events(self):
+        """Publisher of the state transitions consumed by the ``pipeline`` subscription."""
+        if self._events is None:
+            self._events = PipelineEventPublisher(broker_url=self._app.conf["broker_url"])
+        return self._events
+
     @property
     def gql_config(self):
         if self._gql_config is None:
             self._gql_config = self.app.kedro_graphql_config
         return self._gql_config
 
+    @property
+    def log_handler_options(self) -> dict:
+        """Keyword arguments of the task's ``KedroGraphQLLogHandler``."""
+        return {
+            "buffered": bool(self.gql_config.get("KEDRO_GRAPHQL_LOG_HANDLER_BUFFERED", False)),
+            "queue_size": int(self.gql_config.get("KEDRO_GRAPHQL_LOG_HANDLER_QUEUE_SIZE", 10000)),
+            "batch_size": int(self.gql_config.get("KEDRO_GRAPHQL_LOG_HANDLER_BATCH_SIZE", 100)),
+            "overflow": self.gql_config.get("KEDRO_GRAPHQL_LOG_HANDLER_OVERFLOW", "block"),
+            "maxlen": int(self.gql_config.get("KEDRO_GRAPHQL_LOG_STREAM_MAXLEN") or 0) or None,
+        }
+
+    def kedro_session(self) -> KedroSession:
+        """Session of a pipeline run, created from the worker's warm context unless
+        ``KEDRO_GRAPHQL_WORKER_SESSION_CACHE`` is disabled.
+        """
+        if self.gql_config.get("KEDRO_GRAPHQL_WORKER_SESSION_CACHE", True):
+            return session_cache.session(PROJECT_PATH,
+                                         env=self.gql_config["KEDRO_GRAPHQL_ENV"],
+                                         conf_source=self.gql_config["KEDRO_GRAPHQL_CONF_SOURCE"])
+        return KedroSession.create(project_path=PROJECT_PATH,
+                                   env=self.gql_config["KEDRO_GRAPHQL_ENV"],
+                                   conf_source=self.gql_config["KEDRO_GRAPHQL_CONF_SOURCE"])
+
+    def wait_for_abort(self, child, abort_listener: Optional[TaskAbortListener], polling_interval: float,
+                       safety_interval: float) -> bool:
+        """Wait until the process running the pipeline exits or the task is aborted.
+
+        The notification received by ``abort_listener`` ends the wait at once.
+        The result backend is still read every ``safety_interval`` seconds in
+        case a notification is lost, or every ``polling_interval`` seconds
+        when the abort channel is unavailable.
+
+        Args:
+            child: the forked process or the ``SandboxRun`` running the pipeline.
+
+        Returns:
+            bool: whether the task was aborted.
+        """
+        sentinels = getattr(child, "sentinels", None) or [child.sentinel]
+        last_read = None
+        while child.is_alive():
+            listening = abort_listener is not None and abort_listener.listening
+            interval = safety_interval if listening else polling_interval
+            if last_read is None or time.monotonic() - last_read >= interval:
+                if self.is_aborted():
+                    return True
+                last_read = time.monotonic()
+            timeout = max(0, last_read + interval - time.monotonic())
+            if listening:
+                if abort_listener.wait(sentinels, timeout):
+                    return True
+                # receives the result of a sandbox run
+                child.join(timeout=0)
+            else:
+                child.join(timeout=timeout)
+        return False
+
     def before_start(self, task_id, args, kwargs):
         """Handler called before the task starts.
 
@@ -71,51 +200,32 @@ class KedroGraphqlTask(AbortableTask):
         Returns:
             None: The return value of this handler is ignored.
         """
-        root_logger = logging.getLogger()
-        # Attach a task-scoped Redis stream handler so all propagated logs can be
+        # Route the records of this task to a Redis stream handler so they can be
         # consumed by the `pipelineLogs` GraphQL subscription for this task.
         stream_handler = KedroGraphQLLogHandler(
             task_id,
             broker_url=self._app.conf["broker_url"],
+            **self.log_handler_options,
         )
-        stream_handler.kedro_graphql_task_id = task_id
-        root_logger.addHandler(stream_handler)
-        p = run_sync(self.db.read(id=kwargs["id"]))
-        if p is None:
+        task_log_router.add(task_id, stream_handler)
+        current_task_id.set(task_id)
+        found = run_sync(self.db.patch_status(id=kwargs["id"], fields={
+            "state": State.STARTED,
+            "task_id": task_id,
+            "task_args": json.dumps(args),
+            "task_kwargs": json.dumps(kwargs),
+        }))
+        if not found:
             logger.error(
                 f"Pipeline id={kwargs['id']} not found in backend during before_start; task_id={task_id}")
             return
-        p.status[-1].state = State.STARTED
-        p.status[-1].task_id = task_id
-        p.status[-1].task_args = json.dumps(args)
-        p.status[-1].task_kwargs = json.dumps(kwargs)
-        run_sync(self.db.update(p))
+        self.events.publish(kwargs["id"], task_id=task_id, status=State.STARTED.value)
 
         try:
             # Create info and error handlers for the run
-            # os.makedirs(os.path.join(
-            # CONFIG["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id), exist_ok=True)
-            os.makedirs(os.path.join(
-                self.gql_config["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id), exist_ok=True)
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            # info_handler = logging.FileHandler(os.path.join(
-            # CONFIG["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id + '/info.log'), 'a')
-            info_handler = logging.FileHandler(os.path.join(
-                self.gql_config["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id + '/info.log'), 'a')
-
-            info_handler.setLevel(logging.INFO)
-            info_handler.setFormatter(formatter)
-            # error_handler = logging.FileHandler(os.path.join(
-            # CONFIG["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id + '/errors.log'), 'a')
-            error_handler = logging.FileHandler(os.path.join(
-                self.gql_config["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id + '/errors.log'), 'a')
-
-            error_handler.setLevel(logging.ERROR)
-            error_handler.setFormatter(formatter)
-            info_handler.kedro_graphql_task_id = task_id
-            error_handler.kedro_graphql_task_id = task_id
-            root_logger.addHandler(info_handler)
-            root_logger.addHandler(error_handler)
+            info_handler, error_handler = _task_file_handlers(
+                os.path.join(self.gql_config["KEDRO_GRAPHQL_LOG_TMP_DIR"], task_id))
+            task_log_router.add(task_id, info_handler, error_handler)
             # logger.info(
             # f"Storing tmp logs in {os.path.join(CONFIG['KEDRO_GRAPHQL_LOG_TMP_DIR'], task_id)}")
             logger.info(
@@ -129,20 +239,26 @@ class KedroGraphqlTask(AbortableTask):
             if log_path_prefix:
 
                 today = date.today()
+                # the pipeline is not read, the task's arguments hold what the run uses
+                p = Pipeline(id=kwargs["id"], name=kwargs.get("name"))
 
                 # Add metadata and log datasets to data catalog
-                gql_meta = DataSet(name="gql_meta", config=json.dumps({"type": "json.JSONDataset",
-                                                                       "filepath": os.path.join(log_path_prefix, f"year={today.year}", f"month={today.month}", f"day={today.day}", str(p.id), "meta.json")}))
-                gql_logs = DataSet(name="gql_logs", config=json.dumps({"type": "partitions.PartitionedDataset",
-                                                                      "dataset": "text.TextDataset",
-                                                                       "path": os.path.join(log_path_prefix, f"year={today.year}", f"month={today.month}", f"day={today.day}", str(p.id))}))
-                p.data_catalog.append(gql_meta)
-                p.data_catalog.append(gql_logs)
+                gql_meta = DataSet(name="gql_meta", config={"type": "json.JSONDataset",
+                                                            "filepath": os.path.join(log_path_prefix, f"year={today.year}", f"month={today.month}", f"day={today.day}", str(p.id), "meta.json")})
+                gql_logs = DataSet(name="gql_logs", config={"type": "partitions.PartitionedDataset",
+                                                            "dataset": "text.TextDataset",
+                                                            "path": os.path.join(log_path_prefix, f"year={today.year}", f"month={today.month}", f"day={today.day}", str(p.id))})
+                p.data_catalog = [gql_meta, gql_logs]
+                # spill the log stream to gql_logs before trimming it
+                stream_handler.broker.archive = LogArchive.from_config(gql_logs.parse_config())
 
                 # Save metadata to S3
-                AbstractDataset.from_config(gql_meta.name, json.loads(
-                    gql_meta.config)).save(p.serialize())
-                p = run_sync(self.db.update(p))
+                meta = p.serialize()
+                meta["data_catalog"] = {**(kwargs.get("data_catalog") or {}), **meta["data_catalog"]}
+                meta["parameters"] = kwargs.get("parameters") or {}
+                AbstractDataset.from_config(gql_meta.name, gql_meta.parse_config()).save(meta)
+                # append only the new datasets, the status is patched concurrently by the run
+                run_sync(self.db.push_datasets(id=p.id, datasets=[gql_meta, gql_logs]))
 
                 logger.info(
                     f"Capturing pipeline metadata in {os.path.join(log_path_prefix,f'year={today.year}',f'month={today.month}',f'day={today.day}',str(p.id),'meta.json')}")
@@ -172,13 +288,11 @@ class KedroGraphqlTask(AbortableTask):
             None: The return value of this handler is ignored.
         """
 
-        p = run_sync(self.db.read(id=kwargs["id"]))
-        if p is None:
-            return
-        if p.status[-1].state in {State.ABORTING, State.ABORTED}:
-            return
-        p.status[-1].state = State.SUCCESS
-        run_sync(self.db.update(p))
+        # aborts are finalised by run_pipeline, never overwrite them with SUCCESS
+        if run_sync(self.db.patch_status(id=kwargs["id"],
+                                         fields={"state": State.SUCCESS},
+                                         exclude_states=[State.ABORTING, State.ABORTED])):
+            self.events.publish(kwargs["id"], task_id=task_id, status=State.SUCCESS.value, result=retval)
 
     def on_retry(self, exc, task_id, args, kwargs, einfo):
         """Retry handler.
@@ -196,12 +310,13 @@ class KedroGraphqlTask(AbortableTask):
             None: The return value of this handler is ignored.
         """
 
-        p = run_sync(self.db.read(id=kwargs["id"]))
-        if p is not None:
-            p.status[-1].state = State.RETRY
-            p.status[-1].task_exception = str(exc)
-            p.status[-1].task_einfo = str(einfo)
-            run_sync(self.db.update(p))
+        if run_sync(self.db.patch_status(id=kwargs["id"], fields={
+            "state": State.RETRY,
+            "task_exception": str(exc),
+            "task_einfo": str(einfo),
+        })):
+            self.events.publish(kwargs["id"], task_id=task_id, status=State.RETRY.value,
+                                result=exc, traceback=getattr(einfo, "traceback", None))
 
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Error handler.
@@ -219,14 +334,25 @@ class KedroGraphqlTask(AbortableTask):
             None: The return value of this handler is ignored.
         """
 
-        p = run_sync(self.db.read(id=kwargs["id"]))
-        if p is not None:
-            if p.status[-1].state in {State.ABORTING, State.ABORTED}:
-                return
-            p.status[-1].state = State.FAILURE
-            p.status[-1].task_exception = str(exc)
-            p.status[-1].task_einfo = str(einfo)
-            run_sync(self.db.update(p))
+        # aborts are finalised by run_pipeline, never overwrite them with FAILURE
+        if run_sync(self.db.patch_status(id=kwargs["id"], fields={
+            "state": State.FAILURE,
+            "task_exception": str(exc),
+            "task_einfo": str(einfo),
+        }, exclude_states=[State.ABORTING, State.ABORTED])):
+            self.events.publish(kwargs["id"], task_id=task_id, status=State.FAILURE.value,
+                                result=exc, traceback=getattr(einfo, "traceback", None))
+
+    def archive_logs(self, handler, task_id):
+        """Spill what is left of the task's Redis log stream to the pipeline's gql_logs dataset, if any.
+
+        The archive keeps the logs readable by the pipelineLogHistory query and
+        by resumed log subscriptions once the stream is removed.
+        """
+        try:
+            handler.broker.spill()
+        except Exception as e:
+            logger.warning(f"failed to archive the log stream of task {task_id}: {e}")
 
     def after_return(self, status, retval, task_id, args, kwargs, einfo):
         """Handler called after the task returns.
@@ -243,36 +369,33 @@ class KedroGraphqlTask(AbortableTask):
             None: The return value of this handler is ignored.
         """
 
-        finished_at = datetime.now()
-
-        p = run_sync(self.db.read(id=kwargs["id"]))
-        if p is not None:
-            p.status[-1].finished_at = finished_at
-            p.status[-1].task_result = str(retval)
-            run_sync(self.db.update(p))
-
-        # Clean up only this task's handlers from the root logger.
-        root_logger = logging.getLogger()
-        handlers_to_remove = [
-            h for h in list(root_logger.handlers)
-            if getattr(h, "kedro_graphql_task_id", None) == task_id
-        ]
-        for handler in handlers_to_remove:
+        run_sync(self.db.patch_status(id=kwargs["id"], fields={
+            "finished_at": datetime.now(),
+            "task_result": str(retval),
+        }))
+
+        # Clean up only this task's handlers, once the records queued for them are handled.
+        for handler in task_log_router.remove(task_id):
             try:
                 handler.flush()
             except Exception:
                 pass
 
             if isinstance(handler, KedroGraphQLLogHandler):
+                if handler.dropped:
+                    logger.warning(f"{handler.dropped} log records of task {task_id} were not written to its log stream")
+                self.archive_logs(handler, task_id)
                 try:
-                    # Remove the Redis stream for this task and close connection.
-                    handler.broker.connection.delete(task_id)
+                    # Wake up the subscribers blocked on the Redis stream of this task,
+                    # then remove the stream and close connection.
+                    handler.broker.end()
+                    handler.broker.delete()
                     handler.broker.connection.close()
                 except Exception:
                     pass
 
             handler.close()
-            root_logger.removeHandler(handler)
+        current_task_id.set(None)
 
         # Clear logs from temp_logs
         try:
@@ -287,6 +410,14 @@ class KedroGraphqlTask(AbortableTask):
                 f"Failed to clear logs in {os.path.join(self.gql_config['KEDRO_GRAPHQL_LOG_TMP_DIR'], task_id)}: {e}")
 
 
+def _with_node_profile(result: dict, hook_manager) -> dict:
+    """Add the profile of the nodes run by the process, if they were profiled, to the result of a run."""
+    profile = pop_node_profile(hook_manager)
+    if profile is not None:
+        result["profile"] = profile
+    return result
+
+
 def _run_pipeline_in_child_process(
     runner_instance,
     filtered_pipeline,
@@ -299,6 +430,7 @@ def _run_pipeline_in_child_process(
     task_id: str,
     broker_url: str,
     result_queue,
+    log_handler_options: dict = None,
 ):
     """Execute Kedro pipeline in a child process and report result via queue."""
     try:
@@ -307,26 +439,29 @@ def _run_pipeline_in_child_process(
     except OSError:
         pass
 
+    # Every record of the child belongs to the task, including those of the
+    # runner's threads which do not inherit the task's context.
+    task_log_router.process_task_id = task_id
+
     # Recreate stream handler in child process so Redis connection is process-local.
-    root_logger = logging.getLogger()
     handlers_to_remove = [
-        h for h in list(root_logger.handlers)
-        if getattr(h, "kedro_graphql_task_id", None) == task_id
-        and isinstance(h, KedroGraphQLLogHandler)
+        h for h in task_log_router.handlers(task_id)
+        if isinstance(h, KedroGraphQLLogHandler)
     ]
+    task_log_router.discard(task_id, *handlers_to_remove)
     for handler in handlers_to_remove:
-        try:
-            handler.flush()
-        except Exception:
-            pass
         handler.close()
-        root_logger.removeHandler(handler)
 
     # Recreate the stream handler in the child so Redis connection state is
     # owned by this process and safe to use after fork.
-    stream_handler = KedroGraphQLLogHandler(task_id, broker_url=broker_url)
-    stream_handler.kedro_graphql_task_id = task_id
-    root_logger.addHandler(stream_handler)
+    try:
+        archive = LogArchive.from_config(catalog_config["gql_logs"]) if "gql_logs" in catalog_config else None
+    except Exception as e:
+        logger.warning(f"gql_logs dataset unavailable, trimmed log stream entries will not be archived: {e}")
+        archive = None
+    stream_handler = KedroGraphQLLogHandler(task_id, broker_url=broker_url, archive=archive,
+                                            **(log_handler_options or {}))
+    task_log_router.add(task_id, stream_handler)
 
     # Track abort state so signal handlers can safely flush logs and call hooks.
     abort_triggered = False
@@ -367,18 +502,14 @@ def _run_pipeline_in_child_process(
             pipeline=pipelines.get(pipeline_name, None),
             catalog=io,
         )
-        result_queue.put({"status": "success"})
+        result_queue.put(_with_node_profile({"status": "success"}, hook_manager))
     except BaseException as child_error:
         # Always attempt to flush logs and call hooks even if pipeline was aborted or failed.
         # This ensures persisted logs and S3 uploads happen before child exits.
         if io is not None:
             try:
-                # Flush all file handlers to ensure logs are written to disk.
-                for handler in list(root_logger.handlers):
-                    try:
-                        handler.flush()
-                    except Exception:
-                        pass
+                # Flush the task's file handlers to ensure logs are written to disk.
+                task_log_router.flush(task_id)
                 # Call after_pipeline_run hook so logs are saved to S3.
                 # For aborted pipelines, run_result may be None, but hook should still run.
                 hook_manager.hook.after_pipeline_run(
@@ -390,13 +521,58 @@ def _run_pipeline_in_child_process(
             except Exception as cleanup_error:
                 logger.warning(f"Error during log cleanup after abort: {cleanup_error}")
         
-        result_queue.put(
+        result_queue.put(_with_node_profile(
             {
                 "status": "error",
                 "error": str(child_error),
                 "traceback": traceback.format_exc(),
-            }
+            },
+            hook_manager,
+        ))
+    finally:
+        # The child exits without running logging's shutdown, write the queued
+        # and buffered log records before the parent ends the stream.
+        task_log_router.flush(task_id)
+        task_log_router.discard(task_id, stream_handler)
+        stream_handler.close()
+
+
+def _run_pipeline_in_sandbox(request: dict) -> dict:
+    """Execute Kedro pipeline in a sandbox of the worker's ``SandboxPool`` and return its result.
+
+    The sandbox was forked before the task started, the hook manager, runner,
+    pipeline and log file handlers of the run are recreated from the request.
+    """
+    task_id = request["task_id"]
+    hook_manager = session_cache.session(PROJECT_PATH, env=request["env"],
+                                         conf_source=request["conf_source"])._hook_manager
+    runner_instance = init_runner(runner_import_path=request["runner"], **request["runner_kwargs"])
+    filtered_pipeline = pipelines[request["pipeline_name"]].only_nodes(*request["node_names"])
+    file_handlers = _task_file_handlers(request["log_dir"])
+    task_log_router.add(task_id, *file_handlers)
+    result_queue = queue.SimpleQueue()
+    try:
+        _run_pipeline_in_child_process(
+            runner_instance,
+            filtered_pipeline,
+            request["catalog"],
+            request["parameters"],
+            hook_manager,
+            request["session_id"],
+            request["record_data"],
+            request["pipeline_name"],
+            task_id,
+            request["broker_url"],
+            result_queue,
+            request["log_handler_options"],
         )
+    finally:
+        task_log_router.discard(task_id, *file_handlers)
+        for handler in file_handlers:
+            handler.close()
+        task_log_router.process_task_id = None
+    return result_queue.get_nowait()
+
 
 @shared_task(bind=True, base=KedroGraphqlTask)
 def run_pipeline(self,
@@ -411,22 +587,19 @@ def run_pipeline(self,
     # with KedroSession.create(project_path=Path(__file__).resolve().parent.parent.parent,
     #                         env=CONFIG["KEDRO_GRAPHQL_ENV"],
     #                         conf_source=CONFIG["KEDRO_GRAPHQL_CONF_SOURCE"]) as session:
-    with KedroSession.create(project_path=Path(__file__).resolve().parent.parent.parent,
-                             env=self.gql_config["KEDRO_GRAPHQL_ENV"],
-                             conf_source=self.gql_config["KEDRO_GRAPHQL_CONF_SOURCE"]) as session:
+    with self.kedro_session() as session:
 
         hook_manager = session._hook_manager
 
-        p = run_sync(self.db.read(id=id))
-        if p is None:
+        found = run_sync(self.db.patch_status(
+            id=id, fields={"session": session.session_id}))
+        if not found:
             logger.warning(
                 "Pipeline id=%s not found in backend during run_pipeline; task_id=%s",
                 id,
                 self.request.id,
             )
             return
-        p.status[-1].session = session.session_id
-        run_sync(self.db.update(p))
 
         # If modified data catalog object with gql_meta and gql_logs datasets exists, use it
         if getattr(self, "kedro_graphql_pipeline", None):
@@ -484,7 +657,7 @@ def run_pipeline(self,
                 "session_id": session.session_id,
                 "celery_task_id": self.request.id,
                 "project_path": session._project_path.as_posix(),
-                "env": session.load_context().env,
+                "env": session.store.get("env"),
                 "kedro_version": kedro_version,
                 # Construct the pipeline using only nodes which have this tag attached.
                 "tags": tags,
@@ -540,33 +713,54 @@ def run_pipeline(self,
                 catalog=io,
             )
 
-            p = run_sync(self.db.read(id=id))
-            p.status[-1].filtered_nodes = [node.name for node in filtered_pipeline.nodes]
-            run_sync(self.db.update(p))
-
-            # Use Celery's multiprocessing library (billiard) instead of multiprocessing
-            # to avoid AssertionError: daemonic processes are not allowed to have children
-            ctx = billiard.get_context("fork")
-
-            # queue to communicate with the child process
-            result_queue = ctx.Queue(maxsize=1)
-            child = ctx.Process(
-                target=_run_pipeline_in_child_process,
-                args=(
-                    runner_instance,
-                    filtered_pipeline,
-                    catalog,
-                    conf_parameters,
-                    hook_manager,
-                    session.session_id,
-                    record_data,
-                    name,
-                    self.request.id,
-                    self._app.conf["broker_url"],
-                    result_queue,
-                ),
-            )
-            child.start()
+            run_sync(self.db.patch_status(id=id, fields={
+                "filtered_nodes": [node.name for node in filtered_pipeline.nodes]}))
+
+            sandbox_pool = get_sandbox_pool(self.gql_config)
+            if sandbox_pool is not None:
+                # the run is sent to a sandbox forked before the task, see SandboxPool
+                child = sandbox_pool.submit({
+                    "task_id": self.request.id,
+                    "session_id": session.session_id,
+                    "env": self.gql_config["KEDRO_GRAPHQL_ENV"],
+                    "conf_source": self.gql_config["KEDRO_GRAPHQL_CONF_SOURCE"],
+                    "pipeline_name": name,
+                    "node_names": [node.name for node in filtered_pipeline.nodes],
+                    "runner": runner,
+                    "runner_kwargs": runner_kwargs,
+                    "catalog": catalog,
+                    "parameters": conf_parameters,
+                    "record_data": record_data,
+                    "broker_url": self._app.conf["broker_url"],
+                    "log_handler_options": self.log_handler_options,
+                    "log_dir": os.path.join(self.gql_config["KEDRO_GRAPHQL_LOG_TMP_DIR"], self.request.id),
+                })
+                result_queue = child.results
+            else:
+                # Use Celery's multiprocessing library (billiard) instead of multiprocessing
+                # to avoid AssertionError: daemonic processes are not allowed to have children
+                ctx = billiard.get_context("fork")
+
+                # queue to communicate with the child process
+                result_queue = ctx.Queue(maxsize=1)
+                child = ctx.Process(
+                    target=_run_pipeline_in_child_process,
+                    args=(
+                        runner_instance,
+                        filtered_pipeline,
+                        catalog,
+                        conf_parameters,
+                        hook_manager,
+                        session.session_id,
+                        record_data,
+                        name,
+                        self.request.id,
+                        self._app.conf["broker_url"],
+                        result_queue,
+                        self.log_handler_options,
+                    ),
+                )
+                child.start()
 
             polling_interval = self.gql_config.get(
                 "KEDRO_GRAPHQL_CELERY_ABORT_POLLING_INTERVAL", 5
@@ -603,11 +797,31 @@ def run_pipeline(self,
                 )
                 grace_period = 60.0
             
+            safety_interval = self.gql_config.get(
+                "KEDRO_GRAPHQL_CELERY_ABORT_SAFETY_INTERVAL", 60
+            )
+            try:
+                safety_interval = max(float(safety_interval), polling_interval)
+            except (TypeError, ValueError):
+                logger.warning(
+                    "Invalid KEDRO_GRAPHQL_CELERY_ABORT_SAFETY_INTERVAL=%s, falling back to 60s",
+                    safety_interval,
+                )
+                safety_interval = max(60.0, polling_interval)
+
+            abort_listener = None
+            try:
+                abort_listener = TaskAbortListener(self._app.conf["broker_url"], self.request.id)
+            except Exception as e:
+                logger.warning("Abort channel of task=%s unavailable, polling the result backend: %s",
+                               self.request.id, e)
+
             sigint_sent_at = None
             sigterm_sent_at = None
 
-            while child.is_alive():
-                if self.is_aborted():
+            try:
+                aborted = self.wait_for_abort(child, abort_listener, polling_interval, safety_interval)
+                while aborted and child.is_alive():
                     now = time.monotonic()
                     if sigint_sent_at is None:
                         logger.info("Abort requested for task=%s; sending SIGINT to child pid=%s", self.request.id, child.pid)
@@ -647,9 +861,9 @@ def run_pipeline(self,
                             pass
                     # Quick checks to see if the child process has exited
                     child.join(timeout=1)
-                else:
-                    # Interval to check if child process should be aborted
-                    child.join(timeout=polling_interval)
+            finally:
+                if abort_listener is not None:
+                    abort_listener.close()
 
             child.join()
 
@@ -662,12 +876,20 @@ def run_pipeline(self,
             except queue.Empty:
                 logger.warning("Child process pid=%s finished without posting a result", child.pid)
 
-            if self.is_aborted():
-                p = run_sync(self.db.read(id=id))
-                if p is not None:
-                    p.status[-1].state = State.ABORTED
-                    p.status[-1].abort_completed_at = datetime.now()
-                    run_sync(self.db.update(p))
+            if child_result.get("profile"):
+                run_sync(self.db.patch_status(id=id, fields={"profile": child_result["profile"]}))
+
+            aborted = aborted or self.is_aborted()
+            if sandbox_pool is not None:
+                # an aborted run may leave the sandbox in any state
+                sandbox_pool.release(child, recycle=aborted)
+
+            if aborted:
+                run_sync(self.db.patch_status(id=id, fields={
+                    "state": State.ABORTED,
+                    "abort_completed_at": datetime.now(),
+                }))
+                self.events.publish(id, task_id=self.request.id, status=State.ABORTED.value, result="aborted")
                 return "aborted"
 
             if child_result.get("status") != "success":
@@ -0,0 +1,92 @@
+"""In-memory cache of the template-derived fields of pipelines.
+
+Pipeline documents reference their template by ``name``, ``project_version``
+and ``pipeline_version`` instead of storing a copy of its ``describe`` and
+``nodes``. Those are resolved from the templates of the running kedro project
+and computed once per template.
+"""
+
+import threading
+from importlib import import_module
+from typing import List, Optional
+
+from .logs.logger import logger
+from .models import Node
+
+# pipeline document fields derived from the template, no longer persisted
+TEMPLATE_FIELDS = ["describe", "nodes"]
+
+
+class PipelineTemplateCache:
+    """Memoizes ``describe()``, the nodes and the version of kedro pipelines.
+
+    Kwargs:
+        kedro_pipelines (dict): the pipelines of the running kedro project.
+        project_version (str): version of the running kedro project.
+        package_name (str): package of the running kedro project, used to look
+            up the ``__version__`` of each pipeline module.
+    """
+
+    def __init__(self, kedro_pipelines: dict, project_version: str = None, package_name: str = None):
+        self.kedro_pipelines = kedro_pipelines
+        self.project_version = project_version
+        self.package_name = package_name
+        self._describe = {}
+        self._nodes = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def pipeline_version(self, name: str) -> Optional[str]:
+        """Return the ``__version__`` of a pipeline's module, if it declares one."""
+        with self._lock:
+            if name in self._versions:
+                return self._versions[name]
+        version = None
+        if self.package_name:
+            try:
+                module = import_module(f".pipelines.{name}", package=self.package_name)
+                version = getattr(module, "__version__", None)
+            except Exception as e:
+                logger.info(f"Could not find pipeline version: {e}")
+        with self._lock:
+            self._versions[name] = version
+        return version
+
+    def matches(self, name: str, project_version: str = None, pipeline_version: str = None) -> bool:
+        """Whether a template reference resolves to a template of the running project.
+
+        Versions only rule a template out when both the reference and the running
+        project know them.
+        """
+        if name not in self.kedro_pipelines:
+            return False
+        if project_version and self.project_version and project_version != self.project_version:
+            return False
+        current = self.pipeline_version(name) if pipeline_version else None
+        return not (current and pipeline_version != current)
+
+    def describe(self, name: str, project_version: str = None, pipeline_version: str = None) -> Optional[str]:
+        """Return the description of a template, or None if it cannot be resolved."""
+        if not self.matches(name, project_version, pipeline_version):
+            return None
+        with self._lock:
+            if name not in self._describe:
+                self._describe[name] = self.kedro_pipelines[name].describe()
+            return self._describe[name]
+
+    def nodes(self, name: str, project_version: str = None, pipeline_version: str = None) -> Optional[List[Node]]:
+        """Return the nodes of a template, or None if it cannot be resolved."""
+        if not self.matches(name, project_version, pipeline_version):
+            return None
+        with self._lock:
+            if name not in self._nodes:
+                self._nodes[name] = [Node(name=n.name, inputs=n.inputs, outputs=n.outputs, tags=sorted(n.tags))
+                                     for n in self.kedro_pipelines[name].nodes]
+            return self._nodes[name]
+
+    def clear(self):
+        """Forget all memoized templates, e.g. after the project's pipelines were reloaded."""
+        with self._lock:
+            self._describe.clear()
+            self._nodes.clear()
+            self._versions.clear()
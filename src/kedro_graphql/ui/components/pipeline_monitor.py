@@ -56,10 +56,11 @@ class PipelineMonitor(param.Parameterized):
         pn.widgets.Terminal: A terminal displaying the pipeline logs.
         """
 
-        async for message in self.client.pipeline_logs(id=self.pipeline.id):
+        # one widget update per batch rather than per log line
+        async for batch in self.client.pipeline_log_batches(id=self.pipeline.id):
             if not self.logs:
                 self.logs = ""
-            self.logs += f"{message.time} - {message.message}\n"
+            self.logs += "".join(f"{message.time} - {message.message}\n" for message in batch.messages)
         await self.client.close_sessions()
 
     def __panel__(self):
@@ -30,8 +30,6 @@ class PipelineSearchModel(param.Parameterized):
         default="", doc="Computed filter string for searching pipelines")
 
     cursor = param.String(default=None, doc="Cursor for pagination.")
-    cursors = param.List(
-        default=[], doc="List of cursors for pagination.")
     result = param.ClassSelector(
         class_=Pipelines, default=None, doc="The result of the pipeline search.")
     search_params = param.Dict(default={})
@@ -89,30 +87,21 @@ class PipelineSearchModel(param.Parameterized):
             self.filter = json.dumps(filter)
 
     @param.depends('search', watch=True)
-    async def reset_cursor_history(self):
-        """Reset the cursor history when the search input changes."""
-        self.cursors = []
+    async def reset_cursor(self):
+        """Reset the cursor when the search input changes."""
         self.cursor = ""
 
     @param.depends('load_more', watch=True)
     def load_more_results(self):
-        """Load more results based on the current cursor."""
-        if self.result.page_meta and self.result.page_meta.next_cursor:
-            if self.cursor:
-                if len(self.cursors) > 0 and self.cursors[-1] != self.cursor:
-                    self.cursors.append(self.cursor)
-                else:
-                    self.cursors = [self.cursor]
-                # print("CURSORS", self.cursors)
-            # print("NEXT CURSOR", self.result.page_meta.next_cursor)
+        """Load more results based on the next cursor of the current page."""
+        if self.result and self.result.page_meta and self.result.page_meta.next_cursor:
             self.cursor = self.result.page_meta.next_cursor
 
     @param.depends('load_prev', watch=True)
     def load_prev_results(self):
-        """Load previous results based on the cursor history."""
-        if len(self.cursors) > 0:
-            self.cursor = self.cursors.pop()
-            # print("CURSORS", self.cursors)
+        """Load previous results based on the previous cursor of the current page."""
+        if self.result and self.result.page_meta and self.result.page_meta.previous_cursor:
+            self.cursor = self.result.page_meta.previous_cursor
         else:
             self.cursor = ""
 
@@ -154,8 +143,6 @@ class PipelineSearch(pn.viewable.Viewer):
         next_cursor (str): The cursor for the next page.
         more_clicks (int): The number of clicks on the "Load More" button.
         prev_clicks (int): The number of clicks on the "Load Previous" button.
-        cursors (list): A list of cursors for pagination.
-        cursor_index (int): The index of the current cursor in the cursors list.
         dashboard_page (str): The page to navigate to when a pipeline is clicked.
     """
     spec = param.Dict(default={})
@@ -1,6 +1,5 @@
 import asyncio
 import gql
-import json
 import os
 import threading
 from functools import reduce
@@ -184,7 +183,7 @@ def generate_unique_paths(pipeline: Pipeline, datasets: list) -> Pipeline:
     """
     for d in pipeline.data_catalog:
         if d.name in datasets:
-            c = json.loads(d.config)
+            c = d.parse_config()
             if c.get("filepath", None):
                 filepath = c["filepath"]
                 parts = filepath.rsplit("/", 1)
@@ -192,7 +191,7 @@ def generate_unique_paths(pipeline: Pipeline, datasets: list) -> Pipeline:
                 c["filepath"] = new_path
                 logger.info(
                     f"Modifying dataset {d.name} filepath to {new_path} to ensure uniqueness.")
-                d.config = json.dumps(c)
+                d.set_config(c)
             elif c.get("path", None):
                 path = c["path"]
                 parts = path.rsplit("/", 1)
@@ -200,7 +199,7 @@ def generate_unique_paths(pipeline: Pipeline, datasets: list) -> Pipeline:
                 c["path"] = new_path
                 logger.info(
                     f"Modifying dataset {d.name} path to {new_path} to ensure uniqueness.")
-                d.config = json.dumps(c)
+                d.set_config(c)
             else:
                 raise DataSetConfigError(
                     f"Dataset {d.name} does not have a 'filepath' or 'path' key in its configuration.")
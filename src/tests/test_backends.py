@@ -1,6 +1,22 @@
+import asyncio
+import dataclasses
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
+import pytest_asyncio
+from bson.objectid import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import BulkWriteError
 
-from kedro_graphql.models import State
+from kedro_graphql.backends import init_backend
+from kedro_graphql.backends.base import BaseBackend
+from kedro_graphql.backends.cached import CachedBackend
+from kedro_graphql.backends.mongodb import MongoBackend
+from kedro_graphql.backends.sqlite import SQLiteBackend
+from kedro_graphql.exceptions import CreateManyError
+from kedro_graphql.models import DataSet, Pipeline, PipelineStatus, State
 
 
 @pytest.mark.asyncio
@@ -25,3 +41,454 @@ async def test_backend_update_status(mock_app, mock_pipeline_no_task):
     p.status[-1].state = State.STARTED
     p = await mock_app.backend.update(p)
     assert p.status[-1].state == State.STARTED
+
+
+@pytest.mark.asyncio
+async def test_backend_read_projection(mock_app, mock_pipeline_no_task):
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    r = await mock_app.backend.read(id=p.id, projection=["name", "status.state"])
+    assert r.id == p.id
+    assert r.name == p.name
+    assert r.status[-1].state == State.READY
+    assert r.status[-1].runner is None
+    assert r.data_catalog == []
+    assert r.parameters is None
+
+
+@pytest.mark.asyncio
+async def test_backend_list_projection(mock_app, mock_pipeline_no_task):
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    results = await mock_app.backend.list(limit=10, filter="", sort="", projection=[])
+    assert [r.id for r in results] == [p.id]
+    assert results[0].name is None
+
+
+@pytest.mark.asyncio
+async def test_backend_list_filter_dataset_config(mock_app, mock_pipeline_no_task, mock_text_in):
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    results = await mock_app.backend.list(
+        limit=10, filter=json.dumps({"data_catalog.config.filepath": str(mock_text_in)}))
+    assert [r.id for r in results] == [p.id]
+    assert results[0].data_catalog == mock_pipeline_no_task.data_catalog
+
+
+@pytest.mark.asyncio
+async def test_backend_patch_status(mock_app, mock_pipeline_no_task):
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    assert await mock_app.backend.patch_status(
+        id=p.id, fields={"state": State.STARTED, "task_id": "$not-a-field-path"})
+    r = await mock_app.backend.read(id=p.id)
+    assert r.status[-1].state == State.STARTED
+    assert r.status[-1].task_id == "$not-a-field-path"
+    assert r.status[-1].runner == p.status[-1].runner
+
+
+@pytest.mark.asyncio
+async def test_backend_patch_status_index(mock_app, mock_pipeline_no_task):
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    await mock_app.backend.push_status(id=p.id, status=PipelineStatus(state=State.READY, session=None))
+    assert await mock_app.backend.patch_status(id=p.id, index=0, fields={"state": State.FAILURE})
+    r = await mock_app.backend.read(id=p.id)
+    assert len(r.status) == 2
+    assert r.status[0].state == State.FAILURE
+    assert r.status[1].state == State.READY
+
+
+@pytest.mark.asyncio
+async def test_backend_patch_status_exclude_states(mock_app, mock_pipeline_no_task):
+    mock_pipeline_no_task.status[-1].state = State.ABORTING
+    p = await mock_app.backend.create(mock_pipeline_no_task)
+    assert not await mock_app.backend.patch_status(
+        id=p.id, fields={"state": State.SUCCESS}, exclude_states=[State.ABORTING, State.ABORTED])
+    r = await mock_app.backend.read(id=p.id)
+    assert r.status[-1].state == State.ABORTING
+
+
+@pytest.mark.asyncio
+async def test_backend_patch_status_missing(mock_app):
+    assert not await mock_app.backend.patch_status(
+        id="000000000000000000000000", fields={"state": State.STARTED})
+
+
+@pytest.mark.asyncio
+async def test_backend_ensure_indexes(mock_app):
+    await mock_app.backend.startup()
+    info = await mock_app.backend._get_collection().index_information()
+    existing = {tuple(i["key"]) for i in info.values()}
+    for index in MongoBackend.DEFAULT_INDEXES:
+        assert MongoBackend._index_keys(index) in existing
+    assert await mock_app.backend.ensure_indexes() == []
+
+
+@pytest.mark.asyncio
+async def test_backend_ensure_indexes_report_only(mock_app):
+    custom = {"keys": [["name", 1], ["created_at", -1]], "name": "name_created_at"}
+    backend = MongoBackend(uri=mock_app.backend.uri,
+                           db=mock_app.backend.db_name,
+                           collection=mock_app.backend.collection,
+                           indexes=[custom],
+                           create_indexes=False)
+    missing = await backend.ensure_indexes()
+    assert custom in missing
+    info = await backend._get_collection().index_information()
+    assert "name_created_at" not in info
+
+    backend.create_indexes = True
+    await backend.ensure_indexes()
+    info = await backend._get_collection().index_information()
+    assert "name_created_at" in info
+
+
+@pytest.mark.asyncio
+async def test_backend_list_keyset_pagination(mock_app, mock_pipeline_no_task):
+    created = []
+    for day in [3, 1, 2, 2, 5, 4, 2]:
+        p = dataclasses.replace(mock_pipeline_no_task, id=None, created_at=datetime(2024, 1, day))
+        created.append(await mock_app.backend.create(p))
+    expected = [p.id for p in sorted(created, key=lambda p: (p.created_at, p.id), reverse=True)]
+    sort = "[('created_at', -1)]"
+
+    ids, cursor = [], None
+    while True:
+        page = await mock_app.backend.list(cursor=cursor, limit=3, sort=sort)
+        if len(page) < 3:
+            ids += [p.id for p in page]
+            break
+        last = page.pop(-1)
+        ids += [p.id for p in page]
+        cursor = {"id": last.id, "values": [jsonable_encoder(last.created_at)]}
+    assert ids == expected
+
+    # a page ending before a cursor, with the sort values looked up by id
+    page = await mock_app.backend.list(cursor={"id": expected[4], "before": True}, limit=2, sort=sort)
+    assert [p.id for p in page] == expected[2:4]
+
+
+@pytest.mark.asyncio
+async def test_backend_list_keyset_pagination_missing_values(mock_app, mock_pipeline_no_task):
+    collection = mock_app.backend._get_collection()
+    created = []
+    for day in [3, None, 1, None, 2, None, 4]:
+        p = dataclasses.replace(mock_pipeline_no_task, id=None, created_at=datetime(2024, 1, day) if day else None)
+        created.append(await mock_app.backend.create(p))
+    # null and missing values sort together, before every date
+    for p in created[3:]:
+        if p.created_at is None:
+            await collection.update_one({"_id": ObjectId(p.id)}, {"$unset": {"created_at": ""}})
+    key = lambda p: (p.created_at is not None, p.created_at or datetime.min, p.id)
+
+    for direction in (-1, 1):
+        expected = [p.id for p in sorted(created, key=key, reverse=direction == -1)]
+        sort = f"[('created_at', {direction})]"
+        ids, cursor = [], None
+        while True:
+            page = await mock_app.backend.list(cursor=cursor, limit=2, sort=sort)
+            if len(page) < 2:
+                ids += [p.id for p in page]
+                break
+            last = page.pop(-1)
+            ids += [p.id for p in page]
+            cursor = {"id": last.id}
+        assert ids == expected
+
+        page = await mock_app.backend.list(cursor={"id": expected[5], "before": True}, limit=3, sort=sort)
+        assert [p.id for p in page] == expected[2:5]
+
+
+def test_mongo_keyset_predicate_null_bracket():
+    id = ObjectId()
+    sort = [("created_at", -1), ("_id", -1)]
+    # every null or missing value comes after a date in descending order
+    assert MongoBackend._keyset_predicate(sort, ["2024-01-01", id]) == {"$or": [
+        {"created_at": {"$lt": "2024-01-01"}},
+        {"created_at": None},
+        {"created_at": "2024-01-01", "_id": {"$lte": id}},
+    ]}
+    # and nothing comes after a null one except its ties
+    assert MongoBackend._keyset_predicate(sort, [None, id]) == {"$or": [
+        {"created_at": None, "_id": {"$lte": id}},
+    ]}
+    assert MongoBackend._keyset_predicate(sort, [None, id], before=True) == {"$or": [
+        {"created_at": {"$ne": None}},
+        {"created_at": None, "_id": {"$gt": id}},
+    ]}
+
+
+@pytest.mark.asyncio
+async def test_backend_read_many(mock_app, mock_pipeline_no_task):
+    a = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None))
+    b = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None, name="example01"))
+    missing = "000000000000000000000000"
+    results = await mock_app.backend.read_many(ids=[b.id, missing, a.id, "not-an-id"], projection=["name"])
+    assert [r.id if r else None for r in results] == [b.id, None, a.id, None]
+    assert results[0].name == "example01"
+    assert results[0].data_catalog == []
+
+
+@pytest.mark.asyncio
+async def test_cached_backend_read_through(mock_app, mock_pipeline_no_task):
+    backend = CachedBackend(mock_app.backend, max_size=10, ttl=60, poll_interval=0.1)
+    p = await backend.create(mock_pipeline_no_task)
+
+    first = await backend.read(id=p.id)
+    first.name = "mutated by a resolver"
+    second = await backend.read(id=p.id)
+    assert second.name == p.name
+    assert backend.cache.stats()["hits"] == 1
+
+    second.name = "example01"
+    await backend.update(second)
+    assert (await backend.read(id=p.id)).name == "example01"
+
+
+@pytest.mark.asyncio
+async def test_cached_backend_invalidates_external_writes(mock_app, mock_pipeline_no_task):
+    backend = CachedBackend(mock_app.backend, max_size=10, ttl=60, poll_interval=0.1)
+    await backend.startup()
+    try:
+        p = await backend.create(mock_pipeline_no_task)
+        await asyncio.sleep(0.2)
+        assert (await backend.read(id=p.id, projection=["status"])).status[-1].state == State.READY
+
+        # written by another process e.g. a celery worker
+        await mock_app.backend.patch_status(id=p.id, fields={"state": State.STARTED})
+        await asyncio.sleep(0.5)
+        assert (await backend.read(id=p.id, projection=["status"])).status[-1].state == State.STARTED
+    finally:
+        await backend.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_backend_create_many_update_many(mock_app, mock_pipeline_no_task):
+    pipelines = [dataclasses.replace(mock_pipeline_no_task, id=None, name=f"example{i:02d}") for i in range(3)]
+    created = await mock_app.backend.create_many(pipelines)
+    assert [p.name for p in created] == ["example00", "example01", "example02"]
+    assert len({p.id for p in created}) == 3
+
+    for p in created:
+        p.name = p.name + "-updated"
+    await mock_app.backend.update_many(created)
+    stored = await mock_app.backend.read_many(ids=[p.id for p in created])
+    assert [p.name for p in stored] == ["example00-updated", "example01-updated", "example02-updated"]
+    assert await mock_app.backend.create_many([]) == []
+
+
+@pytest_asyncio.fixture
+async def sqlite_backend(tmp_path):
+    backend = SQLiteBackend(path=str(tmp_path / "pipelines.db"))
+    await backend.startup()
+    yield backend
+    await backend.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_without_startup(tmp_path):
+    # celery workers create their backend with init_backend and never start it up
+    backend = SQLiteBackend(path=str(tmp_path / "pipelines.db"))
+    try:
+        assert not await backend.patch_status(id="000000000000000000000000", fields={"state": State.STARTED})
+        assert not await backend.push_status(id="000000000000000000000000",
+                                             status=PipelineStatus(state=State.READY, session=None))
+        assert await backend.ensure_indexes() == []
+    finally:
+        await backend.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_crud(sqlite_backend, mock_pipeline_no_task):
+    p = await sqlite_backend.create(mock_pipeline_no_task)
+    assert p.id is not None
+    assert await sqlite_backend.read(id=p.id) == p
+
+    r = await sqlite_backend.read(id=p.id, projection=["name"])
+    assert r.name == p.name
+    assert r.data_catalog == []
+
+    p.name = "example01"
+    assert (await sqlite_backend.update(p)).name == "example01"
+    assert await sqlite_backend.read_many(ids=[p.id, "000000000000000000000000"]) == [p, None]
+
+    await sqlite_backend.delete(id=p.id)
+    assert await sqlite_backend.read(id=p.id) is None
+    assert await sqlite_backend.ensure_indexes() == []
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_unset_fields(sqlite_backend, mock_pipeline_no_task):
+    p = await sqlite_backend.create(mock_pipeline_no_task)
+    # written by an earlier version that stored the template's describe
+    await sqlite_backend._run(lambda connection: connection.execute(
+        "UPDATE pipelines SET doc = json_set(doc, '$.describe', 'stale')"))
+    assert await sqlite_backend.unset_fields(["describe", "nodes"]) == 1
+    assert await sqlite_backend.unset_fields(["describe", "nodes"]) == 0
+    assert await sqlite_backend.read(id=p.id) == p
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_status(sqlite_backend, mock_pipeline_no_task):
+    p = await sqlite_backend.create(mock_pipeline_no_task)
+    assert await sqlite_backend.patch_status(id=p.id, fields={"task_id": "task-1", "state": State.STARTED})
+    assert not await sqlite_backend.patch_status(
+        id=p.id, fields={"state": State.SUCCESS}, exclude_states=[State.STARTED])
+
+    retry = PipelineStatus(state=State.READY, runner="kedro.runner.SequentialRunner", session=None,
+                           task_id="task-2")
+    assert await sqlite_backend.push_status(id=p.id, status=retry)
+    assert not await sqlite_backend.push_status(id="000000000000000000000000", status=retry)
+
+    r = await sqlite_backend.read(task_id="task-1")
+    assert r.id == p.id
+    assert [s.state for s in r.status] == [State.STARTED, State.READY]
+    assert (await sqlite_backend.read(task_id="task-2")).id == p.id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["mock_app", "sqlite_backend"])
+async def test_backend_push_datasets(request, backend, mock_pipeline_no_task):
+    backend = request.getfixturevalue(backend)
+    backend = getattr(backend, "backend", backend)
+    p = await backend.create(mock_pipeline_no_task)
+    gql_meta = DataSet(name="gql_meta", config={"type": "json.JSONDataset", "filepath": "/tmp/meta.json"})
+
+    assert await backend.push_datasets(id=p.id, datasets=[gql_meta])
+    assert not await backend.push_datasets(id="000000000000000000000000", datasets=[gql_meta])
+
+    r = await backend.read(id=p.id)
+    assert [d.name for d in r.data_catalog] == [d.name for d in p.data_catalog] + ["gql_meta"]
+    assert r.data_catalog[-1].parse_config() == gql_meta.parse_config()
+    assert r.status == p.status
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_list_filter(sqlite_backend, mock_pipeline_no_task):
+    created = await sqlite_backend.create_many(
+        [dataclasses.replace(mock_pipeline_no_task, id=None, name=f"example{i:02d}") for i in range(4)])
+    await sqlite_backend.patch_status(id=created[1].id, fields={"state": State.FAILURE})
+
+    async def names(filter):
+        return [p.name for p in await sqlite_backend.list(limit=10, filter=json.dumps(filter))]
+
+    assert await names({"name": "example02"}) == ["example02"]
+    assert await names({"name": {"$regex": "^EXAMPLE0[23]", "$options": "i"}}) == ["example02", "example03"]
+    assert await names({"status.state": "FAILURE"}) == ["example01"]
+    assert await names({"status.state": {"$ne": "READY"}}) == ["example01"]
+    assert len(await names({"tags": {"key": "author", "value": "opensean"}})) == 4
+    assert await names({"$or": [{"name": "example00"}, {"status.state": {"$in": ["FAILURE"]}}]}) == [
+        "example00", "example01"]
+    with pytest.raises(ValueError):
+        await names({"name": {"$where": "true"}})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("key", [
+    "name') IS NOT NULL OR 1=1 OR json_extract(doc, '$.x",
+    'name"',
+    "status.state'",
+    "tags.key OR 1",
+    "",
+])
+async def test_sqlite_backend_rejects_hostile_paths(sqlite_backend, mock_pipeline_no_task, key):
+    p = await sqlite_backend.create(mock_pipeline_no_task)
+    with pytest.raises(ValueError):
+        await sqlite_backend.list(limit=10, filter=json.dumps({key: "example00"}))
+    with pytest.raises(ValueError):
+        await sqlite_backend.list(limit=10, filter=json.dumps({"status": {"$elemMatch": {key: "READY"}}}))
+    with pytest.raises(ValueError):
+        await sqlite_backend.list(limit=10, sort=repr([(key, 1)]))
+    with pytest.raises(ValueError):
+        await sqlite_backend.list(limit=10, projection=[key])
+    with pytest.raises(ValueError):
+        await sqlite_backend.patch_status(id=p.id, fields={key: "READY"})
+    assert (await sqlite_backend.read(id=p.id)) == p
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_list_keyset_pagination(sqlite_backend, mock_pipeline_no_task):
+    await sqlite_backend.create_many([
+        dataclasses.replace(mock_pipeline_no_task, id=None, name=f"example{i % 3}",
+                            created_at=datetime(2024, 1, 1, i // 2)) for i in range(9)])
+
+    for sort in ["", "[('created_at', -1)]", "[('name', 1), ('created_at', -1)]", "[('status.state', 1)]"]:
+        expected = [p.id for p in await sqlite_backend.list(limit=100, sort=sort)]
+        ids, cursor = [], None
+        while True:
+            page = await sqlite_backend.list(cursor=cursor, limit=3, sort=sort)
+            ids += [p.id for p in page[:2]]
+            if len(page) < 3:
+                break
+            cursor = page[2].id
+        assert ids == expected
+
+        before = await sqlite_backend.list(cursor={"id": expected[5], "before": True}, limit=2, sort=sort)
+        assert [p.id for p in before] == expected[3:5]
+
+
+class CustomBackend(MongoBackend):
+    """A backend written against the constructor arguments of the original MongoBackend."""
+
+    def __init__(self, uri=None, db=None, collection=None):
+        super().__init__(uri=uri, db=db, collection=collection)
+
+
+class PlainBackend:
+    def __init__(self, uri=None, db=None, collection=None):
+        self.uri, self.db, self.collection = uri, db, collection
+
+
+def test_init_backend(tmp_path):
+    config = {"KEDRO_GRAPHQL_MONGO_URI": "mongodb://localhost:27017/", "KEDRO_GRAPHQL_MONGO_DB_NAME": "pipelines",
+              "KEDRO_GRAPHQL_MONGO_DB_COLLECTION": "pipelines", "KEDRO_GRAPHQL_MONGO_INDEXES": [],
+              "KEDRO_GRAPHQL_MONGO_CREATE_INDEXES": False,
+              "KEDRO_GRAPHQL_SQLITE_PATH": str(tmp_path / "pipelines.db")}
+
+    mongo = init_backend({**config, "KEDRO_GRAPHQL_BACKEND": "kedro_graphql.backends.mongodb.MongoBackend"})
+    assert isinstance(mongo, MongoBackend) and not mongo.create_indexes
+    sqlite = init_backend({**config, "KEDRO_GRAPHQL_BACKEND": "kedro_graphql.backends.sqlite.SQLiteBackend"})
+    assert sqlite.path == str(tmp_path / "pipelines.db")
+    assert "uri" not in SQLiteBackend.config_kwargs(config)
+    custom = init_backend({**config, "KEDRO_GRAPHQL_BACKEND": f"{__name__}.CustomBackend"})
+    assert isinstance(custom, CustomBackend) and custom.db_name == "pipelines"
+    plain = init_backend({**config, "KEDRO_GRAPHQL_BACKEND": f"{__name__}.PlainBackend"})
+    assert (plain.uri, plain.db, plain.collection) == ("mongodb://localhost:27017/", "pipelines", "pipelines")
+
+
+def test_worker_backend_is_not_cached(tmp_path):
+    from kedro_graphql.celeryapp import celery_app
+
+    backend = SQLiteBackend(path=str(tmp_path / "pipelines.db"))
+    app = celery_app({"KEDRO_GRAPHQL_BROKER": "redis://localhost:6379/15",
+                      "KEDRO_GRAPHQL_CELERY_RESULT_BACKEND": "redis://localhost:6379/15"},
+                     CachedBackend(backend), None)
+    assert app.kedro_graphql_backend is backend
+
+
+@pytest.mark.asyncio
+async def test_base_backend_create_many_partial():
+    backend = MagicMock()
+    created = Pipeline(id="a", name="example00")
+    backend.create = AsyncMock(side_effect=[created, ValueError("duplicate key")])
+
+    with pytest.raises(CreateManyError) as e:
+        await BaseBackend.create_many(backend, [Pipeline(name="example00"), Pipeline(name="example00")])
+    assert e.value.created == [created, None]
+    assert e.value.errors == {1: "duplicate key"}
+
+
+@pytest.mark.asyncio
+async def test_mongo_backend_create_many_partial():
+    async def insert_many(documents, ordered=True):
+        assert not ordered
+        for document in documents:
+            document["_id"] = ObjectId()
+        raise BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+
+    backend = MongoBackend(uri="mongodb://localhost:27017/", db="pipelines")
+    collection = MagicMock()
+    collection.insert_many = insert_many
+    with patch.object(backend, "_get_collection", return_value=collection):
+        with pytest.raises(CreateManyError) as e:
+            await backend.create_many([Pipeline(name="example00"), Pipeline(name="example01"),
+                                       Pipeline(name="example02")])
+    assert [p.name if p else None for p in e.value.created] == ["example00", None, "example02"]
+    assert ObjectId.is_valid(e.value.created[0].id)
+    assert e.value.errors == {1: "duplicate key"}
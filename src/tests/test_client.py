@@ -238,3 +238,26 @@ class TestKedroGraphqlClient:
             log_count += 1
             if log_count >= max_logs:
                 break
+
+    @pytest.mark.asyncio
+    async def test_pipeline_log_batches(self, mock_celery_session_app, celery_session_worker, mock_create_pipeline, mock_client):
+
+        pipeline_input, expected, pipeline = mock_create_pipeline
+
+        async for result in mock_client.pipeline_log_batches(id=pipeline.id, max_batch=10, max_latency_ms=100):
+            assert result.id == pipeline.id
+            assert 1 <= len(result.messages) <= 10
+            assert all(m.task_id == result.task_id for m in result.messages)
+            break
+
+    @pytest.mark.asyncio
+    async def test_pipeline_log_history(self, mock_celery_session_app, celery_session_worker, mock_create_pipeline, mock_client):
+
+        pipeline_input, expected, pipeline = mock_create_pipeline
+
+        page = await mock_client.pipeline_log_history(id=pipeline.id, limit=5)
+        assert len(page.messages) <= 5
+        assert all(m.id == pipeline.id for m in page.messages)
+        if page.page_meta.next_cursor:
+            next_page = await mock_client.pipeline_log_history(id=pipeline.id, limit=5, cursor=page.page_meta.next_cursor)
+            assert next_page.messages[0].message_id != page.messages[-1].message_id
@@ -258,6 +258,24 @@ class TestComplexDataTypeParsing:
             # Should log warnings
             assert mock_logger.warning.call_count == 2
 
+    def test_json_field_mongo_indexes(self):
+        """Test parsing the MongoDB index list from a JSON string."""
+        config = {
+            "KEDRO_GRAPHQL_MONGO_INDEXES": '[{"keys": [["name", 1], ["created_at", -1]], "name": "name_created_at"}]'
+        }
+
+        parsed = env_var_parser(config)
+
+        assert parsed["KEDRO_GRAPHQL_MONGO_INDEXES"] == [
+            {"keys": [["name", 1], ["created_at", -1]], "name": "name_created_at"}]
+
+    def test_bool_field_string(self):
+        """Test parsing boolean fields from strings."""
+        for value, expected in [("true", True), ("1", True), ("Yes", True),
+                                ("false", False), ("0", False), ("off", False)]:
+            parsed = env_var_parser({"KEDRO_GRAPHQL_MONGO_CREATE_INDEXES": value})
+            assert parsed["KEDRO_GRAPHQL_MONGO_CREATE_INDEXES"] is expected
+
     def test_list_field_complex_json_array(self):
         """Test parsing complex JSON arrays with nested objects."""
         config = {
@@ -0,0 +1,78 @@
+import dataclasses
+import pytest
+from kedro_graphql.dataloaders import PipelineLoader
+from kedro_graphql.models import Pipeline
+
+
+class TestPipelineLoader:
+
+    @pytest.mark.asyncio
+    async def test_load_batches_and_memoizes(self, mocker, mock_app, mock_pipeline_no_task):
+        a = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None))
+        b = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None))
+        spy = mocker.spy(mock_app.backend, "read_many")
+
+        loader = PipelineLoader(mock_app.backend)
+        results = await loader.load_many([a.id, b.id, a.id])
+        assert [p.id for p in results] == [a.id, b.id, a.id]
+        assert spy.call_count == 1
+
+        assert (await loader.load(a.id)).id == a.id
+        assert spy.call_count == 1
+
+        loader.clear(a.id)
+        assert (await loader.load(a.id)).id == a.id
+        assert spy.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_missing(self, mock_app):
+        loader = PipelineLoader(mock_app.backend)
+        assert await loader.load("000000000000000000000000") is None
+
+    @pytest.mark.asyncio
+    async def test_load_returns_copies(self, mocker):
+        backend = mocker.Mock()
+        backend.read_many = mocker.AsyncMock(
+            side_effect=lambda ids, projection: [Pipeline(id=id, name="example00") for id in ids])
+
+        loader = PipelineLoader(backend)
+        first = await loader.load("a")
+        first.name = "modified"
+        assert (await loader.load("a")).name == "example00"
+        assert (await loader.load_many(["a"]))[0].name == "example00"
+        assert backend.read_many.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_load_many_empty(self, mocker):
+        backend = mocker.Mock()
+        backend.read_many = mocker.AsyncMock()
+
+        loader = PipelineLoader(backend)
+        assert await loader.load_many([]) == []
+        assert await loader._load_batch([]) == []
+        backend.read_many.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_extension_batches_operation_reads(self, mocker, mock_app, mock_pipeline_no_task):
+        a = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None))
+        b = await mock_app.backend.create(dataclasses.replace(mock_pipeline_no_task, id=None))
+        spy = mocker.spy(mock_app.backend, "read_many")
+
+        class Request():
+            app = mock_app
+            headers = {}
+
+        query = """
+        query TestQuery($a: String!, $b: String!) {
+          first: readPipeline(id: $a) { id name }
+          second: readPipeline(id: $b) { id name }
+        }
+        """
+        context = {"request": Request()}
+        resp = await mock_app.schema.execute(query, variable_values={"a": a.id, "b": b.id},
+                                             context_value=context)
+        assert resp.errors is None
+        assert resp.data["first"]["id"] == a.id
+        assert resp.data["second"]["id"] == b.id
+        assert spy.call_count == 1
+        assert "pipeline_loader" not in context
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from kedro_graphql.event_hub import EventHub
+from kedro_graphql.exceptions import InvalidPipeline
+from kedro_graphql.models import Pipeline, PipelineStatus, State
+from kedro_graphql.pipeline_event_monitor import PipelineEventPublisher
+
+BROKER_URL = "redis://localhost:6379/15"
+
+
+class StatusBackend:
+    """Backend serving pipelines whose state the test controls."""
+
+    def __init__(self, *ids, state=State.STARTED):
+        self.pipelines = {id: Pipeline(id=id, name="example00",
+                                       status=[PipelineStatus(state=state, session=None, task_id=f"task-{id}")])
+                          for id in ids}
+        self.reads = 0
+
+    async def read(self, id=None, task_id=None, projection=None):
+        self.reads += 1
+        return self.pipelines.get(id)
+
+
+class ScriptedHub(EventHub):
+    """Hub whose watchers replay a fixed list of events."""
+
+    def __init__(self, events, **kwargs):
+        super().__init__(**kwargs)
+        self.scripted = events
+        self.started = 0
+
+    async def _upstream(self, id, interval):
+        self.started += 1
+        for status in self.scripted:
+            yield {"id": id, "task_id": "task-0", "status": status}
+            await asyncio.sleep(0)
+        await asyncio.sleep(3600)
+
+
+class TestEventHub:
+
+    @pytest.mark.asyncio
+    async def test_subscribers_share_watcher(self):
+        """
+        Requires Redis to run.
+        """
+        backend = StatusBackend("event-hub-0")
+        hub = EventHub(backend=backend, broker_url=BROKER_URL)
+
+        async def collect():
+            return [e["status"] async for e in hub.subscribe("event-hub-0")]
+
+        subscribers = [asyncio.create_task(collect()) for _ in range(3)]
+        await asyncio.sleep(0.2)
+        assert hub.stats()["watchers"] == 1
+        assert hub.stats()["subscribers"] == 3
+
+        PipelineEventPublisher(broker_url=BROKER_URL).publish("event-hub-0", task_id="task-event-hub-0",
+                                                              status="SUCCESS")
+        results = await asyncio.wait_for(asyncio.gather(*subscribers), timeout=5)
+
+        assert results == [["STARTED", "SUCCESS"]] * 3
+        assert backend.reads == 1
+        assert hub.stats() == {"watchers": 0, "subscribers": 0, "events": 2, "dropped": 0}
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_latest_event(self):
+        hub = ScriptedHub(["STARTED", "RETRY"])
+        first = hub.subscribe("event-hub-1")
+        assert (await first.__anext__())["status"] == "STARTED"
+        assert (await first.__anext__())["status"] == "RETRY"
+
+        second = hub.subscribe("event-hub-1")
+        assert (await second.__anext__())["status"] == "RETRY"
+        assert hub.started == 1
+
+        await first.aclose()
+        await second.aclose()
+
+    @pytest.mark.asyncio
+    async def test_invalid_pipeline(self):
+        """
+        Requires Redis to run.
+        """
+        hub = EventHub(backend=StatusBackend(), broker_url=BROKER_URL)
+        with pytest.raises(InvalidPipeline):
+            async for e in hub.subscribe("event-hub-2"):
+                pass
+        assert hub.stats()["watchers"] == 0
+
+    @pytest.mark.asyncio
+    async def test_last_subscriber_stops_watcher(self):
+        hub = ScriptedHub(["STARTED"])
+        subscription = hub.subscribe("event-hub-3")
+        await subscription.__anext__()
+        watcher = hub._watchers["event-hub-3"]
+
+        await subscription.aclose()
+        await asyncio.sleep(0)
+
+        assert hub.stats()["watchers"] == 0
+        assert watcher.task.cancelled() or watcher.task.done()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        hub = ScriptedHub([str(i) for i in range(10)], queue_size=3)
+        subscription = hub.subscribe("event-hub-4")
+        assert (await subscription.__anext__())["status"] == "0"
+        # let the watcher overflow the queue of this slow subscriber
+        await asyncio.sleep(0.1)
+
+        assert [(await subscription.__anext__())["status"] for _ in range(3)] == ["7", "8", "9"]
+        assert hub.stats()["dropped"] == 6
+        await subscription.aclose()
+
+    @pytest.mark.asyncio
+    async def test_drop_newest(self):
+        hub = ScriptedHub([str(i) for i in range(10)], queue_size=3, overflow="drop_newest")
+        subscription = hub.subscribe("event-hub-5")
+        assert (await subscription.__anext__())["status"] == "0"
+        await asyncio.sleep(0.1)
+
+        assert [(await subscription.__anext__())["status"] for _ in range(3)] == ["1", "2", "3"]
+        await subscription.aclose()
+
+    @pytest.mark.asyncio
+    async def test_block(self):
+        hub = ScriptedHub([str(i) for i in range(10)], queue_size=1, overflow="block")
+        subscription = hub.subscribe("event-hub-6")
+        statuses = [(await subscription.__anext__())["status"] for _ in range(10)]
+
+        assert statuses == [str(i) for i in range(10)]
+        assert hub.stats()["dropped"] == 0
+        await subscription.aclose()
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError):
+            EventHub(overflow="drop_all")
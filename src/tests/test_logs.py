@@ -1,6 +1,20 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+
 import pytest
+import redis
+
+import fsspec
+from kedro.io import AbstractDataset
 
-from kedro_graphql.logs.logger import PipelineLogStream
+from kedro_graphql import hooks
+from kedro_graphql.logs.archive import LogArchive, read_log_file, write_log_file
+from kedro_graphql.logs.capture import TaskLogRouter, current_task_id
+from kedro_graphql.logs.logger import KedroGraphQLLogHandler, PipelineLogStream, RedisLogStreamPublisher
 
 
 @pytest.mark.usefixtures('mock_celery_session_app')
@@ -14,4 +28,454 @@ class TestPipelineLogStream:
         task_id = mock_pipeline.status[-1].task_id
         subscriber = await PipelineLogStream().create(task_id=task_id, broker_url=mock_app.config["KEDRO_GRAPHQL_BROKER"])
         async for e in subscriber.consume():
-            assert set(e.keys()) == set(["task_id", "message_id", "message", "time"])
+            assert set(e.keys()) == set(["task_id", "message_id", "message", "time", "level", "logger"])
+
+
+class TestPipelineLogStreamBlocking:
+    @pytest.mark.asyncio
+    async def test_consume_until_end_of_stream(self, mocker):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        async_result = mocker.patch("kedro_graphql.logs.logger.AsyncResult")
+        redis.Redis.from_url(broker_url).delete("log-stream-blocking-0")
+        publisher = RedisLogStreamPublisher("log-stream-blocking-0", broker_url=broker_url)
+        for i in range(5):
+            publisher.publish({"message": f"message {i}", "time": "now"})
+
+        subscriber = await PipelineLogStream().create(task_id="log-stream-blocking-0", broker_url=broker_url,
+                                                      count=2, block_ms=100)
+        reads = mocker.spy(subscriber.broker, "consume")
+
+        async def finish():
+            # let the subscriber time out on the idle stream at least once
+            await asyncio.sleep(0.3)
+            publisher.end()
+
+        finishing = asyncio.create_task(finish())
+        messages = [e["message"] async for e in subscriber.consume()]
+        await finishing
+        publisher.connection.delete("log-stream-blocking-0")
+
+        assert messages == ["Starting log stream"] + [f"message {i}" for i in range(5)]
+        assert all(c.kwargs["block"] == 100 and c.kwargs["count"] == 2 for c in reads.call_args_list)
+        # the task state is only checked when a read times out
+        assert 1 <= async_result.call_count < 10
+
+    @pytest.mark.asyncio
+    async def test_consume_batches(self, mocker):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        mocker.patch("kedro_graphql.logs.logger.AsyncResult")
+        redis.Redis.from_url(broker_url).delete("log-stream-blocking-1")
+        publisher = RedisLogStreamPublisher("log-stream-blocking-1", broker_url=broker_url)
+        for i in range(4):
+            publisher.publish({"message": f"message {i}", "time": "now"})
+
+        subscriber = await PipelineLogStream().create(task_id="log-stream-blocking-1", broker_url=broker_url,
+                                                      block_ms=100)
+
+        async def trickle():
+            # a message arriving alone is flushed after max_latency_ms
+            await asyncio.sleep(0.2)
+            publisher.publish({"message": "message 4", "time": "now"})
+            await asyncio.sleep(0.2)
+            publisher.end()
+
+        trickling = asyncio.create_task(trickle())
+        batches = [[e["message"] for e in batch]
+                   async for batch in subscriber.consume_batches(max_batch=2, max_latency_ms=50)]
+        await trickling
+        publisher.connection.delete("log-stream-blocking-1")
+
+        assert batches == [["Starting log stream", "message 0"], ["message 1", "message 2"],
+                           ["message 3"], ["message 4"]]
+
+
+def log_archive(path):
+    return LogArchive(AbstractDataset.from_config("gql_logs", {"type": "partitions.PartitionedDataset",
+                                                               "dataset": "text.TextDataset",
+                                                               "path": str(path)}))
+
+
+class TestLogArchive:
+    def test_read_segments(self, tmp_path):
+        archive = log_archive(tmp_path)
+        assert list(archive.read("task-0")) == []
+
+        archive.save("task-0", [{"message_id": f"1-{i}", "message": str(i)} for i in range(3)])
+        archive.save("task-0", [{"message_id": f"10-{i}", "message": str(i + 3)} for i in range(3)])
+        archive.save("task-1", [{"message_id": "1-0", "message": "other task"}])
+
+        assert [m["message"] for m in archive.read("task-0")] == ["0", "1", "2", "3", "4", "5"]
+        assert [m["message"] for m in archive.read("task-0", after_id="1-1", before_id="10-2")] == ["2", "3", "4"]
+        assert [m["message"] for m in archive.read("task-0", after_id="10-0")] == ["4", "5"]
+
+    def test_segments_list_task_directory(self, mocker, tmp_path):
+        archive = log_archive(tmp_path)
+        archive.save("task-0", [{"message_id": "1-0", "message": "0"}])
+        archive.save("task-1", [{"message_id": "1-0", "message": "other task"}])
+        load = mocker.spy(archive.dataset, "load")
+        find = mocker.spy(archive.dataset._filesystem, "find")
+
+        assert [first_id for first_id, _ in archive.segments("task-0")] == ["1-0"]
+        assert archive.segments("task-2") == []
+        load.assert_not_called()
+        assert all(call.args[0].endswith("/logs/task-0/stream/") or call.args[0].endswith("/logs/task-2/stream/")
+                   for call in find.call_args_list)
+
+
+class TestPipelineLogStreamResume:
+    @pytest.mark.asyncio
+    async def test_resume_and_filter(self, mocker):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        mocker.patch("kedro_graphql.logs.logger.AsyncResult")
+        redis.Redis.from_url(broker_url).delete("log-stream-resume-0")
+        publisher = RedisLogStreamPublisher("log-stream-resume-0", broker_url=broker_url)
+        for i, level in enumerate(["INFO", "WARNING", "ERROR", "DEBUG"]):
+            publisher.publish({"message": f"message {i}", "time": "now", "level": level,
+                               "logger": "kedro.runner" if i % 2 else "kedro_graphql"})
+        publisher.end()
+        ids = [m["message_id"] for m in publisher.messages()]
+
+        async def consume(**kwargs):
+            subscriber = await PipelineLogStream().create(task_id="log-stream-resume-0", broker_url=broker_url,
+                                                          block_ms=100, **kwargs)
+            return [e["message"] async for e in subscriber.consume()]
+
+        assert await consume(after_message_id=ids[2]) == ["message 2", "message 3"]
+        assert await consume(level="warning") == ["message 1", "message 2"]
+        assert await consume(logger_name="kedro") == ["message 1", "message 3"]
+        publisher.connection.delete("log-stream-resume-0")
+
+    @pytest.mark.asyncio
+    async def test_backfill_from_archive(self, mocker, tmp_path):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        async_result = mocker.patch("kedro_graphql.logs.logger.AsyncResult")
+        async_result.return_value.status = "SUCCESS"
+        redis.Redis.from_url(broker_url).delete("log-stream-resume-1")
+        publisher = RedisLogStreamPublisher("log-stream-resume-1", broker_url=broker_url)
+        for i in range(5):
+            publisher.publish({"message": f"message {i}", "time": "now"})
+        archive = log_archive(tmp_path)
+        archive.save("log-stream-resume-1", publisher.messages())
+        ids = [m["message_id"] for m in publisher.messages()]
+        # the stream is removed once archived
+        publisher.connection.delete("log-stream-resume-1")
+
+        subscriber = await PipelineLogStream().create(task_id="log-stream-resume-1", broker_url=broker_url,
+                                                      block_ms=100, after_message_id=ids[3], archive=archive)
+        assert [e["message"] async for e in subscriber.consume()] == ["message 3", "message 4"]
+
+        subscriber = await PipelineLogStream().create(task_id="log-stream-resume-1", broker_url=broker_url,
+                                                      archive=archive)
+        assert [len(b) async for b in subscriber.consume_batches(max_batch=4)] == [4, 2]
+
+        subscriber = await PipelineLogStream().create(task_id="log-stream-resume-1", broker_url=broker_url,
+                                                      after_message_id=ids[0], archive=archive)
+        assert [e["message"] for e in await subscriber.history(limit=2)] == ["message 0", "message 1"]
+
+        # a page of history stops reading the archive at its limit
+        last_ms = int(ids[-1].split("-")[0])
+        archive.save("log-stream-resume-1", [{"message_id": f"{last_ms + 1}-{i}", "message": f"message {i + 5}"}
+                                             for i in range(5)])
+        loads = []
+        segments = archive.segments
+        mocker.patch.object(archive, "segments", lambda task_id: [
+            (first_id, lambda load=load, first_id=first_id: loads.append(first_id) or load())
+            for first_id, load in segments(task_id)])
+        subscriber = await PipelineLogStream().create(task_id="log-stream-resume-1", broker_url=broker_url,
+                                                      archive=archive)
+        assert len(await subscriber.history(limit=3)) == 3
+        assert loads == [ids[0]]
+
+
+class TestKedroGraphQLLogHandler:
+    def logger(self, handler):
+        logger = logging.getLogger("kedro_graphql.tests.log_handler")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        return logger
+
+    def test_buffered(self, mocker):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        redis.Redis.from_url(broker_url).delete("log-handler-0")
+        handler = KedroGraphQLLogHandler("log-handler-0", broker_url=broker_url, buffered=True, batch_size=10)
+        writes = mocker.spy(handler.broker, "publish_many")
+        logger = self.logger(handler)
+        for i in range(25):
+            logger.info(f"message {i}", extra={"count": i, "flag": True, "meta": {"a": 1}})
+        handler.flush()
+
+        messages = handler.broker.messages()
+        assert [m["message"] for m in messages] == ["Starting log stream"] + [f"message {i}" for i in range(25)]
+        assert {(m["level"], m["logger"]) for m in messages[1:]} == {("INFO", "kedro_graphql.tests.log_handler")}
+        assert sum(len(c.args[0]) for c in writes.call_args_list) == 25
+        assert all(len(c.args[0]) <= 10 for c in writes.call_args_list)
+
+        logger.removeHandler(handler)
+        handler.close()
+        assert not handler._writer.is_alive()
+        handler.broker.connection.delete("log-handler-0")
+
+    @pytest.mark.parametrize("overflow,expected", [("drop_oldest", [3, 4]), ("drop_newest", [0, 1])])
+    def test_overflow(self, overflow, expected):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        redis.Redis.from_url(broker_url).delete("log-handler-1")
+        handler = KedroGraphQLLogHandler("log-handler-1", broker_url=broker_url, buffered=True, queue_size=2,
+                                         overflow=overflow)
+        # hold the writer thread in its first write until every record is queued
+        writing, release = threading.Event(), threading.Event()
+        publish_many = handler.broker.publish_many
+
+        def held_publish_many(entries):
+            writing.set()
+            release.wait(5)
+            publish_many(entries)
+
+        handler.broker.publish_many = held_publish_many
+        logger = self.logger(handler)
+        logger.info("first")
+        assert writing.wait(5)
+        for i in range(5):
+            logger.info(f"message {i}")
+        release.set()
+        handler.flush()
+
+        messages = [m["message"] for m in handler.broker.messages()]
+        assert messages == ["Starting log stream", "first"] + [f"message {i}" for i in expected]
+        assert handler.dropped == 3
+
+        logger.removeHandler(handler)
+        handler.close()
+        handler.broker.connection.delete("log-handler-1")
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError):
+            KedroGraphQLLogHandler("log-handler-2", broker_url="redis://localhost:6379/15", overflow="drop_all")
+
+
+class TestCappedLogStream:
+    def test_trim_spills_to_archive(self, tmp_path):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        redis.Redis.from_url(broker_url).delete("log-stream-capped-0", "log-stream-capped-0:archived")
+        archive = log_archive(tmp_path)
+        publisher = RedisLogStreamPublisher("log-stream-capped-0", broker_url=broker_url, maxlen=100,
+                                            archive=archive)
+        for i in range(1000):
+            publisher.publish({"message": f"message {i}", "time": "now"})
+
+        # bounded by maxlen plus the trimming slack and approximate trimming
+        assert publisher.connection.xlen("log-stream-capped-0") < 400
+        publisher.end()
+        publisher.spill()
+
+        expected = ["Starting log stream"] + [f"message {i}" for i in range(1000)]
+        assert [m["message"] for m in archive.read("log-stream-capped-0")] == expected
+        publisher.delete()
+        assert not publisher.connection.exists("log-stream-capped-0", "log-stream-capped-0:archived")
+
+    def test_trim_without_archive(self):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        redis.Redis.from_url(broker_url).delete("log-stream-capped-1")
+        publisher = RedisLogStreamPublisher("log-stream-capped-1", broker_url=broker_url, maxlen=100)
+        publisher.publish_many([{"message": f"message {i}", "time": "now"} for i in range(1000)])
+
+        assert publisher.connection.xlen("log-stream-capped-1") < 400
+        assert publisher.messages()[-1]["message"] == "message 999"
+        publisher.delete()
+
+    @pytest.mark.asyncio
+    async def test_lagging_subscriber_reads_trimmed_messages(self, mocker, tmp_path):
+        """Requires Redis to run.
+        """
+        broker_url = "redis://localhost:6379/15"
+        mocker.patch("kedro_graphql.logs.logger.AsyncResult")
+        redis.Redis.from_url(broker_url).delete("log-stream-capped-2", "log-stream-capped-2:archived")
+        archive = log_archive(tmp_path)
+        publisher = RedisLogStreamPublisher("log-stream-capped-2", broker_url=broker_url, maxlen=100,
+                                            archive=archive)
+        subscriber = await PipelineLogStream().create(task_id="log-stream-capped-2", broker_url=broker_url,
+                                                      count=50, block_ms=100, archive=archive)
+        messages = subscriber.consume()
+        assert (await messages.__anext__())["message"] == "Starting log stream"
+
+        # the stream is trimmed past the subscriber's position
+        for i in range(1000):
+            publisher.publish({"message": f"message {i}", "time": "now"})
+        publisher.end()
+
+        assert [e["message"] async for e in messages] == [f"message {i}" for i in range(1000)]
+        publisher.delete()
+
+
+def write_log_lines(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(f"2024-01-01 12:{i // 600:02d}:{(i // 10) % 60:02d},000 - INFO - message {i}\n")
+
+
+class TestLogFileArchive:
+    @pytest.mark.parametrize("compression", ["gzip", "zstd", "none"])
+    def test_write_and_read(self, tmp_path, compression):
+        if compression == "zstd":
+            pytest.importorskip("zstandard")
+        write_log_lines(tmp_path / "info.log", 6000)
+        fs = fsspec.filesystem("file")
+        index = write_log_file(str(tmp_path / "info.log"), fs, str(tmp_path / "info.log.archive"),
+                               compression=compression, chunk_size=4096, workers=2)
+
+        assert len(index) > 10
+        assert [e["raw_offset"] for e in index] == [0] + [e["raw_offset"] + e["raw_length"] for e in index[:-1]]
+        assert all(e["time"] for e in index)
+        whole = "".join(read_log_file(fs, str(tmp_path / "info.log.archive"), index, compression=compression))
+        assert whole == (tmp_path / "info.log").read_text()
+
+        reads = []
+        opened = fs.open
+
+        def spy_open(*args, **kwargs):
+            f = opened(*args, **kwargs)
+            read = f.read
+            f.read = lambda length=-1: reads.append(length) or read(length)
+            return f
+
+        fs.open = spy_open
+        lines = "".join(read_log_file(fs, str(tmp_path / "info.log.archive"), index, compression=compression,
+                                      start_time="2024-01-01 12:05:00,000",
+                                      end_time="2024-01-01 12:05:10,000")).splitlines()
+        assert "2024-01-01 12:05:00,000 - INFO - message 3000" in lines
+        assert "2024-01-01 12:05:10,000 - INFO - message 3109" in lines
+        # only the chunks of the time range are read
+        assert len(reads) < len(index) / 4
+
+    def test_gzip_members(self, tmp_path):
+        write_log_lines(tmp_path / "info.log", 1000)
+        write_log_file(str(tmp_path / "info.log"), fsspec.filesystem("file"), str(tmp_path / "info.log.gz"),
+                       chunk_size=1024)
+        with gzip.open(tmp_path / "info.log.gz") as f:
+            assert f.read() == (tmp_path / "info.log").read_bytes()
+
+    def test_save_logs(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(hooks.CONFIG, "KEDRO_GRAPHQL_LOG_TMP_DIR", str(tmp_path / "tmp"))
+        os.makedirs(tmp_path / "tmp" / "task-0")
+        write_log_lines(tmp_path / "tmp" / "task-0" / "info.log", 100)
+        (tmp_path / "tmp" / "task-0" / "errors.log").write_text("")
+        dataset = AbstractDataset.from_config("gql_logs", {"type": "partitions.PartitionedDataset",
+                                                           "dataset": "text.TextDataset",
+                                                           "path": str(tmp_path / "archive")})
+
+        class Catalog:
+            def _get_dataset(self, name):
+                return dataset
+
+        hooks.DataLoggingHooks().save_logs(Catalog(), "session-0", "task-0")
+
+        assert sorted(dataset.load()) == ["logs/session-0/info.log.gz", "logs/session-0/info.log.gz.index.json"]
+        index = json.loads(dataset.load()["logs/session-0/info.log.gz.index.json"]())
+        assert index["compression"] == "gzip"
+        with gzip.open(tmp_path / "archive" / "logs" / "session-0" / "info.log.gz") as f:
+            assert f.read() == (tmp_path / "tmp" / "task-0" / "info.log").read_bytes()
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def router():
+    router = TaskLogRouter(flush_timeout=5)
+    yield router
+    logging.getLogger().removeHandler(router._queue_handler)
+    router._listener.stop()
+
+
+class TestTaskLogRouter:
+    def test_routes_by_context(self, router):
+        handlers = {"task-0": ListHandler(), "task-1": ListHandler()}
+        for task_id, handler in handlers.items():
+            router.add(task_id, handler)
+        log = logging.getLogger("kedro_graphql.test_capture")
+        log.setLevel(logging.INFO)
+
+        def run(task_id):
+            current_task_id.set(task_id)
+            for i in range(50):
+                log.info(f"{task_id} {i}")
+
+        threads = [threading.Thread(target=run, args=(task_id,)) for task_id in handlers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        router.flush()
+
+        for task_id, handler in handlers.items():
+            assert handler.messages == [f"{task_id} {i}" for i in range(50)]
+
+    def test_drops_records_of_no_task(self, router):
+        handler = ListHandler()
+        router.add("task-0", handler)
+        logging.getLogger("kedro_graphql.test_capture").warning("outside of a task")
+        router.flush()
+        assert handler.messages == []
+
+    def test_process_task_id(self, router):
+        handler = ListHandler()
+        router.add("task-0", handler)
+        router.process_task_id = "task-0"
+        runner = threading.Thread(target=logging.getLogger("kedro_graphql.test_capture").warning,
+                                  args=("from a runner thread",))
+        runner.start()
+        runner.join()
+        router.flush()
+        assert handler.messages == ["from a runner thread"]
+
+    def test_handler_level(self, router):
+        info, error = ListHandler(), ListHandler(logging.ERROR)
+        router.add("task-0", info, error)
+        log = logging.getLogger("kedro_graphql.test_capture")
+        log.setLevel(logging.INFO)
+        current_task_id.set("task-0")
+        try:
+            log.info("info")
+            log.error("error")
+        finally:
+            current_task_id.set(None)
+        router.flush()
+        assert info.messages == ["info", "error"]
+        assert error.messages == ["error"]
+
+    def test_remove(self, router):
+        handler = ListHandler()
+        router.add("task-0", handler)
+        current_task_id.set("task-0")
+        try:
+            logging.getLogger("kedro_graphql.test_capture").warning("queued")
+            # remove waits for the queued records
+            assert router.remove("task-0") == [handler]
+            logging.getLogger("kedro_graphql.test_capture").warning("after remove")
+        finally:
+            current_task_id.set(None)
+        router.flush()
+        assert handler.messages == ["queued"]
+        assert router.handlers("task-0") == []
@@ -3,7 +3,7 @@ import json
 import pytest
 from omegaconf import OmegaConf
 
-from kedro_graphql.models import DataSet, DataSetInput, Parameter, ParameterInput, PipelineInput, TagInput
+from kedro_graphql.models import DataSet, DataSetInput, Parameter, ParameterInput, Pipeline, PipelineInput, State, TagInput
 from .utilities import kedro_graphql_config
 from pathlib import Path
 
@@ -65,6 +65,39 @@ class TestDataSet:
 
         assert d.partitions() == ["part-0001", "part-0002"]
 
+    def test_config_dict(self):
+        config = {"type": "text.TextDataset", "filepath": "/tmp/test_in.csv"}
+        d = DataSet(name="text_in", config=config)
+        assert isinstance(d.config, str)
+        assert d.parse_config() == config
+        assert d.parse_config() is not config
+        assert d == DataSet(name="text_in", config=json.dumps(config))
+
+    def test_config_parsed_once(self, mocker):
+        d = DataSet(name="text_in", config='{"type": "text.TextDataset", "filepath": "/tmp/test_in.csv"}')
+        loads = mocker.spy(json, "loads")
+        d.parse_config()["filepath"] = "/tmp/other.csv"
+        assert d.parse_config()["filepath"] == "/tmp/test_in.csv"
+        assert loads.call_count == 1
+
+    def test_set_config(self):
+        d = DataSet(name="text_in", config='{"type": "text.TextDataset", "filepath": "/tmp/test_in.csv"}')
+        c = d.parse_config()
+        c["filepath"] = "/tmp/other.csv"
+        d.set_config(c)
+        assert json.loads(d.config)["filepath"] == "/tmp/other.csv"
+        assert d.parse_config()["filepath"] == "/tmp/other.csv"
+
+        # assigning a new JSON string replaces the parsed config
+        d.config = '{"type": "text.TextDataset", "filepath": "/tmp/third.csv"}'
+        assert d.parse_config()["filepath"] == "/tmp/third.csv"
+
+    def test_encode_decode(self):
+        d = DataSet(name="text_in", config='{"type": "text.TextDataset", "filepath": "/tmp/test_in.csv"}')
+        encoded = d.encode()
+        assert encoded["config"] == {"type": "text.TextDataset", "filepath": "/tmp/test_in.csv"}
+        assert DataSet.decode(encoded) == d
+
 
 class TestParameterInput:
 
@@ -307,6 +340,15 @@ class TestParameter:
         assert len(result.parameters) == len(mock_pipeline_staged.parameters)
         assert len(result.tags) == len(mock_pipeline_staged.tags)
 
+    def test_pipeline_encode_excludes_template_fields(self, mock_pipeline_staged):
+        """
+        Tests the template-derived describe and nodes are not part of the stored document
+        """
+        encoded = mock_pipeline_staged.encode()
+        assert "describe" not in encoded
+        assert "nodes" not in encoded
+        assert encoded["name"] == mock_pipeline_staged.name
+
 
 class TestDataSetInput:
 
@@ -349,3 +391,35 @@ def test_pipeline_input_encodes_nested_dataset_fields_for_graphql():
 
     assert result["dataCatalog"][0]["listPartitions"] is True
     assert "list_partitions" not in result["dataCatalog"][0]
+
+
+def test_pipeline_decode_dict_partial_document():
+    p = Pipeline.decode_dict({"id": "abc",
+                              "status": [{"state": "STARTED", "task_id": "123"}],
+                              "data_catalog": [{"name": "text_in"}]})
+    assert p.id == "abc"
+    assert p.name is None
+    assert p.status[-1].state == State.STARTED
+    assert p.status[-1].task_id == "123"
+    assert p.status[-1].session is None
+    assert p.status[-1].runner is None
+    assert p.data_catalog[0].name == "text_in"
+    assert p.data_catalog[0].config is None
+
+
+def test_pipeline_decode_stored_template_fields():
+    # e.g. a graphql response decoded by the client, where no template cache is available
+    p = Pipeline.decode({"name": "example00", "describe": "#### Pipeline execution order ####",
+                         "nodes": [{"name": "echo", "inputs": ["text_in"], "outputs": ["text_out"], "tags": []}],
+                         "status": []}, decoder="graphql")
+    assert p.describe == "#### Pipeline execution order ####"
+    assert [n.name for n in p.nodes] == ["echo"]
+    assert "describe" not in p.encode()
+    assert "nodes" not in p.encode()
+    assert Pipeline(name="example00", describe="d", nodes=p.nodes).describe == "d"
+
+
+def test_pipeline_decode_dict_default_runner():
+    # complete status entries written before the runner was stored get the default
+    p = Pipeline.decode_dict({"name": "example00", "status": [{"state": "SUCCESS", "session": "s"}]})
+    assert p.status[-1].runner == "kedro.runner.SequentialRunner"
@@ -1,8 +1,38 @@
+import asyncio
+import os
+import threading
+import time
+
+import billiard
 import pytest
+from celery import Celery
 from celery.result import AsyncResult
 from celery.states import ALL_STATES
 
-from kedro_graphql.pipeline_event_monitor import PipelineEventMonitor
+from kedro_graphql.models import Pipeline, PipelineStatus, State
+from kedro_graphql.pipeline_event_monitor import (
+    CeleryEventReceiver,
+    PipelineEventMonitor,
+    PipelineEventPublisher,
+    PipelineEventStream,
+    TaskAbortListener,
+    publish_task_abort,
+)
+from kedro_graphql.tasks import KedroGraphqlTask
+
+BROKER_URL = "redis://localhost:6379/15"
+
+
+class StatusBackend:
+    """Backend serving a single pipeline whose state the test controls."""
+
+    def __init__(self, id, state, task_id="task-0"):
+        self.pipeline = Pipeline(id=id, name="example00", status=[PipelineStatus(state=state, session=None, task_id=task_id)])
+        self.reads = 0
+
+    async def read(self, id=None, task_id=None, projection=None):
+        self.reads += 1
+        return self.pipeline
 
 
 class TestPipelineEventMonitor:
@@ -57,3 +87,220 @@ class TestPipelineEventMonitor:
         async for e in PipelineEventMonitor(app=mock_celery_session_app, task_id=mock_pipeline.status[-1].task_id).start():
             print(e)
             assert e["status"] in ALL_STATES
+
+
+class TestCeleryEventReceiver:
+
+    @pytest.mark.asyncio
+    async def test_consume_shares_receiver(self):
+        """
+        Requires Redis to run.
+        """
+        app = Celery(broker=BROKER_URL)
+        receiver = CeleryEventReceiver.get(app)
+        assert CeleryEventReceiver.get(app) is receiver
+
+        async def collect():
+            return [e["status"] async for e in PipelineEventMonitor(app=app, task_id="receiver-0", timeout=10).consume()]
+
+        try:
+            subscribers = [asyncio.create_task(collect()) for _ in range(3)]
+            while receiver.subscribers() < 3 or receiver._receiver is None:
+                await asyncio.sleep(0.05)
+            # give the receiver time to bind its queue
+            await asyncio.sleep(0.5)
+
+            def send():
+                with app.events.default_dispatcher() as dispatcher:
+                    dispatcher.send("task-started", uuid="receiver-1", root_id="receiver-1")
+                    dispatcher.send("task-started", uuid="receiver-0", root_id="receiver-0")
+                    dispatcher.send("task-succeeded", uuid="receiver-0", root_id="receiver-0", result="'success'")
+            await asyncio.to_thread(send)
+            results = await asyncio.wait_for(asyncio.gather(*subscribers), timeout=10)
+        finally:
+            receiver.stop()
+
+        assert results == [["STARTED", "SUCCESS"]] * 3
+        assert receiver.subscribers() == 0
+        assert CeleryEventReceiver.get(app) is not receiver
+
+
+class TestPipelineEventStream:
+
+    @pytest.mark.asyncio
+    async def test_consume_published_events(self):
+        """
+        Requires Redis to run.
+        """
+        backend = StatusBackend("event-stream-0", State.STARTED)
+        stream = await PipelineEventStream.create(id="event-stream-0", broker_url=BROKER_URL)
+        publisher = PipelineEventPublisher(broker_url=BROKER_URL)
+
+        async def publish():
+            await asyncio.sleep(0.1)
+            # duplicates of the state read on connect are dropped
+            publisher.publish("event-stream-0", task_id="task-0", status="STARTED")
+            publisher.publish("event-stream-0", task_id="task-0", status="SUCCESS", result="success")
+
+        publishing = asyncio.create_task(publish())
+        events = [e async for e in stream.consume(backend, idle_interval=5)]
+        await publishing
+        publisher.close()
+
+        assert [e["status"] for e in events] == ["STARTED", "SUCCESS"]
+        assert events[-1]["result"] == "success"
+        assert all(e["id"] == "event-stream-0" and e["task_id"] == "task-0" for e in events)
+        assert backend.reads == 1
+
+    @pytest.mark.asyncio
+    async def test_consume_finished_pipeline(self):
+        """
+        Requires Redis to run.
+        """
+        backend = StatusBackend("event-stream-1", State.FAILURE)
+        stream = await PipelineEventStream.create(id="event-stream-1", broker_url=BROKER_URL)
+
+        events = [e async for e in stream.consume(backend, pipeline=backend.pipeline)]
+
+        assert [e["status"] for e in events] == ["FAILURE"]
+        assert backend.reads == 0
+
+    @pytest.mark.asyncio
+    async def test_consume_idle_reads_backend(self):
+        """
+        Requires Redis to run.
+
+        A transition whose message was lost is picked up from the backend.
+        """
+        backend = StatusBackend("event-stream-2", State.STARTED)
+        stream = await PipelineEventStream.create(id="event-stream-2", broker_url=BROKER_URL)
+
+        events = []
+        async for e in stream.consume(backend, idle_interval=0.1):
+            events.append(e)
+            backend.pipeline.status[-1].state = State.ABORTED
+
+        assert [e["status"] for e in events] == ["STARTED", "ABORTED"]
+
+
+class AbortState:
+    """Stands in for a task whose abort state the test controls."""
+
+    def __init__(self, aborted=False):
+        self.aborted = aborted
+        self.reads = 0
+
+    def is_aborted(self):
+        self.reads += 1
+        return self.aborted
+
+
+class TestTaskAbortListener:
+
+    def test_child_sentinel(self):
+        """
+        Requires Redis to run.
+        """
+        listener = TaskAbortListener(BROKER_URL, "abort-task-0")
+        child = billiard.get_context("fork").Process(target=time.sleep, args=(0.2,))
+        child.start()
+        try:
+            start = time.monotonic()
+            assert listener.wait([child.sentinel], 10) is False
+            assert time.monotonic() - start < 5
+        finally:
+            child.join()
+            listener.close()
+
+    @pytest.mark.asyncio
+    async def test_abort_notification(self):
+        """
+        Requires Redis to run.
+        """
+        listener = TaskAbortListener(BROKER_URL, "abort-task-1")
+        r, w = os.pipe()
+        try:
+            assert listener.wait([r], 0.1) is False
+            assert await publish_task_abort(BROKER_URL, "abort-task-1")
+            start = time.monotonic()
+            assert listener.wait([r], 10) is True
+            assert time.monotonic() - start < 5
+        finally:
+            os.close(r)
+            os.close(w)
+            listener.close()
+
+    def test_blocks_on_socket_and_sentinels(self):
+        """
+        Requires Redis to run.
+        """
+        # a long poll interval, so the wait only returns early when select wakes up
+        listener = TaskAbortListener(BROKER_URL, "abort-task-4", poll_interval=30)
+        child = billiard.get_context("fork").Process(target=time.sleep, args=(0.2,))
+        child.start()
+        try:
+            listener._received()
+            assert listener._socket() is not None
+            start = time.monotonic()
+            assert listener.wait([child.sentinel], 10) is False
+            assert time.monotonic() - start < 2
+
+            timer = threading.Timer(0.2, asyncio.run, args=(publish_task_abort(BROKER_URL, "abort-task-4"),))
+            timer.start()
+            start = time.monotonic()
+            assert listener.wait([], 10) is True
+            assert time.monotonic() - start < 2
+            timer.join()
+        finally:
+            child.join()
+            listener.close()
+
+    @pytest.mark.asyncio
+    async def test_reconnect(self):
+        """
+        Requires Redis to run.
+        """
+        listener = TaskAbortListener(BROKER_URL, "abort-task-3")
+        r, w = os.pipe()
+        try:
+            listener.pubsub.connection.disconnect()
+            assert listener.wait([r], 0.3) is False
+            assert listener.listening
+            assert await publish_task_abort(BROKER_URL, "abort-task-3")
+            assert listener.wait([r], 10) is True
+        finally:
+            os.close(r)
+            os.close(w)
+            listener.close()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_abort(self):
+        """
+        Requires Redis to run.
+        """
+        listener = TaskAbortListener(BROKER_URL, "abort-task-2")
+        child = billiard.get_context("fork").Process(target=time.sleep, args=(30,))
+        child.start()
+        task = AbortState()
+        try:
+            loop = asyncio.get_running_loop()
+            waiting = loop.run_in_executor(None, KedroGraphqlTask.wait_for_abort, task, child, listener, 5, 60)
+            await asyncio.sleep(0.5)
+            assert not waiting.done()
+            await publish_task_abort(BROKER_URL, "abort-task-2")
+            assert await asyncio.wait_for(waiting, timeout=5) is True
+            # read once before listening, the notification did the rest
+            assert task.reads == 1
+        finally:
+            child.terminate()
+            child.join()
+            listener.close()
+
+    def test_wait_for_abort_without_listener(self):
+        child = billiard.get_context("fork").Process(target=time.sleep, args=(30,))
+        child.start()
+        try:
+            assert KedroGraphqlTask.wait_for_abort(AbortState(aborted=True), child, None, 5, 60) is True
+        finally:
+            child.terminate()
+            child.join()
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.pipeline import node, pipeline
+from kedro.runner import SequentialRunner
+
+from kedro_graphql import hooks
+from kedro_graphql.hooks import NodeProfileHooks, pop_node_profile
+from kedro_graphql.models import Pipeline
+from kedro_graphql.profiling import aggregate_profiles
+
+
+def slow(x):
+    time.sleep(0.05)
+    return x
+
+
+def allocate(x):
+    return [x] * 2_000_000
+
+
+def fail(x):
+    raise ValueError("boom")
+
+
+@pytest.fixture
+def hook_manager(mocker):
+    mocker.patch.dict(hooks.CONFIG, {"KEDRO_GRAPHQL_NODE_PROFILE": True})
+    hook_manager = _create_hook_manager()
+    hook_manager.register(NodeProfileHooks())
+    return hook_manager
+
+
+def run(hook_manager, *nodes):
+    catalog = DataCatalog({"a": MemoryDataset(1)})
+    SequentialRunner().run(pipeline(list(nodes)), catalog, hook_manager=hook_manager, session_id="s")
+
+
+class TestNodeProfileHooks:
+
+    def test_profile(self, hook_manager):
+        run(hook_manager, node(slow, "a", "b", name="slow"), node(allocate, "b", "c", name="allocate"))
+        profile = pop_node_profile(hook_manager)
+
+        assert [n["node"] for n in profile["nodes"]] == ["slow", "allocate"]
+        slow_node, allocate_node = profile["nodes"]
+        assert slow_node["wall_time"] >= 0.05
+        assert slow_node["cpu_time"] < slow_node["wall_time"]
+        assert [d["name"] for d in slow_node["datasets"]] == ["a", "b"]
+        assert slow_node["datasets"][0]["load_time"] is not None
+        assert slow_node["datasets"][0]["save_time"] is None
+        assert slow_node["datasets"][1]["save_time"] is not None
+        assert allocate_node["peak_rss_delta_kb"] > 0
+        assert profile["wall_time"] == pytest.approx(slow_node["wall_time"] + allocate_node["wall_time"], abs=1e-3)
+        assert profile["peak_rss_kb"] > 0
+
+        # a new profile is started
+        assert pop_node_profile(hook_manager) is None
+
+    def test_failed_node(self, hook_manager):
+        with pytest.raises(ValueError):
+            run(hook_manager, node(fail, "a", "b", name="fail"))
+        profile = pop_node_profile(hook_manager)
+
+        assert profile["nodes"][0]["node"] == "fail"
+        assert profile["nodes"][0]["failed"]
+
+    def test_disabled(self, hook_manager, mocker):
+        mocker.patch.dict(hooks.CONFIG, {"KEDRO_GRAPHQL_NODE_PROFILE": False})
+        run(hook_manager, node(slow, "a", "b", name="slow"))
+        assert pop_node_profile(hook_manager) is None
+
+
+def test_aggregate_profiles():
+    def profile(wall, rss, failed=False):
+        return {"nodes": [{"node": "n", "wall_time": wall, "cpu_time": wall, "load_time": 0.0, "save_time": 1.0,
+                           "peak_rss_delta_kb": rss, "failed": failed},
+                          {"node": "m", "wall_time": 0.1, "cpu_time": 0.1, "load_time": 0.0, "save_time": 0.0,
+                           "peak_rss_delta_kb": None, "failed": False}]}
+
+    summary = aggregate_profiles([profile(1.0, 10), profile(3.0, 30, failed=True), None])
+
+    assert [s["node"] for s in summary] == ["n", "m"]
+    assert summary[0] == {"node": "n", "runs": 2, "failures": 1, "mean_wall_time": 2.0, "max_wall_time": 3.0,
+                          "mean_cpu_time": 2.0, "mean_load_time": 0.0, "mean_save_time": 1.0,
+                          "max_peak_rss_delta_kb": 30}
+    assert summary[1]["max_peak_rss_delta_kb"] is None
+
+
+def test_status_profile(hook_manager):
+    run(hook_manager, node(slow, "a", "b", name="slow"))
+    profile = pop_node_profile(hook_manager)
+
+    p = Pipeline.decode_dict({"name": "example00", "status": [{"state": "SUCCESS", "profile": profile}]})
+
+    assert p.status[-1].profile.nodes[0].node == "slow"
+    assert p.status[-1].profile.nodes[0].datasets[0].name == "a"
+    assert jsonable_encoder(p.status[-1].profile) == profile
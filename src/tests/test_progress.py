@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+
+import pytest
+import redis
+from kedro.pipeline import node
+
+from kedro_graphql.hooks import NodeProgressHooks
+from kedro_graphql.models import Pipeline, PipelineStatus, State
+from kedro_graphql.progress import (
+    AFTER_NODE_RUN,
+    BEFORE_NODE_RUN,
+    ON_NODE_ERROR,
+    PIPELINE_END,
+    PIPELINE_START,
+    NodeProgressPublisher,
+    PipelineProgressStream,
+    progress_stream_key,
+)
+from kedro_graphql.schema import _pipeline_run_status
+
+BROKER_URL = "redis://localhost:6379/15"
+
+
+def identity(x):
+    return x
+
+
+@pytest.fixture
+def session_id(request):
+    session_id = f"progress-{request.node.name}"
+    r = redis.Redis.from_url(BROKER_URL)
+    r.delete(progress_stream_key(session_id))
+    yield session_id
+    r.delete(progress_stream_key(session_id))
+
+
+async def consume(stream):
+    return [p async for p in stream.consume()]
+
+
+class TestPipelineProgressStream:
+
+    def test_apply(self):
+        stream = PipelineProgressStream("s", "t", broker_url=BROKER_URL, total=1)
+        stream.apply({"event": PIPELINE_START, "total": "3"})
+        stream.apply({"event": BEFORE_NODE_RUN, "node": "a"})
+        stream.apply({"event": BEFORE_NODE_RUN, "node": "b"})
+        stream.apply({"event": AFTER_NODE_RUN, "node": "a"})
+        stream.apply({"event": ON_NODE_ERROR, "node": "b", "error": "boom", "timestamp": "now"})
+        progress = stream.progress()
+
+        assert progress["total"] == 3
+        assert progress["completed"] == 1
+        assert progress["running"] == []
+        assert progress["failed"] == ["b"]
+        assert not progress["finished"]
+        assert progress["last_event"] == {"event": ON_NODE_ERROR, "node": "b", "timestamp": "now", "error": "boom"}
+
+    @pytest.mark.asyncio
+    async def test_consume(self, session_id):
+        """
+        Requires Redis to run.
+        """
+        publisher = NodeProgressPublisher(BROKER_URL)
+        assert publisher.publish(session_id, PIPELINE_START, total=2)
+        assert publisher.publish(session_id, BEFORE_NODE_RUN, node="a")
+        assert publisher.publish(session_id, AFTER_NODE_RUN, node="a")
+        assert publisher.publish(session_id, BEFORE_NODE_RUN, node="b")
+        assert publisher.publish(session_id, PIPELINE_END)
+
+        updates = await consume(PipelineProgressStream(session_id, "progress-task", broker_url=BROKER_URL,
+                                                       block_ms=100))
+
+        # the events so far are read at once
+        assert len(updates) == 1
+        assert updates[0]["total"] == 2
+        assert updates[0]["completed"] == 1
+        assert updates[0]["running"] == []
+        assert updates[0]["finished"]
+        assert updates[0]["last_event"]["event"] == PIPELINE_END
+
+    @pytest.mark.asyncio
+    async def test_task_finished(self, session_id, mocker):
+        """
+        Requires Redis to run.
+        """
+        mocker.patch("kedro_graphql.progress.task_finished", return_value=True)
+        NodeProgressPublisher(BROKER_URL).publish(session_id, BEFORE_NODE_RUN, node="a")
+
+        updates = await consume(PipelineProgressStream(session_id, "progress-task", broker_url=BROKER_URL,
+                                                       block_ms=100))
+
+        assert [u["running"] for u in updates] == [["a"], ["a"]]
+        assert [u["finished"] for u in updates] == [False, True]
+
+
+class TestNodeProgressHooks:
+
+    def test_hooks(self, session_id):
+        """
+        Requires Redis to run.
+        """
+        hooks = NodeProgressHooks()
+        hooks._publisher = NodeProgressPublisher(BROKER_URL)
+        n = node(identity, "x", "y", name="identity")
+
+        hooks.before_node_run(node=n, session_id=session_id)
+        hooks.on_node_error(error=ValueError("boom"), node=n, session_id=session_id)
+        hooks.on_pipeline_error(error=ValueError("boom"), run_params={"session_id": session_id})
+
+        entries = redis.Redis.from_url(BROKER_URL, decode_responses=True).xrange(progress_stream_key(session_id))
+        assert [e["event"] for _, e in entries] == [BEFORE_NODE_RUN, ON_NODE_ERROR, PIPELINE_END]
+        assert entries[1][1]["node"] == "identity"
+        assert entries[1][1]["error"] == "boom"
+
+    def test_unreachable_broker(self):
+        publisher = NodeProgressPublisher("redis://localhost:1/0")
+        assert not publisher.publish("progress-unreachable", BEFORE_NODE_RUN, node="a")
+        assert "progress-unreachable" in publisher._failed
+
+
+class FakeBackend:
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.reads = 0
+
+    async def read(self, id=None, projection=None):
+        self.reads += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return Pipeline(id=id, name="example00", status=[status])
+
+
+class FakeEventHub:
+    def __init__(self, *events):
+        self.events = events
+
+    async def subscribe(self, id, interval=0.5):
+        for e in self.events:
+            yield e
+
+
+def info(backend, event_hub=None):
+    return SimpleNamespace(context={"request": SimpleNamespace(app=SimpleNamespace(
+        backend=backend, event_hub=event_hub or FakeEventHub()))})
+
+
+class TestPipelineRunStatus:
+
+    @pytest.mark.asyncio
+    async def test_ended_without_session(self):
+        backend = FakeBackend(PipelineStatus(state=State.FAILURE, session=None))
+        status = await _pipeline_run_status("id", info(backend))
+        assert status.session is None
+        assert backend.reads == 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_task_then_session(self):
+        backend = FakeBackend(PipelineStatus(state=State.READY, session=None),
+                              PipelineStatus(state=State.STARTED, session=None, task_id="t"),
+                              PipelineStatus(state=State.STARTED, session="s", task_id="t"))
+        hub = FakeEventHub({"status": "READY", "task_id": None}, {"status": "STARTED", "task_id": "t"})
+        status = await _pipeline_run_status("id", info(backend, hub))
+        assert (status.task_id, status.session) == ("t", "s")
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        backend = FakeBackend(PipelineStatus(state=State.STARTED, session=None, task_id="t"))
+        with pytest.raises(TimeoutError):
+            await _pipeline_run_status("id", info(backend), timeout=0.3)
@@ -0,0 +1,108 @@
+import os
+import signal
+import time
+from pathlib import Path
+
+import pytest
+from kedro.framework.startup import bootstrap_project
+
+from kedro_graphql import tasks
+from kedro_graphql.sandbox import SandboxPool
+
+_initialized = []
+
+
+def initializer(value):
+    _initialized.append(value)
+
+
+def target(request):
+    if request.get("sleep"):
+        def abort(signum, frame):
+            raise KeyboardInterrupt("Pipeline abort signal received")
+        signal.signal(signal.SIGINT, abort)
+        try:
+            time.sleep(request["sleep"])
+        except KeyboardInterrupt as e:
+            return {"status": "error", "error": str(e)}
+    return {"status": "success", "pid": os.getpid(), "initialized": list(_initialized)}
+
+
+def run(pool, request, timeout=10):
+    child = pool.submit(request)
+    child.join(timeout)
+    result = child.results.get_nowait()
+    pool.release(child)
+    return child, result
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(target, size=1, max_runs=3, initializer=initializer, initargs=("warm",))
+    yield pool
+    pool.close()
+
+
+class TestSandboxPool:
+    def test_reuses_sandbox(self, pool):
+        pool.start()
+        first = run(pool, {})[1]
+        second = run(pool, {})[1]
+
+        assert first["pid"] == second["pid"] != os.getpid()
+        assert first["initialized"] == ["warm"]
+        assert _initialized == []
+
+    def test_max_runs(self, pool):
+        pids = [run(pool, {})[1]["pid"] for _ in range(4)]
+        assert len(set(pids[:3])) == 1
+        assert pids[3] != pids[0]
+
+    def test_abort(self, pool):
+        child = pool.submit({"sleep": 30})
+        child.join(1)
+        assert child.is_alive()
+        os.killpg(os.getpgid(child.pid), signal.SIGINT)
+        child.join(10)
+
+        assert not child.is_alive()
+        assert child.results.get_nowait() == {"status": "error", "error": "Pipeline abort signal received"}
+        pool.release(child, recycle=True)
+        assert run(pool, {})[1]["pid"] != child.pid
+
+    def test_killed_sandbox(self, pool):
+        child = pool.submit({"sleep": 30})
+        child.join(1)
+        os.killpg(os.getpgid(child.pid), signal.SIGKILL)
+        child.join(10)
+
+        assert not child.is_alive()
+        assert child.results.empty()
+        pool.release(child)
+        assert run(pool, {})[1]["status"] == "success"
+
+    def test_run_pipeline_in_sandbox(self, tmp_path):
+        """Requires Redis to run.
+        """
+        bootstrap_project(Path.cwd())
+        (tmp_path / "in.txt").write_text("hello")
+        pool = SandboxPool(tasks._run_pipeline_in_sandbox, initializer=tasks.session_cache.get,
+                           initargs=(tasks.PROJECT_PATH, "local", None))
+        try:
+            _, result = run(pool, {
+                "task_id": "sandbox-task", "session_id": "sandbox-session", "env": "local", "conf_source": None,
+                "pipeline_name": "example00", "node_names": ["echo_node"],
+                "runner": "kedro.runner.SequentialRunner", "runner_kwargs": {},
+                "catalog": {"text_in": {"type": "text.TextDataset", "filepath": str(tmp_path / "in.txt")},
+                            "text_out": {"type": "text.TextDataset", "filepath": str(tmp_path / "out.txt")}},
+                "parameters": {"example": "hello", "duration": 0},
+                "record_data": {"celery_task_id": "sandbox-task", "session_id": "sandbox-session"},
+                "broker_url": "redis://localhost:6379/15", "log_handler_options": {},
+                "log_dir": str(tmp_path / "logs"),
+            }, timeout=60)
+        finally:
+            pool.close()
+
+        assert result == {"status": "success"}
+        assert (tmp_path / "out.txt").exists()
+        assert "Completed node: echo_node" in (tmp_path / "logs" / "info.log").read_text()
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from celery.states import UNREADY_STATES
 
 import pytest
+from kedro_graphql.exceptions import CreateManyError
 from kedro_graphql.models import State
 
 IN_DEV = True
@@ -318,6 +319,149 @@ class TestSchemaMutations:
 
         assert create_pipeline_resp.errors is not None
 
+    @pytest.mark.asyncio
+    async def test_create_pipelines(self,
+                                    mock_app,
+                                    mock_celery_session_app,
+                                    celery_session_worker,
+                                    mock_info_context,
+                                    mock_text_in,
+                                    mock_text_out):
+
+        query = """
+        mutation CreatePipelines($pipelines: [PipelineInput!]!, $uniquePaths: [String!]) {
+          createPipelines(pipelines: $pipelines, uniquePaths: $uniquePaths) {
+            pipeline {
+              id
+              status {
+                state
+              }
+              dataCatalog {
+                name
+                config
+              }
+            }
+            error
+          }
+        }
+        """
+
+        def pipeline_input(name, state):
+            return {"name": name,
+                    "dataCatalog": [{"name": "text_in", "config": json.dumps({"type": "text.TextDataset", "filepath": str(mock_text_in)})},
+                                    {"name": "text_out", "config": json.dumps(
+                                        {"type": "text.TextDataset", "filepath": str(mock_text_out)})}
+                                    ],
+                    "parameters": [{"name": "example", "value": "hello"},
+                                   {"name": "duration", "value": "0.1", "type": "FLOAT"}],
+                    "state": state,
+                    "tags": [{"key": "author", "value": "opensean"}, {"key": "package", "value": "kedro-graphql"}]}
+
+        resp = await mock_app.schema.execute(query,
+                                             variable_values={"pipelines": [pipeline_input("example00", "STAGED"),
+                                                                            pipeline_input("example02", "READY"),
+                                                                            pipeline_input("example00", "READY")],
+                                                              "uniquePaths": ["text_out"]})
+
+        assert resp.errors is None
+        staged, invalid, ready = resp.data["createPipelines"]
+
+        assert staged["error"] is None
+        assert staged["pipeline"]["status"][-1]["state"] == "STAGED"
+        assert invalid["pipeline"] is None
+        assert "example02" in invalid["error"]
+        assert ready["error"] is None
+        assert ready["pipeline"]["status"][-1]["state"] != "STAGED"
+        assert staged["pipeline"]["id"] != ready["pipeline"]["id"]
+
+        datasets = {d["name"]: json.loads(d["config"]) for d in ready["pipeline"]["dataCatalog"]}
+        assert ready["pipeline"]["id"] == datasets["text_out"]["filepath"].rsplit("/", 2)[1]
+
+        stored = await mock_app.backend.read(id=staged["pipeline"]["id"])
+        assert stored.status[-1].state == State.STAGED
+
+    @pytest.mark.asyncio
+    async def test_create_pipelines_publish_failure(self,
+                                                    mock_app,
+                                                    mock_info_context,
+                                                    mock_text_in,
+                                                    mock_text_out):
+        query = """
+        mutation CreatePipelines($pipelines: [PipelineInput!]!) {
+          createPipelines(pipelines: $pipelines) {
+            pipeline {
+              id
+            }
+            error
+          }
+        }
+        """
+        pipeline_input = {"name": "example00",
+                          "dataCatalog": [{"name": "text_in", "config": json.dumps({"type": "text.TextDataset", "filepath": str(mock_text_in)})},
+                                          {"name": "text_out", "config": json.dumps(
+                                              {"type": "text.TextDataset", "filepath": str(mock_text_out)})}
+                                          ],
+                          "parameters": [{"name": "example", "value": "hello"},
+                                         {"name": "duration", "value": "0.1", "type": "FLOAT"}],
+                          "state": "READY"}
+
+        published = []
+
+        def apply_async(kwargs=None, **options):
+            if published:
+                raise ConnectionError("broker went away")
+            published.append(kwargs["id"])
+
+        with patch("kedro_graphql.schema.run_pipeline.apply_async", side_effect=apply_async):
+            resp = await mock_app.schema.execute(query, variable_values={"pipelines": [pipeline_input, pipeline_input]})
+
+        assert resp.errors is None
+        sent, failed = resp.data["createPipelines"]
+        assert sent["error"] is None
+        assert published == [sent["pipeline"]["id"]]
+        assert failed["pipeline"]["id"] is not None
+        assert "broker went away" in failed["error"]
+
+    @pytest.mark.asyncio
+    async def test_create_pipelines_store_failure(self,
+                                                  mock_app,
+                                                  mock_info_context,
+                                                  mock_text_in,
+                                                  mock_text_out):
+        query = """
+        mutation CreatePipelines($pipelines: [PipelineInput!]!) {
+          createPipelines(pipelines: $pipelines) {
+            pipeline {
+              id
+            }
+            error
+          }
+        }
+        """
+        pipeline_input = {"name": "example00",
+                          "dataCatalog": [{"name": "text_in", "config": json.dumps({"type": "text.TextDataset", "filepath": str(mock_text_in)})},
+                                          {"name": "text_out", "config": json.dumps(
+                                              {"type": "text.TextDataset", "filepath": str(mock_text_out)})}
+                                          ],
+                          "parameters": [{"name": "example", "value": "hello"},
+                                         {"name": "duration", "value": "0.1", "type": "FLOAT"}],
+                          "state": "STAGED"}
+        create_many = mock_app.backend.create_many
+
+        async def partial_create_many(pipelines):
+            created = await create_many(pipelines[:1])
+            raise CreateManyError(created + [None], {1: "duplicate key"})
+
+        with patch.object(mock_app.backend, "create_many", side_effect=partial_create_many):
+            resp = await mock_app.schema.execute(query, variable_values={"pipelines": [pipeline_input, pipeline_input]})
+
+        assert resp.errors is None
+        stored, failed = resp.data["createPipelines"]
+        assert stored["error"] is None
+        assert stored["pipeline"]["id"] is not None
+        assert failed["pipeline"] is None
+        assert "duplicate key" in failed["error"]
+
     @pytest.mark.asyncio
     async def test_update_pipeline_staged_to_ready(self,
                                                    mock_app,
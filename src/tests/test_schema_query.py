@@ -1,3 +1,6 @@
+import dataclasses
+from datetime import datetime
+
 import pytest
 
 
@@ -16,6 +19,26 @@ class TestSchemaQuery:
         resp = await mock_app.schema.execute(query, variable_values={"id": str(mock_pipeline.id)})
         assert resp.errors is None
 
+    @pytest.mark.asyncio
+    async def test_pipeline_template_fields(self, mock_app, mock_info_context, mock_pipeline_no_task):
+        p = await mock_app.backend.create(mock_pipeline_no_task)
+
+        query = """
+        query TestQuery($id: String!) {
+          readPipeline(id: $id){
+            describe
+            nodes {
+              name
+            }
+          }
+        }
+        """
+        resp = await mock_app.schema.execute(query, variable_values={"id": str(p.id)})
+        assert resp.errors is None
+        template = mock_app.kedro_pipelines[p.name]
+        assert resp.data["readPipeline"]["describe"] == template.describe()
+        assert [n["name"] for n in resp.data["readPipeline"]["nodes"]] == [n.name for n in template.nodes]
+
     @pytest.mark.asyncio
     async def test_pipelines(self, mock_app, mock_info_context, mock_pipeline):
 
@@ -34,6 +57,47 @@ class TestSchemaQuery:
         resp = await mock_app.schema.execute(query, variable_values={"limit": 3, "filter": "{\"tags\": {\"key\": \"author\", \"value\": \"opensean\"}}"})
         assert resp.errors is None
 
+    @pytest.mark.asyncio
+    async def test_pipelines_keyset_pagination(self, mock_app, mock_info_context, mock_pipeline_no_task):
+
+        for day in [1, 2, 3]:
+            await mock_app.backend.create(
+                dataclasses.replace(mock_pipeline_no_task, id=None, created_at=datetime(2024, 1, day)))
+
+        query = """
+        query TestQuery($limit: Int!, $cursor: String, $sort: String) {
+          readPipelines(limit: $limit, cursor: $cursor, sort: $sort) {
+            pageMeta {
+              nextCursor
+              previousCursor
+            }
+            pipelines {
+              id
+              createdAt
+            }
+          }
+        }
+        """
+        variables = {"limit": 2, "sort": "[('created_at', -1)]"}
+        first = await mock_app.schema.execute(query, variable_values=variables)
+        assert first.errors is None
+        first = first.data["readPipelines"]
+        assert first["pageMeta"]["previousCursor"] is None
+        assert [p["createdAt"] for p in first["pipelines"]] == ["2024-01-03T00:00:00", "2024-01-02T00:00:00"]
+
+        second = await mock_app.schema.execute(
+            query, variable_values={**variables, "cursor": first["pageMeta"]["nextCursor"]})
+        assert second.errors is None
+        second = second.data["readPipelines"]
+        assert second["pageMeta"]["nextCursor"] is None
+        assert [p["createdAt"] for p in second["pipelines"]] == ["2024-01-01T00:00:00"]
+
+        previous = await mock_app.schema.execute(
+            query, variable_values={**variables, "cursor": second["pageMeta"]["previousCursor"]})
+        assert previous.errors is None
+        assert previous.data["readPipelines"]["pipelines"] == first["pipelines"]
+        assert previous.data["readPipelines"]["pageMeta"]["previousCursor"] is None
+
     @pytest.mark.asyncio
     async def test_pipeline_templates(self, mock_app, mock_info_context):
 
@@ -218,3 +282,31 @@ class TestSchemaQuery:
         assert isinstance(resp.data["readDatasets"][0]["urls"], list)
         assert len(resp.data["readDatasets"][0]["urls"]) == 1
         assert resp.errors is None
+
+    @pytest.mark.asyncio
+    async def test_pipeline_log_history(self, mock_app, mock_info_context, mock_pipeline):
+        """Requires Redis to run.
+        """
+        query = """
+        query TestQuery($id: String!, $cursor: String) {
+          pipelineLogHistory(id: $id, limit: 1, cursor: $cursor){
+            messages {
+              messageId
+              taskId
+            }
+            pageMeta {
+              nextCursor
+            }
+          }
+        }
+        """
+        resp = await mock_app.schema.execute(query, variable_values={"id": str(mock_pipeline.id)})
+        assert resp.errors is None
+        page = resp.data["pipelineLogHistory"]
+        assert len(page["messages"]) <= 1
+        assert all(m["taskId"] == str(mock_pipeline.status[-1].task_id) for m in page["messages"])
+        if page["pageMeta"]["nextCursor"]:
+            resp = await mock_app.schema.execute(query, variable_values={"id": str(mock_pipeline.id),
+                                                                         "cursor": page["pageMeta"]["nextCursor"]})
+            assert resp.errors is None
+            assert resp.data["pipelineLogHistory"]["messages"][0]["messageId"] > page["pageMeta"]["nextCursor"]
@@ -74,6 +74,37 @@ class TestSchemaSubscriptions:
             assert result.data["pipelineLogs"]["taskId"] == str(
                 mock_pipeline2.status[-1].task_id)
 
+    @pytest.mark.asyncio
+    async def test_pipeline_log_batches(self, mock_app, mock_info_context, mock_pipeline):
+        """Requires Redis to run.
+        """
+
+        query = """
+    	  subscription {
+          	pipelineLogBatches(id:""" + '"' + str(mock_pipeline.id) + '"' + """, maxBatch: 5, maxLatencyMs: 100) {
+              id
+              taskId
+              messages {
+                id
+                message
+                messageId
+                taskId
+                time
+              }
+            }
+    	  }
+        """
+
+        sub = await mock_app.schema.subscribe(query)
+
+        async for result in sub:
+            assert not result.errors
+            batch = result.data["pipelineLogBatches"]
+            assert batch["id"] == str(mock_pipeline.id)
+            assert batch["taskId"] == str(mock_pipeline.status[-1].task_id)
+            assert 1 <= len(batch["messages"]) <= 5
+            assert all(m["taskId"] == batch["taskId"] for m in batch["messages"])
+
     @pytest.mark.asyncio
     async def test_pipeline_subscription_non_blocking(self, mock_app, mock_info_context, mock_pipeline, mock_pipeline2):
         """Test that pipeline subscriptions don't block the event loop.
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pytest
+from kedro.framework.startup import bootstrap_project
+
+from kedro_graphql.session_cache import SessionCache
+
+
+@pytest.fixture(scope="module")
+def cache():
+    bootstrap_project(Path.cwd())
+    return SessionCache()
+
+
+class TestSessionCache:
+    def test_loads_context_once(self, cache, mocker):
+        warm = cache.get(Path.cwd(), env="local")
+        assert warm.env == "local"
+        assert warm.load_time > 0
+
+        create = mocker.patch("kedro_graphql.session_cache.KedroSession.create")
+        assert cache.get(Path.cwd(), env="local") is warm
+        create.assert_not_called()
+
+    def test_sessions(self, cache):
+        warm = cache.get(Path.cwd(), env="local")
+        first = cache.session(Path.cwd(), env="local")
+        second = cache.session(Path.cwd(), env="local")
+
+        assert first.session_id != second.session_id
+        assert first._hook_manager is not second._hook_manager
+        assert first.store["session_id"] == first.session_id
+        assert first.store["env"] == "local"
+        assert [p for _, p in first._hook_manager.list_name_plugin()] == [p for _, p in warm.plugins]
+
+    def test_session_loads_context(self, cache):
+        with cache.session(Path.cwd(), env="local") as session:
+            context = session.load_context()
+        assert context.env == "local"
+        assert context.project_path == Path.cwd()
+
+    def test_keyed_by_env_and_conf_source(self, cache):
+        assert cache.get(Path.cwd(), env="local") is not cache.get(Path.cwd(), env="base")
+        assert cache.get(Path.cwd(), env="local") is not cache.get(Path.cwd(), env="local",
+                                                                    conf_source=str(Path.cwd() / "conf"))
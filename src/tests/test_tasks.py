@@ -1,7 +1,7 @@
 import json
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from kedro_graphql.models import (
     DataSet,
@@ -117,3 +117,29 @@ def test_run_pipeline_child_process_recreates_catalog():
             result_queue.put.assert_called_with({"status": "success"})
 
 
+
+
+def test_before_start_appends_log_datasets_without_reading(tmp_path):
+    db = MagicMock()
+    db.patch_status = AsyncMock(return_value=True)
+    db.push_datasets = AsyncMock(return_value=True)
+    db.read = AsyncMock()
+    kwargs = {"id": "abc", "name": "example00", "parameters": {"example": "hello"},
+              "data_catalog": {"text_in": {"type": "text.TextDataset", "filepath": "./data/text_in.txt"}}}
+
+    with patch.object(run_pipeline, "_db", db), \
+            patch.object(run_pipeline, "_events", MagicMock()), \
+            patch.object(run_pipeline, "_gql_config", {"KEDRO_GRAPHQL_LOG_TMP_DIR": str(tmp_path / "tmp"),
+                                                        "KEDRO_GRAPHQL_LOG_PATH_PREFIX": str(tmp_path / "logs")}), \
+            patch("kedro_graphql.tasks.KedroGraphQLLogHandler"), \
+            patch("kedro_graphql.tasks.task_log_router"):
+        run_pipeline.before_start("before-start-task", (), kwargs)
+
+    db.read.assert_not_called()
+    datasets = db.push_datasets.call_args.kwargs["datasets"]
+    assert [d.name for d in datasets] == ["gql_meta", "gql_logs"]
+    with open(datasets[0].parse_config()["filepath"]) as f:
+        meta = json.load(f)
+    assert meta["id"] == "abc"
+    assert meta["parameters"] == {"example": "hello"}
+    assert set(meta["data_catalog"]) == {"text_in", "gql_meta", "gql_logs"}